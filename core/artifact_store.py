@@ -0,0 +1,210 @@
+"""
+run별 산출물 저장소.
+
+run마다 같은 경로(builder_output.html, dashboard.html)에 덮어쓰던 방식 대신
+- objects/<sha[:2]>/<sha256>  : 내용 주소 방식의 불변 객체 (같은 페이지는 한 번만 저장)
+- runs/<run_id>.json          : run_id → {산출물 이름: sha256/크기/content_type} 매니페스트(색인)
+로 나눠 저장하므로 동시 요청이 서로의 결과를 덮어쓰지 않는다.
+
+보존 정책: ARTIFACT_RETENTION_SECONDS보다 오래된 run을 지우고, 객체 총량이 ARTIFACT_MAX_TOTAL_BYTES를
+넘으면 오래된 run부터 지운 뒤 참조가 없어진 객체를 정리한다 (쓰기 ARTIFACT_PRUNE_EVERY회마다 점검).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+# Orchestrator._create_run_id 형식 (매니페스트 경로에 쓰이므로 그 외 값은 거절)
+RUN_ID_RE = re.compile(r"^run_\d+_[0-9a-f]{8}$")
+# 다른 프로세스가 객체를 쓰고 아직 매니페스트를 쓰기 전일 수 있으므로 막 생긴 고아 객체는 남겨 둔다
+ORPHAN_GRACE_SECONDS = 60.0
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+class ArtifactStore:
+    def __init__(self, root_dir: str, retention_seconds: int = None, max_total_bytes: int = None,
+                 prune_every: int = None):
+        self.root_dir = os.path.abspath(root_dir)
+        self.objects_dir = os.path.join(self.root_dir, "objects")
+        self.runs_dir = os.path.join(self.root_dir, "runs")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.runs_dir, exist_ok=True)
+        self.retention_seconds = (
+            _get_int_env("ARTIFACT_RETENTION_SECONDS", 7 * 86400) if retention_seconds is None else retention_seconds
+        )
+        self.max_total_bytes = (
+            _get_int_env("ARTIFACT_MAX_TOTAL_BYTES", 512 * 1024 * 1024) if max_total_bytes is None else max_total_bytes
+        )
+        self.prune_every = _get_int_env("ARTIFACT_PRUNE_EVERY", 32) if prune_every is None else prune_every
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    # --- 경로 ---
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def _manifest_path(self, run_id: str) -> str:
+        return os.path.join(self.runs_dir, f"{run_id}.json")
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # --- 쓰기 ---
+    def put_run(self, run_id: str, artifacts: dict) -> dict:
+        """
+        artifacts: {이름: (내용(str|bytes), content_type)} 를 저장하고 매니페스트를 반환한다.
+        같은 run_id로 다시 호출하면 기존 매니페스트에 산출물을 추가한다.
+        """
+        if not RUN_ID_RE.match(run_id or ""):
+            raise ValueError(f"invalid run_id: {run_id!r}")
+
+        # 객체 쓰기와 매니페스트 쓰기를 한 락 안에서 해 같은 프로세스의 prune()이 그 사이에 끼지 못하게 한다.
+        # 다른 프로세스의 prune은 방금 갱신된 mtime(ORPHAN_GRACE_SECONDS) 때문에 이 객체를 지우지 않는다.
+        with self._lock:
+            entries = {}
+            for name, (content, content_type) in artifacts.items():
+                data = content.encode("utf-8") if isinstance(content, str) else content
+                sha256 = hashlib.sha256(data).hexdigest()
+                path = self._object_path(sha256)
+                if os.path.exists(path):
+                    # 이미 있는 객체는 다시 쓰지 않고 mtime만 갱신 (고아 정리 유예 기준)
+                    os.utime(path, None)
+                else:
+                    self._atomic_write(path, data)
+                entries[name] = {"sha256": sha256, "size": len(data), "content_type": content_type}
+
+            manifest = self._read_manifest(run_id) or {"run_id": run_id, "created_at": time.time(), "artifacts": {}}
+            manifest["artifacts"].update(entries)
+            self._atomic_write(
+                self._manifest_path(run_id), json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+            )
+            self._writes += 1
+            prune = bool(self.prune_every) and self._writes % self.prune_every == 0
+        if prune:
+            self.prune()
+        return manifest
+
+    # --- 읽기 ---
+    def _read_manifest(self, run_id: str):
+        try:
+            with open(self._manifest_path(run_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_manifest(self, run_id: str):
+        """run_id의 매니페스트 dict (없거나 형식이 잘못된 id면 None)"""
+        if not RUN_ID_RE.match(run_id or ""):
+            return None
+        return self._read_manifest(run_id)
+
+    def open_artifact(self, run_id: str, name: str):
+        """(객체 파일 경로, 매니페스트 항목) 또는 None. 이름은 매니페스트에 있는 것만 허용된다."""
+        manifest = self.get_manifest(run_id)
+        if manifest is None:
+            return None
+        entry = manifest["artifacts"].get(name)
+        if entry is None:
+            return None
+        path = self._object_path(entry["sha256"])
+        if not os.path.exists(path):
+            return None
+        return path, entry
+
+    # --- 보존 정책 ---
+    def _scan_manifests(self) -> list:
+        manifests = []
+        for file_name in os.listdir(self.runs_dir):
+            if not file_name.endswith(".json"):
+                continue
+            manifest = self._read_manifest(file_name[:-len(".json")])
+            if manifest is not None:
+                manifests.append(manifest)
+        manifests.sort(key=lambda manifest: manifest.get("created_at", 0))
+        return manifests
+
+    def _scan_objects(self) -> dict:
+        objects = {}
+        for root, _, names in os.walk(self.objects_dir):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                objects[name] = (stat.st_size, stat.st_mtime)
+        return objects
+
+    def prune(self) -> dict:
+        """보존 기간/총량을 넘은 run과 참조가 없는 객체를 삭제하고 삭제 통계를 반환한다."""
+        with self._lock:
+            now = time.time()
+            manifests = self._scan_manifests()
+            objects = self._scan_objects()
+            removed_runs = 0
+            removed_objects = 0
+
+            def drop_run(manifest):
+                nonlocal removed_runs
+                self._remove_file(self._manifest_path(manifest["run_id"]))
+                removed_runs += 1
+
+            kept = []
+            for manifest in manifests:
+                if self.retention_seconds and now - manifest.get("created_at", 0) > self.retention_seconds:
+                    drop_run(manifest)
+                else:
+                    kept.append(manifest)
+
+            refcounts = {}
+            for manifest in kept:
+                for sha256 in {entry["sha256"] for entry in manifest["artifacts"].values()}:
+                    refcounts[sha256] = refcounts.get(sha256, 0) + 1
+
+            for sha256, (_, mtime) in objects.items():
+                if sha256 not in refcounts and now - mtime > ORPHAN_GRACE_SECONDS:
+                    self._remove_file(self._object_path(sha256))
+                    removed_objects += 1
+
+            total_bytes = sum(objects[sha256][0] for sha256 in refcounts if sha256 in objects)
+            # 가장 최근 run 하나는 총량을 넘더라도 남긴다
+            while self.max_total_bytes and total_bytes > self.max_total_bytes and len(kept) > 1:
+                manifest = kept.pop(0)
+                drop_run(manifest)
+                for sha256 in {entry["sha256"] for entry in manifest["artifacts"].values()}:
+                    refcounts[sha256] -= 1
+                    if refcounts[sha256] == 0:
+                        del refcounts[sha256]
+                        if sha256 in objects:
+                            total_bytes -= objects[sha256][0]
+                            # 막 쓰였거나 다시 참조된 객체는 다른 프로세스가 매니페스트를 쓰는 중일 수 있으므로
+                            # 남겨 두고, 여전히 고아라면 다음 정리에서 지운다
+                            if now - objects[sha256][1] > ORPHAN_GRACE_SECONDS:
+                                self._remove_file(self._object_path(sha256))
+                                removed_objects += 1
+
+        if removed_runs or removed_objects:
+            print(f"[Artifacts] 정리: run {removed_runs}개, 객체 {removed_objects}개 삭제 (남은 용량 {total_bytes} bytes)")
+        return {"runs_removed": removed_runs, "objects_removed": removed_objects, "total_bytes": total_bytes}
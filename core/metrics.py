@@ -0,0 +1,211 @@
+"""
+Prometheus 텍스트 노출 형식(text/plain; version=0.0.4) 렌더러.
+모든 값은 프로세스 메모리의 카운터/히스토그램 스냅샷에서 읽으므로 수 초 간격으로 스크랩해도 부담이 없다.
+"""
+
+from src.utils.llm_limiter import get_limiter_stats
+from src.utils.llm_policy import get_provider_stats
+from src.utils.llm_router import (
+    get_llm_cache_stats,
+    get_llm_call_stats,
+    get_llm_route_decisions,
+    get_llm_route_stats,
+)
+from scripts.git_manager import get_git_command_stats
+from scripts.run_journal import get_journal_stats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+
+class _MetricWriter:
+    def __init__(self):
+        self._lines = []
+
+    def family(self, name: str, metric_type: str, help_text: str, samples):
+        """samples: [(labels, value)] 또는 [(suffix, labels, value)]"""
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {metric_type}")
+        for sample in samples:
+            if len(sample) == 3:
+                suffix, labels, value = sample
+            else:
+                suffix, (labels, value) = "", sample
+            self._lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+
+def render_prometheus_metrics(telemetry=None) -> str:
+    writer = _MetricWriter()
+
+    if telemetry is not None:
+        counters = telemetry.counters()
+        writer.family(
+            "builder_components_total", "counter", "Components resolved by pipeline runs.",
+            [((), counters.get("total_requested", 0))],
+        )
+        writer.family(
+            "builder_component_cache_hits_total", "counter", "Components served from the library without an LLM call.",
+            [((), counters.get("cache_hits", 0))],
+        )
+        writer.family(
+            "builder_component_llm_generations_total", "counter", "Components generated by an LLM call.",
+            [((), counters.get("llm_generations", 0))],
+        )
+        writer.family(
+            "builder_component_cache_efficiency_ratio", "gauge", "Share of components served from the library (0-1).",
+            [((), telemetry.get_efficiency_rate() / 100.0)],
+        )
+        writer.family(
+            "builder_page_cache_lookups_total", "counter", "Whole-page result cache lookups by outcome.",
+            [
+                ((("result", "hit"),), counters.get("page_cache_hits", 0)),
+                ((("result", "miss"),), counters.get("page_cache_misses", 0)),
+            ],
+        )
+        writer.family(
+            "builder_runs_total", "counter", "Finished pipeline runs by final status.",
+            [
+                ((("status", name[len("runs_"):]),), value)
+                for name, value in sorted(counters.items())
+                if name.startswith("runs_")
+            ],
+        )
+        writer.family(
+            "builder_speculative_components_total", "counter",
+            "Speculative component prefetches started while the Customer LLM parses, and how they ended.",
+            [
+                ((("outcome", outcome),), counters.get(f"speculative_{outcome}", 0))
+                for outcome in ("started", "used", "wasted", "cancelled", "wasted_generations")
+            ],
+        )
+        writer.family(
+            "builder_deadline_exceeded_total", "counter", "Runs whose time budget ran out, by the stage that hit it.",
+            [
+                ((("stage", name[len("deadline_exceeded_"):]),), value)
+                for name, value in sorted(counters.items())
+                if name.startswith("deadline_exceeded_")
+            ],
+        )
+
+        gauges = telemetry.gauges()
+        for gauge_name, help_text in (
+            ("inflight_runs", "Pipeline runs currently executing."),
+            ("stage_active", "Tasks currently holding a stage slot."),
+            ("stage_queue_depth", "Tasks waiting for a stage slot."),
+        ):
+            samples = [
+                (labels, value)
+                for (name, labels), value in sorted(gauges.items())
+                if name == gauge_name
+            ]
+            if samples:
+                writer.family(f"builder_{gauge_name}", "gauge", help_text, samples)
+
+        samples = []
+        for stage, snapshot in sorted(telemetry.histogram_snapshots().items()):
+            cumulative = 0
+            for upper, count in zip(snapshot["buckets"] + (float("inf"),), snapshot["counts"]):
+                cumulative += count
+                samples.append(("_bucket", (("stage", stage), ("le", _format_value(float(upper)))), cumulative))
+            samples.append(("_sum", (("stage", stage),), snapshot["sum"]))
+            samples.append(("_count", (("stage", stage),), snapshot["count"]))
+        writer.family("builder_stage_latency_seconds", "histogram", "Pipeline stage latency.", samples)
+
+    llm_stats = sorted(get_llm_call_stats().items())
+    llm_labels = lambda key: (("role", key[0]), ("provider", key[1]), ("model", key[2]))
+    writer.family(
+        "builder_llm_calls_total", "counter", "LLM calls by role, provider and model.",
+        [(llm_labels(key), stats["calls"]) for key, stats in llm_stats],
+    )
+    writer.family(
+        "builder_llm_call_errors_total", "counter", "Failed LLM calls by role, provider and model.",
+        [(llm_labels(key), stats["errors"]) for key, stats in llm_stats],
+    )
+    writer.family(
+        "builder_llm_call_seconds_total", "counter", "Cumulative LLM call latency.",
+        [(llm_labels(key), stats["seconds"]) for key, stats in llm_stats],
+    )
+    writer.family(
+        "builder_llm_cache_lookups_total", "counter", "Prompt-response cache lookups by role and result.",
+        [((("role", role), ("result", result)), count) for (role, result), count in sorted(get_llm_cache_stats().items())],
+    )
+    writer.family(
+        "builder_llm_route_events_total", "counter",
+        "LLM routing events by role: hedged/failover requests, cancelled losers and wins by a non-primary provider.",
+        [((("role", role), ("event", event)), count) for (role, event), count in sorted(get_llm_route_stats().items())],
+    )
+    writer.family(
+        "builder_llm_route_decisions_total", "counter",
+        "Provider/model picked as first choice by the role's routing policy (cache hits excluded).",
+        [
+            ((("role", role), ("policy", policy), ("provider", provider), ("model", model)), count)
+            for (role, policy, provider, model), count in sorted(get_llm_route_decisions().items())
+        ],
+    )
+    provider_stats = sorted(get_provider_stats().items())
+    for name, field, help_text in (
+        ("builder_llm_latency_ewma_seconds", "latency_ewma", "EWMA of successful LLM call latency."),
+        ("builder_llm_latency_p95_seconds", "p95", "p95 of recent successful LLM call latency."),
+        ("builder_llm_error_rate_ewma", "error_ewma", "EWMA of the LLM call error rate (0-1)."),
+        ("builder_llm_cost_ewma_usd", "cost_ewma", "EWMA of the estimated cost of one LLM call in USD."),
+    ):
+        writer.family(
+            name, "gauge", help_text,
+            [(llm_labels(key), stats[field]) for key, stats in provider_stats if stats[field] is not None],
+        )
+
+    limiter_stats = sorted(get_limiter_stats().items())
+    writer.family(
+        "builder_llm_limiter_queue_depth", "gauge", "LLM calls waiting for a provider rate/concurrency slot.",
+        [
+            ((("provider", provider), ("role", role)), depth)
+            for provider, stats in limiter_stats for role, depth in sorted(stats["queued"].items())
+        ],
+    )
+    writer.family(
+        "builder_llm_limiter_inflight", "gauge", "LLM calls currently holding a provider slot.",
+        [((("provider", provider),), stats["inflight"]) for provider, stats in limiter_stats],
+    )
+    wait_samples = [
+        ((("provider", provider), ("role", role)), waits)
+        for provider, stats in limiter_stats for role, waits in sorted(stats["waits"].items())
+    ]
+    writer.family(
+        "builder_llm_limiter_waits_total", "counter", "LLM calls that had to queue for a provider slot.",
+        [(labels, waits["waits"]) for labels, waits in wait_samples],
+    )
+    writer.family(
+        "builder_llm_limiter_wait_seconds_total", "counter", "Cumulative time LLM calls spent queued for a provider slot.",
+        [(labels, waits["seconds"]) for labels, waits in wait_samples],
+    )
+
+    writer.family(
+        "builder_git_commands_total", "counter",
+        "Git invocations: one-shot subprocesses, persistent channel spawns and channel requests.",
+        [((("kind", kind), ("command", name)), count) for (kind, name), count in sorted(get_git_command_stats().items())],
+    )
+    writer.family(
+        "builder_journal_writes_total", "counter", "Run journal writes by kind.",
+        [((("kind", kind),), count) for kind, count in sorted(get_journal_stats().items())],
+    )
+    return writer.render()
@@ -1,5 +1,11 @@
+import asyncio
 import atexit
+import bisect
+import collections
 import concurrent.futures
+import contextlib
+import functools
+import html
 import json
 import os
 import signal
@@ -17,33 +23,336 @@ from worktrees.customer_agent.agent import CustomerAgent
 from worktrees.generation_agent.agent import GenerationAgent
 from worktrees.composition_agent.agent import CompositionAgent
 from worktrees.methodology_agent.agent import MethodologyAgent
-from scripts.git_manager import GitManager
+from scripts.git_manager import GitManager, WorktreePool
+from core.artifact_store import ArtifactStore
+from core.result_cache import PageResultCache
+from src.utils.deadline import Deadline
+from scripts.run_journal import (
+    RunJournal,
+    compact_finished,
+    is_active,
+    iter_active_journals,
+    iter_running_journals,
+    legacy_sweep_done,
+    load_journal,
+    mark_legacy_sweep_done,
+    write_summary,
+)
+
+# 단계별 지연 히스토그램의 고정 버킷 상한 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TELEMETRY_STAGES = ("pipeline", "customer", "generation", "qa", "git", "merge", "composition")
+# 대시보드 롤링 윈도우 (라벨, 초)
+ROLLING_WINDOWS = (("1m", 60), ("5m", 300), ("1h", 3600))
+
+
+class LatencyHistogram:
+    """고정 버킷 지연 히스토그램. 기록은 짧은 락 한 번, 백분위는 버킷 내 선형 보간으로 추정."""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        seconds = max(0.0, float(seconds))
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "buckets": self.buckets,
+                "counts": list(self._counts),
+                "count": self._count,
+                "sum": self._sum,
+                "max": self._max,
+            }
+
+    @staticmethod
+    def percentile_from(snapshot: dict, q: float) -> float:
+        total = snapshot["count"]
+        if total == 0:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        lower = 0.0
+        for index, count in enumerate(snapshot["counts"]):
+            upper = snapshot["buckets"][index] if index < len(snapshot["buckets"]) else snapshot["max"]
+            if count and cumulative + count >= rank:
+                upper = min(upper, snapshot["max"])
+                return lower + (upper - lower) * ((rank - cumulative) / count)
+            cumulative += count
+            lower = upper
+        return snapshot["max"]
+
+    def percentiles(self) -> dict:
+        snapshot = self.snapshot()
+        return {
+            "count": snapshot["count"],
+            "p50": self.percentile_from(snapshot, 0.50),
+            "p95": self.percentile_from(snapshot, 0.95),
+            "p99": self.percentile_from(snapshot, 0.99),
+        }
+
+
+class RollingWindow:
+    """
+    최근 horizon_seconds 동안의 카운터/지연 히스토그램을 slot_seconds 단위 슬롯으로 보관.
+    summary(window)는 최근 window초에 해당하는 슬롯만 합산한다. (호출자가 락을 보장)
+    """
+    def __init__(self, slot_seconds: int = 10, horizon_seconds: int = 3600, buckets=LATENCY_BUCKETS):
+        self.slot_seconds = slot_seconds
+        self.horizon_slots = max(1, horizon_seconds // slot_seconds)
+        self.buckets = tuple(buckets)
+        self._slots = {}  # slot_id -> {"counters", "latency"}
+
+    def _slot(self, now: float) -> dict:
+        slot_id = int(now // self.slot_seconds)
+        slot = self._slots.get(slot_id)
+        if slot is None:
+            slot = {"counters": collections.Counter(), "latency": {}}
+            self._slots[slot_id] = slot
+            # 새 슬롯이 생길 때(최대 slot_seconds마다 한 번)만 horizon 밖의 슬롯을 정리
+            oldest = max(self._slots) - self.horizon_slots
+            for stale_id in [existing for existing in self._slots if existing <= oldest]:
+                del self._slots[stale_id]
+        return slot
+
+    def add(self, name: str, amount: int = 1, now: float = None):
+        self._slot(time.time() if now is None else now)["counters"][name] += amount
+
+    def observe(self, stage: str, seconds: float, now: float = None):
+        latency = self._slot(time.time() if now is None else now)["latency"]
+        entry = latency.get(stage)
+        if entry is None:
+            entry = latency[stage] = {"counts": [0] * (len(self.buckets) + 1), "count": 0, "sum": 0.0, "max": 0.0}
+        entry["counts"][bisect.bisect_left(self.buckets, seconds)] += 1
+        entry["count"] += 1
+        entry["sum"] += seconds
+        entry["max"] = max(entry["max"], seconds)
+
+    def summary(self, window_seconds: int, now: float = None) -> dict:
+        now = time.time() if now is None else now
+        first_slot = int(now // self.slot_seconds) - max(1, window_seconds // self.slot_seconds) + 1
+        counters = collections.Counter()
+        latency = {}
+        for slot_id, slot in self._slots.items():
+            if slot_id < first_slot:
+                continue
+            counters.update(slot["counters"])
+            for stage, entry in slot["latency"].items():
+                merged = latency.setdefault(
+                    stage,
+                    {"buckets": self.buckets, "counts": [0] * (len(self.buckets) + 1), "count": 0, "sum": 0.0, "max": 0.0},
+                )
+                merged["counts"] = [a + b for a, b in zip(merged["counts"], entry["counts"])]
+                merged["count"] += entry["count"]
+                merged["sum"] += entry["sum"]
+                merged["max"] = max(merged["max"], entry["max"])
+        return {"counters": counters, "latency": latency}
+
 
 class Telemetry:
-    """GSD 체계 하에서 컴포넌트 처리 효율성(토큰 절감)을 기록하는 모듈"""
+    """
+    GSD 체계 하에서 컴포넌트 처리 효율성(토큰 절감)과 단계별 지연을 기록하는 모듈.
+    여러 스레드/이벤트 루프에서 동시에 기록해도 안전하다.
+    - 카운터: increment(name) (cache_hits, llm_generations, runs_<status> 등)
+    - 단계별 지연 히스토그램: observe(stage, seconds) / with time_stage(stage)
+    - 게이지: 진행 중 run 수, register_gauge()로 등록한 콜백(단계별 대기열 깊이 등)
+    - 롤링 윈도우: window_summary(seconds)로 최근 1m/5m/1h 집계 (대시보드용)
+    """
     def __init__(self):
-        self.total_requested = 0
-        self.cache_hits = 0
-        self.llm_generations = 0
+        self._lock = threading.Lock()
+        self._counters = collections.Counter()
+        self._rolling = RollingWindow()
+        self._histograms = {stage: LatencyHistogram() for stage in TELEMETRY_STAGES}
+        self._gauges = {}
+        self._inflight_runs = 0
+
+    # --- 카운터 ---
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+            self._rolling.add(name, amount)
+
+    def counter(self, name: str) -> int:
+        with self._lock:
+            return self._counters[name]
+
+    def counters(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
 
     def record_hit(self):
-        self.cache_hits += 1
-        self.total_requested += 1
+        with self._lock:
+            for name in ("cache_hits", "total_requested"):
+                self._counters[name] += 1
+                self._rolling.add(name)
 
     def record_miss(self):
-        self.llm_generations += 1
-        self.total_requested += 1
+        with self._lock:
+            for name in ("llm_generations", "total_requested"):
+                self._counters[name] += 1
+                self._rolling.add(name)
+
+    @property
+    def total_requested(self) -> int:
+        return self.counter("total_requested")
+
+    @property
+    def cache_hits(self) -> int:
+        return self.counter("cache_hits")
+
+    @property
+    def llm_generations(self) -> int:
+        return self.counter("llm_generations")
 
     def get_efficiency_rate(self) -> float:
-        if self.total_requested == 0: return 0.0
-        return (self.cache_hits / self.total_requested) * 100
+        with self._lock:
+            total = self._counters["total_requested"]
+            hits = self._counters["cache_hits"]
+        if total == 0: return 0.0
+        return (hits / total) * 100
+
+    # --- 단계별 지연 ---
+    def _histogram(self, stage: str) -> LatencyHistogram:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, LatencyHistogram())
+        return histogram
+
+    def observe(self, stage: str, seconds: float):
+        seconds = max(0.0, float(seconds))
+        self._histogram(stage).observe(seconds)
+        with self._lock:
+            self._rolling.observe(stage, seconds)
+
+    @contextlib.contextmanager
+    def time_stage(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def stage_latencies(self) -> dict:
+        """단계별 {count, p50, p95, p99} (초)"""
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {stage: histogram.percentiles() for stage, histogram in histograms.items()}
+
+    def histogram_snapshots(self) -> dict:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {stage: histogram.snapshot() for stage, histogram in histograms.items()}
+
+    # --- 게이지 ---
+    def run_started(self):
+        with self._lock:
+            self._inflight_runs += 1
+
+    def run_finished(self, status: str):
+        with self._lock:
+            self._inflight_runs -= 1
+            self._counters[f"runs_{status}"] += 1
+            self._rolling.add(f"runs_{status}")
+
+    @property
+    def inflight_runs(self) -> int:
+        with self._lock:
+            return self._inflight_runs
+
+    def register_gauge(self, name: str, labels: tuple, callback):
+        """조회 시점에 callback()으로 값을 읽는 게이지 등록 (labels: ((key, value), ...))"""
+        with self._lock:
+            self._gauges[(name, tuple(labels))] = callback
+
+    def gauges(self) -> dict:
+        with self._lock:
+            gauges = dict(self._gauges)
+            inflight_runs = self._inflight_runs
+        values = {("inflight_runs", ()): inflight_runs}
+        for key, callback in gauges.items():
+            try:
+                values[key] = callback()
+            except Exception:
+                continue
+        return values
+
+    def window_summary(self, window_seconds: int) -> dict:
+        """최근 window_seconds 동안의 {total, hits, misses, efficiency, runs, latency{stage: p50/p95/p99}}"""
+        with self._lock:
+            summary = self._rolling.summary(window_seconds)
+        counters = summary["counters"]
+        total = counters["total_requested"]
+        return {
+            "total": total,
+            "hits": counters["cache_hits"],
+            "misses": counters["llm_generations"],
+            "efficiency": (counters["cache_hits"] / total * 100) if total else 0.0,
+            "runs": {name[len("runs_"):]: value for name, value in counters.items() if name.startswith("runs_")},
+            "latency": {
+                stage: {
+                    "count": snapshot["count"],
+                    "p50": LatencyHistogram.percentile_from(snapshot, 0.50),
+                    "p95": LatencyHistogram.percentile_from(snapshot, 0.95),
+                    "p99": LatencyHistogram.percentile_from(snapshot, 0.99),
+                }
+                for stage, snapshot in summary["latency"].items()
+            },
+        }
 
-    def generate_dashboard_html(self, phase, output_path=None):
-        if output_path is None:
-            output_path = os.path.join(os.path.dirname(__file__), '..', 'output', 'dashboard.html')
-            
-        efficiency = self.get_efficiency_rate()
-        html_content = f"""<!DOCTYPE html>
+    def render_dashboard_html(self, phase) -> str:
+        """메모리의 텔레메트리로 대시보드 HTML 렌더링 (웹 /dashboard 및 opt-in 파일 기록 공용)"""
+        windows = [(label, self.window_summary(seconds)) for label, seconds in ROLLING_WINDOWS]
+        gauges = self.gauges()
+
+        cards = []
+        for label, window in windows:
+            runs = ", ".join(f"{status} {count}" for status, count in sorted(window["runs"].items())) or "-"
+            cards.append(f"""
+            <div class="bg-gray-50 p-4 rounded-lg border border-gray-200">
+                <div class="text-sm text-gray-500 font-bold uppercase tracking-wide">Last {label}</div>
+                <div class="mt-2 text-sm">Components <span class="font-bold text-blue-700">{window['total']}</span>
+                    · Hits <span class="font-bold text-green-700">{window['hits']}</span>
+                    · LLM <span class="font-bold text-yellow-700">{window['misses']}</span></div>
+                <div class="w-full bg-gray-200 rounded-full h-4 overflow-hidden mt-2">
+                    <div class="bg-gradient-to-r from-green-400 to-green-600 h-4 text-xs font-bold text-white text-center leading-4" style="width: {window['efficiency']:.1f}%">{window['efficiency']:.1f}%</div>
+                </div>
+                <div class="mt-2 text-xs text-gray-500">Runs: {html.escape(runs)}</div>
+            </div>""")
+
+        latency_rows = []
+        for stage in TELEMETRY_STAGES:
+            cells = []
+            for _, window in windows:
+                stats = window["latency"].get(stage)
+                if not stats or not stats["count"]:
+                    cells.append('<td class="px-3 py-1 text-gray-400">-</td>')
+                    continue
+                cells.append(
+                    f'<td class="px-3 py-1">{stats["p50"] * 1000:.0f} / {stats["p95"] * 1000:.0f} / '
+                    f'{stats["p99"] * 1000:.0f} ms <span class="text-gray-400">(n={stats["count"]})</span></td>'
+                )
+            latency_rows.append(f'<tr class="border-t"><td class="px-3 py-1 font-semibold">{stage}</td>{"".join(cells)}</tr>')
+
+        queue_depths = ", ".join(
+            f"{dict(labels).get('stage')} {value}"
+            for (name, labels), value in sorted(gauges.items())
+            if name == "stage_queue_depth"
+        ) or "-"
+        window_headers = "".join(f'<th class="px-3 py-1 text-left">{label} p50 / p95 / p99</th>' for label, _ in windows)
+
+        return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -52,45 +361,154 @@ class Telemetry:
     <script src="https://cdn.tailwindcss.com"></script>
 </head>
 <body class="bg-gray-100 p-8 font-sans text-gray-800">
-    <div class="max-w-3xl mx-auto bg-white rounded-xl shadow-lg p-6">
+    <div class="max-w-5xl mx-auto bg-white rounded-xl shadow-lg p-6">
         <h1 class="text-3xl font-bold mb-2">🚀 AI Builder Telemetry Dashboard</h1>
-        <p class="text-gray-500 mb-6">Current Phase: <span class="font-semibold text-blue-600">{phase}</span></p>
-        
-        <div class="grid grid-cols-1 md:grid-cols-3 gap-4 mb-8">
-            <div class="bg-blue-50 p-4 rounded-lg border border-blue-100 text-center">
-                <div class="text-sm text-blue-500 font-bold uppercase tracking-wide">Total Components</div>
-                <div class="text-4xl font-extrabold text-blue-700 mt-2">{self.total_requested}</div>
-            </div>
-            <div class="bg-green-50 p-4 rounded-lg border border-green-100 text-center">
-                <div class="text-sm text-green-500 font-bold uppercase tracking-wide">Cache Hits (Tokens Saved)</div>
-                <div class="text-4xl font-extrabold text-green-700 mt-2">{self.cache_hits}</div>
-            </div>
-            <div class="bg-yellow-50 p-4 rounded-lg border border-yellow-100 text-center">
-                <div class="text-sm text-yellow-500 font-bold uppercase tracking-wide">LLM Generations</div>
-                <div class="text-4xl font-extrabold text-yellow-700 mt-2">{self.llm_generations}</div>
-            </div>
+        <p class="text-gray-500 mb-6">Current Phase: <span class="font-semibold text-blue-600">{html.escape(str(phase))}</span>
+            · In-flight runs: <span class="font-semibold">{gauges.get(("inflight_runs", ()), 0)}</span>
+            · Queue depth: <span class="font-semibold">{html.escape(queue_depths)}</span></p>
+
+        <div class="grid grid-cols-1 md:grid-cols-3 gap-4 mb-8">{"".join(cards)}
         </div>
 
         <div class="mb-4">
-            <h2 class="text-xl font-bold mb-2">Token Savings Efficiency</h2>
-            <div class="w-full bg-gray-200 rounded-full h-6 overflow-hidden">
-                <div class="bg-gradient-to-r from-green-400 to-green-600 h-6 text-xs font-bold text-white text-center p-1 leading-none transition-all duration-1000" style="width: {efficiency}%">
-                    {efficiency:.1f}% Cached
-                </div>
-            </div>
+            <h2 class="text-xl font-bold mb-2">Stage Latency</h2>
+            <table class="w-full text-sm">
+                <thead><tr class="text-gray-500"><th class="px-3 py-1 text-left">Stage</th>{window_headers}</tr></thead>
+                <tbody>{"".join(latency_rows)}</tbody>
+            </table>
             <p class="text-sm text-gray-500 mt-2">Target savings rate: >50% (GSD Standard)</p>
         </div>
-        
+
         <div class="mt-8 text-sm text-gray-400 border-t pt-4">
-            * Dashboard updated automatically by Orchestrator.
+            * Rendered from in-memory telemetry at {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC.
         </div>
     </div>
 </body>
 </html>"""
+
+    def generate_dashboard_html(self, phase, output_path=None):
+        if output_path is None:
+            output_path = os.path.join(os.path.dirname(__file__), '..', 'output', 'dashboard.html')
+
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            f.write(self.render_dashboard_html(phase))
         return output_path
 
+class StageQueueFullError(RuntimeError):
+    """단계별 대기열 한도를 넘어 더 이상 요청을 받을 수 없을 때 발생 (웹에서는 503으로 응답)"""
+
+
+class StageGate:
+    """
+    이벤트 루프/스레드와 무관하게 프로세스 전체에서 공유되는 단계별 동시 실행 한도.
+    한도를 넘는 요청은 FIFO로 대기하고, 대기열이 max_queue를 넘으면 StageQueueFullError로 즉시 거절한다.
+    (asyncio.Semaphore는 루프에 묶이므로 run_pipeline 호출마다 새 루프가 생기는 구조에서는 전역 상한이 되지 못함)
+    """
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = max(1, int(limit))
+        self.max_queue = max(0, int(max_queue))
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = collections.deque()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                raise StageQueueFullError(
+                    f"{self.name} stage queue is full (limit={self.limit}, queued={len(self._waiters)})"
+                )
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    handed_over = False
+                except ValueError:
+                    handed_over = True
+            # 이미 슬롯을 넘겨받은 뒤 취소됐다면 다음 대기자에게 넘긴다
+            if handed_over and waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if loop.is_closed():
+                    continue
+                # 슬롯을 대기자에게 직접 넘기므로 active 수는 유지
+                loop.call_soon_threadsafe(self._grant, future)
+                return
+            self._active -= 1
+
+    def _grant(self, future):
+        if future.cancelled():
+            self.release()
+            return
+        future.set_result(True)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+class RunEventStream:
+    """
+    run 하나의 이벤트를 event_sink(dict)로 내보낸다. 이벤트 루프 스레드에서만 호출된다.
+    - 진행 이벤트: started, parsed, component, qa, merged, composed
+    - 섹션 스트리밍(html 조각): shell, section, shell_close, page
+      컴포넌트는 QA를 통과하는 대로 complete()되지만 섹션은 index 순서로만 내보낸다
+      (앞선 컴포넌트가 끝나야 뒤 섹션이 나가며, QA 실패/오류 컴포넌트는 건너뛴다).
+    """
+    def __init__(self, event_sink):
+        self._event_sink = event_sink
+        self._next_index = 0
+        self._pending = {}
+        self._chunks = []
+
+    def emit(self, event_type: str, html_chunk: str = None, **fields):
+        event = {"type": event_type, **fields}
+        if html_chunk is not None:
+            event["html"] = html_chunk
+            self._chunks.append(html_chunk)
+        try:
+            self._event_sink(event)
+        except Exception as e:
+            print(f"[Stream] event_sink 오류 ({event_type}): {e}")
+
+    def complete(self, index: int, component: str, section_html: str = None):
+        self._pending[index] = (component, section_html)
+        while self._next_index in self._pending:
+            component, section_html = self._pending.pop(self._next_index)
+            if section_html is not None:
+                self.emit("section", section_html, index=self._next_index, component=component)
+            self._next_index += 1
+
+    def document(self) -> str:
+        return "".join(self._chunks)
+
+
 class Orchestrator:
     """
     생애주기 오케스트레이터: GDS 단계에 따라 에이전트들의 실행 파이프라인 제어
@@ -101,6 +519,7 @@ class Orchestrator:
     _hooks_registered = False
     _startup_recovery_done = False
     _startup_recovery_running = False
+    _legacy_sweep_started = False
     _previous_signal_handlers = {}
     _last_signal = None
 
@@ -125,15 +544,49 @@ class Orchestrator:
         )
         os.makedirs(self.runtime_output_dir, exist_ok=True)
         self.disable_merge_to_main = self._env_flag("ORCHESTRATOR_DISABLE_MERGE", default=False)
+        self.write_dashboard_file = self._env_flag("ORCHESTRATOR_WRITE_DASHBOARD", default=False)
+        self.speculative_prefetch = self._env_flag("ORCHESTRATOR_SPECULATIVE_PREFETCH", default=True)
+        self.git_commit_mode = self._resolve_git_commit_mode()
 
         self.telemetry = Telemetry()
         self.git_manager = GitManager(self.repo_root)
+
+        # 단계별 동시 실행 한도/스레드 풀은 인스턴스 수명 동안 한 번만 만들고 모든 run이 공유
+        self.stage_limits = self._get_agent_thread_pool_config()
+        self.stage_queue_limits = self._get_stage_queue_limit_config()
+        self._stage_gates = {
+            stage: StageGate(stage, limit, self.stage_queue_limits[stage])
+            for stage, limit in self.stage_limits.items()
+        }
+        for stage, gate in self._stage_gates.items():
+            self.telemetry.register_gauge("stage_active", (("stage", stage),), lambda gate=gate: gate.active)
+            self.telemetry.register_gauge("stage_queue_depth", (("stage", stage),), lambda gate=gate: gate.queued)
+        self._stage_executors = {
+            stage: concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.stage_limits[stage],
+                thread_name_prefix=f"{stage.capitalize()}Agent",
+            )
+            for stage in ("generation", "methodology", "composition")
+        }
+        self._executors_shutdown = False
+
+        self.worktree_pool = None
+        if self.git_commit_mode == "worktree":
+            # 워크트리 슬롯 수는 Generation 스레드 수와 동일 (동시에 커밋할 수 있는 작업자 수)
+            self.worktree_pool = WorktreePool(self.git_manager, self.stage_limits["generation"])
         self.journal_dir = os.path.join(self.runtime_output_dir, "orchestrator_runs")
         os.makedirs(self.journal_dir, exist_ok=True)
+        # run별 append-only 이벤트 저널 (종료 시 run_*.json 요약으로 compact)
+        self.run_journal = RunJournal(self.journal_dir)
+        # 동일 구성/의도/모델/라이브러리 버전의 페이지는 파이프라인을 다시 돌리지 않고 저장된 HTML을 반환
+        self.page_cache = None
+        if self._env_flag("PAGE_CACHE_ENABLED", default=True):
+            self.page_cache = PageResultCache(os.path.join(self.runtime_output_dir, "page_cache"))
+        # run별 산출물(builder_output.html, dashboard.html)은 run_id 매니페스트 + 내용 주소 객체로 저장
+        self.artifact_store = ArtifactStore(os.path.join(self.runtime_output_dir, "artifacts"))
 
         self._state_lock = threading.Lock()
         self._active_resources = {}
-        self._run_journal_paths = {}
 
         self._register_process_hooks()
         self._run_startup_recovery_once()
@@ -151,6 +604,15 @@ class Orchestrator:
             return False
         return default
 
+    @staticmethod
+    def _resolve_git_commit_mode() -> str:
+        # plumbing: 워킹 디렉토리 없이 object DB에 직접 커밋 (기본값)
+        # worktree: 컴포넌트마다 임시 worktree를 만들어 add/commit (기존 방식)
+        mode = os.getenv("ORCHESTRATOR_GIT_COMMIT_MODE", "plumbing").strip().lower()
+        if mode not in ("plumbing", "worktree"):
+            return "plumbing"
+        return mode
+
     @staticmethod
     def _utcnow_iso() -> str:
         return datetime.now(timezone.utc).isoformat()
@@ -163,6 +625,16 @@ class Orchestrator:
 
         for instance in list(cls._instances):
             instance._cleanup_all_active_resources(reason)
+            instance.shutdown()
+
+    def shutdown(self, wait: bool = True):
+        """인스턴스가 소유한 단계별 스레드 풀을 정리합니다 (대기 중인 작업은 취소)."""
+        with self._state_lock:
+            if self._executors_shutdown:
+                return
+            self._executors_shutdown = True
+        for executor in self._stage_executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
 
     @classmethod
     def _handle_signal(cls, signum, frame):
@@ -212,19 +684,9 @@ class Orchestrator:
                     Orchestrator._startup_recovery_done = True
                 Orchestrator._startup_recovery_running = False
 
-    def _write_json_atomic(self, path: str, payload: dict):
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        temp_path = f"{path}.tmp"
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-        os.replace(temp_path, path)
-
     def _create_run_id(self) -> str:
         return f"run_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}"
 
-    def _run_journal_path(self, run_id: str) -> str:
-        return os.path.join(self.journal_dir, f"{run_id}.json")
-
     def _snapshot_run_resources(self, run_id: str) -> list:
         with self._state_lock:
             resources = [
@@ -235,59 +697,43 @@ class Orchestrator:
         resources.sort(key=lambda item: (item.get("component") or "", item.get("branch_name") or ""))
         return resources
 
-    def _start_run_journal(self, session_id: str, user_request: str) -> str:
-        run_id = self._create_run_id()
-        journal_path = self._run_journal_path(run_id)
-        with self._state_lock:
-            self._run_journal_paths[run_id] = journal_path
-
-        payload = {
-            "run_id": run_id,
-            "session_id": session_id,
-            "status": "running",
-            "request": user_request,
-            "created_at": self._utcnow_iso(),
-            "updated_at": self._utcnow_iso(),
-            "finished_at": None,
-            "error": None,
-            "resources": [],
-        }
-        self._write_json_atomic(journal_path, payload)
+    def _start_run_journal(self, session_id: str, user_request: str, run_id: str = None) -> str:
+        run_id = run_id or self._create_run_id()
+        self.run_journal.start(run_id, session_id, user_request)
         return run_id
 
-    def _update_run_journal(self, run_id: str, status: str = None, error_marker: str = None, finished: bool = False):
-        with self._state_lock:
-            journal_path = self._run_journal_paths.get(run_id, self._run_journal_path(run_id))
-            self._run_journal_paths[run_id] = journal_path
+    def load_run_journal(self, run_id: str):
+        """run_id의 저널 payload (진행 중이면 이벤트 로그 재생, 끝났으면 요약). 없으면 None."""
+        for path in (self.run_journal.path_for(run_id), self.run_journal.summary_path_for(run_id)):
+            if os.path.exists(path):
+                return load_journal(path)
+        return None
 
-        try:
-            if os.path.exists(journal_path):
-                with open(journal_path, 'r', encoding='utf-8') as f:
-                    payload = json.load(f)
-            else:
-                payload = {"run_id": run_id}
-        except Exception:
-            payload = {"run_id": run_id}
+    def _finish_run_journal(self, run_id: str, status: str, error_marker: str = None):
+        self.run_journal.set_status(run_id, status=status, error=error_marker, finished=True)
 
-        payload["updated_at"] = self._utcnow_iso()
-        payload["resources"] = self._snapshot_run_resources(run_id)
+    def _create_run_deadline(self, run_id: str, deadline=None) -> Deadline:
+        def on_timeout(stage: str):
+            self.telemetry.increment(f"deadline_exceeded_{stage}")
+            self.run_journal.deadline_exceeded(run_id, stage)
 
-        if status is not None:
-            payload["status"] = status
-        if error_marker is not None:
-            payload["error"] = error_marker
-        if finished:
-            payload["finished_at"] = self._utcnow_iso()
+        return Deadline.coerce(deadline, on_timeout=on_timeout)
 
-        self._write_json_atomic(journal_path, payload)
+    def _build_component_resource(self, comp: str, run_id: str):
+        # 동시 실행이 같은 컴포넌트를 요청해도 충돌하지 않도록 브랜치 이름에 run 식별자를 포함
+        branch_name = f"feat/{comp}_gen_{run_id.rsplit('_', 1)[-1]}"
+        # plumbing 모드는 워킹 디렉토리가 없고, worktree 모드는 풀 슬롯을 잠시 빌렸다가 바로 반납하므로
+        # 실행 동안 남는 자원은 브랜치뿐이다.
+        return branch_name, None
 
-    def _build_component_resource(self, comp: str):
-        branch_name = f"feat/{comp}_gen"
-        worktree_path = os.path.join(self.repo_root, 'worktrees', f"temp_{comp}")
-        return branch_name, worktree_path
+    @staticmethod
+    def _normalize_worktree_path(worktree_path: str):
+        if not worktree_path:
+            return None
+        return os.path.abspath(worktree_path)
 
     def _track_resource(self, run_id: str, component: str, branch_name: str, worktree_path: str):
-        normalized_path = os.path.abspath(worktree_path)
+        normalized_path = self._normalize_worktree_path(worktree_path)
         resource_key = (branch_name, normalized_path)
         resource_value = {
             "run_id": run_id,
@@ -298,10 +744,10 @@ class Orchestrator:
         }
         with self._state_lock:
             self._active_resources[resource_key] = resource_value
-        self._update_run_journal(run_id)
+        self.run_journal.track(run_id, resource_value)
 
     def _untrack_resource(self, branch_name: str, worktree_path: str):
-        normalized_path = os.path.abspath(worktree_path)
+        normalized_path = self._normalize_worktree_path(worktree_path)
         resource_key = (branch_name, normalized_path)
         run_id = None
 
@@ -311,11 +757,17 @@ class Orchestrator:
                 run_id = existing.get("run_id")
 
         if run_id:
-            self._update_run_journal(run_id)
+            self.run_journal.untrack(run_id, branch_name, normalized_path)
+
+    def _release_git_resource(self, branch_name: str, worktree_path: str):
+        if worktree_path:
+            self.git_manager.remove_worktree(worktree_path, branch_name=branch_name, force=True)
+        elif branch_name:
+            self.git_manager.delete_branch(branch_name)
 
     def _safe_remove_resource(self, branch_name: str, worktree_path: str, context: str):
         try:
-            self.git_manager.remove_worktree(worktree_path, branch_name=branch_name, force=True)
+            self._release_git_resource(branch_name, worktree_path)
         except Exception as exc:
             print(f"[Cleanup] Warning ({context}) {branch_name}: {exc}")
         finally:
@@ -340,16 +792,33 @@ class Orchestrator:
 
         for run_id in run_ids:
             self._cleanup_run_resources(run_id, f"global-{reason}")
-            self._update_run_journal(
-                run_id,
-                status="interrupted",
-                error_marker=f"Cleanup triggered by {reason}",
-                finished=True,
-            )
+            self._finish_run_journal(run_id, "interrupted", f"Cleanup triggered by {reason}")
 
     def _recover_stale_worktrees(self):
         recovered_count = 0
 
+        # 0) 이전 프로세스가 쓰다 남긴 풀 슬롯은 삭제하지 않고 초기화 (브랜치 분리 후 재사용)
+        pool = self.worktree_pool or WorktreePool(self.git_manager, 1)
+        recovered_count += len(pool.recover())
+
+        journal_dirs = self._journal_dirs()
+
+        # 1) 활성 run 매니페스트에 남아있는 run만 복구 (누적 저널 수와 무관)
+        for journal_dir in journal_dirs:
+            for journal_path, payload in iter_active_journals(journal_dir):
+                recovered_count += self._recover_journal(journal_path, payload, "Recovered stale resources during startup.")
+
+        # 2) 저널에 없는 temp_* 워크트리 복구
+        stale_paths = self.git_manager.cleanup_stale_temp_worktrees()
+        recovered_count += len(stale_paths)
+
+        if recovered_count:
+            print(f"[Recovery] stale worktrees cleaned: {recovered_count}")
+
+        # 3) 매니페스트 도입 이전 저널은 백그라운드에서 한 번만 전체 스캔
+        self._start_legacy_journal_sweep(journal_dirs)
+
+    def _journal_dirs(self) -> list:
         journal_dirs = []
         for candidate in (
             self.journal_dir,
@@ -358,55 +827,71 @@ class Orchestrator:
             normalized = os.path.abspath(candidate)
             if normalized not in journal_dirs and os.path.isdir(normalized):
                 journal_dirs.append(normalized)
+        return journal_dirs
 
-        # 1) 실행 중 상태로 남아있는 저널 기반 복구
-        for journal_dir in journal_dirs:
-            for file_name in sorted(os.listdir(journal_dir)):
-                if not file_name.endswith(".json"):
-                    continue
+    def _recover_journal(self, journal_path: str, payload: dict, recovered_message: str) -> int:
+        recovered_count = 0
+        failed_resources = []
+        for resource in payload.get("resources", []):
+            branch_name = resource.get("branch_name")
+            worktree_path = resource.get("worktree_path")
+            if not worktree_path and not branch_name:
+                continue
+            try:
+                self._release_git_resource(branch_name, worktree_path)
+                recovered_count += 1
+            except Exception as exc:
+                resource_copy = dict(resource)
+                resource_copy["last_error"] = str(exc)
+                failed_resources.append(resource_copy)
+
+        if failed_resources:
+            payload["status"] = "partial_recovered"
+            payload["error"] = f"Recovered with {len(failed_resources)} resource(s) still failing cleanup."
+            payload["resources"] = failed_resources
+        else:
+            payload["status"] = "recovered"
+            payload["error"] = recovered_message
+            payload["resources"] = []
+        payload["updated_at"] = self._utcnow_iso()
+        payload["finished_at"] = self._utcnow_iso()
+        write_summary(journal_path, payload)
+        return recovered_count
 
-                journal_path = os.path.join(journal_dir, file_name)
-                try:
-                    with open(journal_path, 'r', encoding='utf-8') as f:
-                        payload = json.load(f)
-                except Exception:
-                    continue
+    def _start_legacy_journal_sweep(self, journal_dirs: list):
+        pending_dirs = [journal_dir for journal_dir in journal_dirs if not legacy_sweep_done(journal_dir)]
+        if not pending_dirs or not self._env_flag("ORCHESTRATOR_LEGACY_JOURNAL_SWEEP", True):
+            return
+        with Orchestrator._hooks_lock:
+            if Orchestrator._legacy_sweep_started:
+                return
+            Orchestrator._legacy_sweep_started = True
 
-                if payload.get("status") != "running":
-                    continue
+        thread = threading.Thread(
+            target=self._sweep_legacy_journals,
+            args=(pending_dirs,),
+            name="LegacyJournalSweeper",
+            daemon=True,
+        )
+        thread.start()
 
-                failed_resources = []
-                for resource in payload.get("resources", []):
-                    branch_name = resource.get("branch_name")
-                    worktree_path = resource.get("worktree_path")
-                    if not worktree_path:
+    def _sweep_legacy_journals(self, journal_dirs: list):
+        recovered_count = 0
+        try:
+            for journal_dir in journal_dirs:
+                compact_finished(journal_dir)
+                for journal_path, payload in iter_running_journals(journal_dir):
+                    # 매니페스트에 있는 run은 현재 실행 중이거나 시작 시 복구 대상이므로 건너뜀
+                    if is_active(journal_dir, payload.get("run_id")):
                         continue
-                    try:
-                        self.git_manager.remove_worktree(worktree_path, branch_name=branch_name, force=True)
-                        recovered_count += 1
-                    except Exception as exc:
-                        resource_copy = dict(resource)
-                        resource_copy["last_error"] = str(exc)
-                        failed_resources.append(resource_copy)
-
-                if failed_resources:
-                    payload["status"] = "partial_recovered"
-                    payload["error"] = f"Recovered with {len(failed_resources)} resource(s) still failing cleanup."
-                    payload["resources"] = failed_resources
-                else:
-                    payload["status"] = "recovered"
-                    payload["error"] = "Recovered stale resources during startup."
-                    payload["resources"] = []
-                payload["updated_at"] = self._utcnow_iso()
-                payload["finished_at"] = self._utcnow_iso()
-                self._write_json_atomic(journal_path, payload)
-
-        # 2) 저널에 없는 temp_* 워크트리 복구
-        stale_paths = self.git_manager.cleanup_stale_temp_worktrees()
-        recovered_count += len(stale_paths)
-
-        if recovered_count:
-            print(f"[Recovery] stale worktrees cleaned: {recovered_count}")
+                    recovered_count += self._recover_journal(
+                        journal_path, payload, "Recovered stale resources by legacy journal sweep."
+                    )
+                mark_legacy_sweep_done(journal_dir)
+        except Exception as exc:
+            print(f"[Recovery] legacy journal sweep failed: {exc}")
+            return
+        print(f"[Recovery] legacy journal sweep finished: dirs={len(journal_dirs)}, resources_cleaned={recovered_count}")
 
     def _resolve_worker_count(self, env_key: str, default: int) -> int:
         try:
@@ -415,6 +900,15 @@ class Orchestrator:
             value = default
         return max(1, value)
 
+    def _get_stage_queue_limit_config(self) -> dict:
+        default = self._resolve_worker_count("ORCHESTRATOR_STAGE_QUEUE_LIMIT", 256)
+        return {
+            "customer": self._resolve_worker_count("CUSTOMER_AGENT_QUEUE_LIMIT", default),
+            "generation": self._resolve_worker_count("GENERATION_AGENT_QUEUE_LIMIT", default),
+            "methodology": self._resolve_worker_count("METHODOLOGY_AGENT_QUEUE_LIMIT", default),
+            "composition": self._resolve_worker_count("COMPOSITION_AGENT_QUEUE_LIMIT", default),
+        }
+
     def _get_agent_thread_pool_config(self) -> dict:
         return {
             "customer": self._resolve_worker_count("CUSTOMER_AGENT_THREADS", 1),
@@ -423,206 +917,446 @@ class Orchestrator:
             "composition": self._resolve_worker_count("COMPOSITION_AGENT_THREADS", 1),
         }
 
-    def _generate_component_worker(self, comp: str):
-        branch_name, worktree_path = self._build_component_resource(comp)
-        
-        # 1. 워크트리 생성
+    def _commit_component_plumbing(self, comp: str, meta: dict, branch_name: str):
+        content = json.dumps(meta, ensure_ascii=False, indent=2)
         try:
-            self.git_manager.add_worktree(branch_name, worktree_path)
-        except Exception:
-            pass # ignore if already exists/fails
-            
-        # 2. GenerationAgent 연산 수행
-        file_path = os.path.join(self.generator.library_path, f"{comp}.json")
-        is_hit = os.path.exists(file_path)
-        
-        meta = self.generator.load_component_metadata(comp)
-        
-        # 3. 워크트리 내에 파일 저장 및 커밋
-        if os.path.exists(worktree_path):
-            comp_file = os.path.join(worktree_path, f"{comp}.json")
+            self.git_manager.commit_file_to_branch(
+                branch_name,
+                f"{comp}.json",
+                content,
+                f"Generation Agent: Created {comp}",
+            )
+        except Exception as exc:
+            print(f"   [Warning] {comp} plumbing 커밋 실패: {exc}")
+
+    def _commit_component_pooled(self, comp: str, meta: dict, branch_name: str):
+        slot_path = self.worktree_pool.lease()
+        try:
+            self.worktree_pool.checkout(slot_path, branch_name)
+            comp_file = os.path.join(slot_path, f"{comp}.json")
             with open(comp_file, 'w', encoding='utf-8') as f:
                 json.dump(meta, f, ensure_ascii=False, indent=2)
-                
+
             try:
-                self.git_manager.commit_changes(worktree_path, f"Generation Agent: Created {comp}")
+                self.git_manager.commit_changes(slot_path, f"Generation Agent: Created {comp}")
             except Exception:
                 pass # 아무 변경사항 없음
-                
+        except Exception as exc:
+            print(f"   [Warning] {comp} worktree 커밋 실패: {exc}")
+        finally:
+            # 커밋이 끝나면 브랜치를 떼어내고 슬롯을 즉시 반납 (병합은 브랜치 기준)
+            self.worktree_pool.release(slot_path)
+
+    def _commit_component(self, comp: str, meta: dict, branch_name: str):
+        # worktree 모드는 풀 슬롯을 생성 완료 후에만 점유
+        if self.worktree_pool is not None:
+            self._commit_component_pooled(comp, meta, branch_name)
+        else:
+            self._commit_component_plumbing(comp, meta, branch_name)
+
+    async def _run_in_stage(self, stage: str, func, *args):
+        # 블로킹 작업(git, 파일, QA)은 인스턴스 소유의 단계별 스레드 풀에서 실행
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._stage_executors[stage], functools.partial(func, *args))
+
+    # --- 선행(speculative) 생성: Customer LLM 파싱과 병렬로 예측 컴포넌트를 미리 해석 ---
+
+    def _start_speculative_prefetch(self, user_request: str, deadline: Deadline) -> dict:
+        if not self.speculative_prefetch:
+            return {}
+        try:
+            predicted = self.customer.predict_components(user_request)
+        except Exception as e:
+            print(f"[Speculative] 컴포넌트 예측 실패: {e}")
+            return {}
+        if not predicted:
+            return {}
+        print(f"[Speculative] Customer 파싱과 병렬로 선행 생성: {', '.join(predicted)}")
+        self.telemetry.increment("speculative_started", len(predicted))
+        return {comp: asyncio.ensure_future(self._speculate_component(comp, deadline)) for comp in predicted}
+
+    async def _speculate_component(self, comp: str, deadline: Deadline):
+        async with self._stage_gates["generation"]:
+            with self.telemetry.time_stage("generation"):
+                return await self.generator.aresolve_component(comp, deadline)
+
+    async def _discard_speculative(self, speculative: dict, keep=()):
+        """실제 계획에 없는 선행 작업을 취소하고 낭비된 작업을 텔레메트리에 집계"""
+        discarded = [(comp, speculative.pop(comp)) for comp in list(speculative) if comp not in keep]
+        if not discarded:
+            return
+        for _, task in discarded:
+            task.cancel()
+        results = await asyncio.gather(*(task for _, task in discarded), return_exceptions=True)
+        for (comp, task), result in zip(discarded, results):
+            self.telemetry.increment("speculative_wasted")
+            if task.cancelled():
+                self.telemetry.increment("speculative_cancelled")
+            elif isinstance(result, tuple) and not result[1]:
+                # 이미 LLM 생성까지 끝난 경우 (라이브러리에는 남지만 이번 run에는 쓰이지 않음)
+                self.telemetry.increment("speculative_wasted_generations")
+        print(f"[Speculative] 계획에 없는 선행 작업 정리: {', '.join(comp for comp, _ in discarded)}")
+
+    async def _consume_speculative(self, comp: str, speculative: dict):
+        """계획에 포함된 선행 작업 결과 (meta, is_hit)를 넘겨받는다. 없거나 실패했으면 None."""
+        task = speculative.pop(comp, None) if speculative else None
+        if task is None:
+            return None
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            print(f"[Speculative] {comp} 선행 생성 실패, 일반 경로로 다시 생성: {exc}")
+            return None
+        self.telemetry.increment("speculative_used")
+        return result
+
+    async def _generate_component_async(self, comp: str, run_id: str, deadline: Deadline, speculative: dict = None):
+        branch_name, worktree_path = self._build_component_resource(comp, run_id)
+        # 선행 작업도 generation 슬롯을 쓰므로 슬롯을 잡기 전에 결과를 받아 둔다 (슬롯 교착 방지).
+        resolved = await self._consume_speculative(comp, speculative)
+
+        async with self._stage_gates["generation"]:
+            # 1. GenerationAgent 연산 수행 (히트 여부도 GenerationAgent 캐시가 판정)
+            if resolved is not None:
+                meta, is_hit = resolved
+            else:
+                with self.telemetry.time_stage("generation"):
+                    meta, is_hit = await self.generator.aresolve_component(comp, deadline)
+
+            # 2. 브랜치에 파일 저장 및 커밋
+            with self.telemetry.time_stage("git"):
+                await self._run_in_stage("generation", self._commit_component, comp, meta, branch_name)
+
         return comp, meta, is_hit, branch_name, worktree_path
 
-    def run_pipeline(self, session_id: str, user_request: str):
-        run_id = self._start_run_journal(session_id, user_request)
+    @staticmethod
+    def _emit(events: RunEventStream, event_type: str, **fields):
+        if events is not None:
+            events.emit(event_type, **fields)
+
+    async def _stream_component_async(self, events: RunEventStream, index: int, comp: str, run_id: str,
+                                      deadline: Deadline, speculative: dict = None):
+        # QA 통과 즉시 섹션을 렌더링해 순서 관리자에 넘긴다 (실패 시 빈 자리로 표시해 뒤 섹션을 막지 않음)
+        result = await self._process_component_async(index, comp, run_id, deadline, speculative, events)
+        events.complete(index, comp, self.composer.render_section(result[1]) if result is not None else None)
+        return result
+
+    async def _process_component_async(self, index: int, comp: str, run_id: str, deadline: Deadline,
+                                       speculative: dict = None, events: RunEventStream = None):
+        try:
+            _, meta, is_hit, branch_name, worktree_path = await self._generate_component_async(
+                comp, run_id, deadline, speculative
+            )
+        except StageQueueFullError:
+            raise
+        except Exception as exc:
+            print(f"   [Error] {comp} 작업 중 예외 발생: {exc}")
+            self._emit(events, "component", index=index, component=comp, status="failed", error=str(exc))
+            return None
+        self._emit(events, "component", index=index, component=comp, status="cached" if is_hit else "generated")
+
+        print(f"   [!] Methodology Agent inspecting {comp}...")
+        try:
+            async with self._stage_gates["methodology"]:
+                with self.telemetry.time_stage("qa"):
+                    qa_result = await self._run_in_stage("methodology", self.methodology.process, meta, deadline)
+        except StageQueueFullError:
+            raise
+        except Exception as exc:
+            qa_result = {"status": "failed", "reason": f"QA 예외: {exc}"}
+        self._emit(
+            events, "qa", index=index, component=comp,
+            status=qa_result.get("status"), reason=qa_result.get("reason"),
+        )
+
+        if qa_result.get("status") == "failed":
+            print(f"   [Error] {comp} QA Failed: {qa_result.get('reason')}. Skipping merge.")
+            await self._run_in_stage("generation", self._safe_remove_resource, branch_name, worktree_path, "qa-fail")
+            return None
+
+        if is_hit:
+            self.telemetry.record_hit()
+        else:
+            self.telemetry.record_miss()
+        print(f"   [+] {comp} 작업 완료 및 QA 통과 (Cache Hit: {is_hit}) | Branch: {branch_name}")
+        return index, meta, branch_name, worktree_path
+
+    def _print_stage_latencies(self):
+        parts = [
+            f"{stage}={stats['p50'] * 1000:.0f}/{stats['p95'] * 1000:.0f}/{stats['p99'] * 1000:.0f}ms"
+            for stage, stats in self.telemetry.stage_latencies().items()
+            if stats["count"]
+        ]
+        if parts:
+            print(f"   ► 단계별 지연 p50/p95/p99: {', '.join(parts)}")
+
+    def _merge_generated_branches(self, generated_branches: list):
+        print("\n🔄 [Composition Agent] 병합 조율 시작 (Merge Master)")
+        if self.disable_merge_to_main:
+            print("   [Safety] main 병합을 건너뛰고 워크트리/브랜치만 정리합니다.")
+            for branch_name, worktree_path in generated_branches:
+                if branch_name:
+                    self._safe_remove_resource(branch_name, worktree_path, "merge-disabled")
+            return
+
+        branches_to_merge = [branch_name for branch_name, _ in generated_branches if branch_name]
+        print(f"   ⮑ Merging {len(branches_to_merge)} branch(es) in one batch...")
+        try:
+            merge_results = self.git_manager.merge_branches(branches_to_merge, allow_unrelated=True)
+            for branch_name, success, merge_mode, output in merge_results:
+                if success:
+                    print(f"      [+] {branch_name} merged ({merge_mode})")
+                else:
+                    print(f"      [Warning] Merge conflict for {branch_name} - Composition Agent 개입 필요. ({output})")
+        except Exception as e:
+            print(f"      [Error] 병합 중 에러: {e}")
+        finally:
+            # 병합 완료/실패와 무관하게 브랜치/워크트리 정리
+            for branch_name, worktree_path in generated_branches:
+                if branch_name:
+                    self._safe_remove_resource(branch_name, worktree_path, "post-merge")
+
+    def _page_cache_key(self, parsed_data: dict, streaming: bool = False) -> str:
+        components = parsed_data["required_components"]
+        # 제공자 목록(헤지/장애 조치)을 쓰는 역할은 경로 전체를 식별자로 사용
+        model_identities = {
+            role: getattr(agent.llm, "route_identity", None) or [agent.llm_provider, agent.llm_model]
+            for role, agent in (("customer", self.customer), ("generation", self.generator), ("composition", self.composer))
+        }
+        if streaming:
+            # 스트리밍 모드는 LLM 조립 대신 섹션 렌더링으로 페이지를 만든다
+            model_identities["composition"] = ["stream", "sections"]
+        # 컴포넌트별 저장소 토큰을 라이브러리 버전으로 사용 (다른 프로세스의 수정도 키 변경으로 반영)
+        library_tokens = {comp: self.generator.store.entry_token(comp) for comp in components}
+        return PageResultCache.page_key(components, parsed_data.get("user_intent", ""), model_identities, library_tokens)
+
+    def _is_cacheable_page(self, session_id: str, parsed_data: dict, approved_count: int, final_code: str,
+                           deadline: Deadline) -> bool:
+        # 폴백 결과나 일부 컴포넌트가 빠진 페이지는 다음 요청에서 다시 시도하도록 저장하지 않는다.
+        if deadline.timed_out_stages:
+            return False
+        fallback_plan = self.customer._fallback_data(session_id)
+        if parsed_data.get("required_components") == fallback_plan["required_components"] and (
+            parsed_data.get("user_intent") == fallback_plan["user_intent"]
+        ):
+            return False
+        if approved_count != len(parsed_data["required_components"]):
+            return False
+        return "(Fallback)" not in final_code
+
+    def _store_run_artifacts(self, run_id: str, final_code: str) -> str:
+        """run 산출물을 저장소에 기록하고 builder_output.html 객체 경로를 반환 (run끼리 덮어쓰지 않음)"""
+        artifacts = {"builder_output.html": (final_code, "text/html")}
+        if self.write_dashboard_file:
+            # 대시보드는 웹 /dashboard에서 실시간 렌더링되므로 파일 기록은 opt-in
+            artifacts["dashboard.html"] = (
+                self.telemetry.render_dashboard_html(self.phase), "text/html"
+            )
+        self.artifact_store.put_run(run_id, artifacts)
+        opened = self.artifact_store.open_artifact(run_id, "builder_output.html")
+        if opened is None:
+            # 다른 프로세스의 정리와 겹친 경우: 결과 HTML은 응답에 그대로 있으므로 run을 실패시키지 않는다
+            print(f"[Artifacts] ⚠️ run {run_id}의 builder_output.html 객체를 찾지 못함 (동시 정리)")
+            return f"artifacts/runs/{run_id}.json"
+        return opened[0]
+
+    def _metrics_payload(self) -> dict:
+        return {
+            "total": self.telemetry.total_requested,
+            "hits": self.telemetry.cache_hits,
+            "misses": self.telemetry.llm_generations,
+            "efficiency": round(self.telemetry.get_efficiency_rate(), 2)
+        }
+
+    def run_pipeline(self, session_id: str, user_request: str, deadline=None, event_sink=None,
+                     stream_sections: bool = None, run_id: str = None):
+        """동기 호출자(웹 요청 스레드, 스크립트)를 위한 래퍼: 새 이벤트 루프에서 run_pipeline_async를 실행"""
+        return asyncio.run(self.run_pipeline_async(
+            session_id, user_request, deadline=deadline, event_sink=event_sink,
+            stream_sections=stream_sections, run_id=run_id,
+        ))
+
+    async def run_pipeline_async(self, session_id: str, user_request: str, deadline=None, event_sink=None,
+                                 stream_sections: bool = None, run_id: str = None):
+        """
+        deadline: Deadline 또는 초 단위 예산 (None이면 ORCHESTRATOR_RUN_TIMEOUT_SECONDS, 0이면 무제한).
+        예산이 소진되면 진행 중인 LLM 호출을 취소하고 각 단계의 폴백을 사용하며, 초과된 단계를 저널에 남긴다.
+        event_sink: event_sink(dict)로 진행 이벤트(started, parsed, component, qa, merged, composed)를 보낸다.
+        이벤트 루프 스레드에서 호출되므로 막히지 않아야 한다 (예: queue.put).
+        stream_sections: 섹션 스트리밍 모드 (event_sink가 있으면 기본 True). shell → section(index 순) →
+        shell_close(캐시 히트 시 page 한 번) 이벤트의 html 조각을 이어 붙이면 최종 HTML과 같으며,
+        LLM 조립 대신 섹션 렌더링을 사용한다.
+        run_id: 호출자가 미리 정한 run id (작업 API처럼 시작 전에 id를 돌려줘야 하는 경우)
+        """
+        run_id = self._start_run_journal(session_id, user_request, run_id)
+        deadline = self._create_run_deadline(run_id, deadline)
+        speculative = {}
+        events = RunEventStream(event_sink) if event_sink is not None else None
+        stream = events if events is not None and stream_sections is not False else None
+        self._emit(events, "started", run_id=run_id, session_id=session_id)
         run_status = "failed"
         run_error = None
+        run_started = time.perf_counter()
+        self.telemetry.run_started()
 
         print(f"\n==========================================")
         print(f"🚀 AI BUILDER 오케스트레이션 시작 [Phase: {self.phase}]")
         print(f"==========================================")
         
         try:
-            thread_pool = self._get_agent_thread_pool_config()
+            stage_limits = self.stage_limits
             print(
-                "[ThreadPool] "
-                f"Customer={thread_pool['customer']}, "
-                f"Generation={thread_pool['generation']}, "
-                f"Methodology={thread_pool['methodology']}, "
-                f"Composition={thread_pool['composition']}"
+                "[StageLimits] "
+                f"Customer={stage_limits['customer']}, "
+                f"Generation={stage_limits['generation']}, "
+                f"Methodology={stage_limits['methodology']}, "
+                f"Composition={stage_limits['composition']}"
             )
             if self.disable_merge_to_main:
                 print("[Safety] ORCHESTRATOR_DISABLE_MERGE=1 -> main 브랜치 병합 비활성화")
 
-            with concurrent.futures.ThreadPoolExecutor(
-                max_workers=thread_pool["customer"],
-                thread_name_prefix="CustomerAgent",
-            ) as customer_executor, concurrent.futures.ThreadPoolExecutor(
-                max_workers=thread_pool["generation"],
-                thread_name_prefix="GenerationAgent",
-            ) as generation_executor, concurrent.futures.ThreadPoolExecutor(
-                max_workers=thread_pool["methodology"],
-                thread_name_prefix="MethodologyAgent",
-            ) as methodology_executor:
-                # 1. Customer Agent: 파싱
-                parsed_data = customer_executor.submit(
-                    self.customer.process_request, session_id, user_request
-                ).result()
-                components_needed = parsed_data["required_components"]
-
-                for comp in components_needed:
-                    branch_name, worktree_path = self._build_component_resource(comp)
-                    self._track_resource(run_id, comp, branch_name, worktree_path)
-
-                if self.phase == "Alpha" and len(components_needed) > self.phase_metrics.get("max_components_allowed", 10):
-                    print(f"[Error] Alpha 단계 허용 컴포넌트 초과: {len(components_needed)}")
-                    run_status = "blocked"
-                    return None
-
-                # 2. Generation + Methodology Agent: 비동기 병렬 처리
-                print(f"\n⚡ [Generation Agent] {len(components_needed)}개 컴포넌트 병렬 생성 시작...")
-
-                generation_futures = {
-                    generation_executor.submit(self._generate_component_worker, comp): (index, comp)
+            # 1. Customer Agent: 파싱 (그동안 키워드 예측으로 컴포넌트 생성을 미리 시작)
+            speculative = self._start_speculative_prefetch(user_request, deadline)
+            async with self._stage_gates["customer"]:
+                with self.telemetry.time_stage("customer"):
+                    parsed_data = await self.customer.aprocess_request(session_id, user_request, deadline)
+            components_needed = parsed_data["required_components"]
+            self._emit(
+                events, "parsed", components=list(components_needed), user_intent=parsed_data.get("user_intent"),
+            )
+            await self._discard_speculative(speculative, keep=components_needed)
+
+            if self.phase == "Alpha" and len(components_needed) > self.phase_metrics.get("max_components_allowed", 10):
+                print(f"[Error] Alpha 단계 허용 컴포넌트 초과: {len(components_needed)}")
+                run_status = "blocked"
+                return None
+
+            if self.page_cache is not None:
+                cached = self.page_cache.get(self._page_cache_key(parsed_data, streaming=stream is not None))
+                if cached is not None:
+                    await self._discard_speculative(speculative)
+                    final_code, tier = cached
+                    # 컴포넌트 조회가 일어나지 않았으므로 컴포넌트 적중/효율 지표는 건드리지 않는다
+                    self.telemetry.increment("page_cache_hits")
+                    output_file = self._store_run_artifacts(run_id, final_code)
+                    if stream is not None:
+                        stream.emit("page", final_code, cached=True)
+                    self._emit(events, "composed", cached=True)
+                    print(f"\n✅ [PageCache] 저장된 페이지 재사용 ({tier}): {output_file}")
+                    print("==========================================\n")
+                    run_status = "completed"
+                    return {"html": final_code, "metrics": self._metrics_payload(), "cached": True, "run_id": run_id}
+                self.telemetry.increment("page_cache_misses")
+
+            for comp in components_needed:
+                branch_name, worktree_path = self._build_component_resource(comp, run_id)
+                self._track_resource(run_id, comp, branch_name, worktree_path)
+
+            if stream is not None:
+                stream.emit(
+                    "shell", self.composer.render_shell_open(parsed_data.get("user_intent")),
+                    components=list(components_needed),
+                )
+
+            # 2. Generation + Methodology Agent: 컴포넌트별 코루틴을 동시에 진행 (생성 완료 즉시 QA)
+            print(f"\n⚡ [Generation Agent] {len(components_needed)}개 컴포넌트 병렬 생성 시작...")
+            if stream is not None:
+                component_coros = [
+                    self._stream_component_async(stream, index, comp, run_id, deadline, speculative)
                     for index, comp in enumerate(components_needed)
-                }
-                qa_futures = {}
-
-                for generation_future in concurrent.futures.as_completed(generation_futures):
-                    index, comp = generation_futures[generation_future]
-                    try:
-                        _, meta, is_hit, branch_name, worktree_path = generation_future.result()
-                    except Exception as exc:
-                        print(f"   [Error] {comp} 작업 중 예외 발생: {exc}")
-                        continue
-
-                    print(f"   [!] Methodology Agent inspecting {comp}...")
-                    qa_future = methodology_executor.submit(self.methodology.process, meta)
-                    qa_futures[qa_future] = (index, comp, meta, is_hit, branch_name, worktree_path)
-
-                approved_results = []
-                for qa_future in concurrent.futures.as_completed(qa_futures):
-                    index, comp, meta, is_hit, branch_name, worktree_path = qa_futures[qa_future]
-
-                    try:
-                        qa_result = qa_future.result()
-                    except Exception as exc:
-                        qa_result = {"status": "failed", "reason": f"QA 예외: {exc}"}
-
-                    if qa_result.get("status") == "failed":
-                        print(f"   [Error] {comp} QA Failed: {qa_result.get('reason')}. Skipping merge.")
-                        self._safe_remove_resource(branch_name, worktree_path, "qa-fail")
-                        continue
-
-                    approved_results.append((index, meta, branch_name, worktree_path))
-                    if is_hit:
-                        self.telemetry.record_hit()
-                    else:
-                        self.telemetry.record_miss()
-                    print(f"   [+] {comp} 작업 완료 및 QA 통과 (Cache Hit: {is_hit}) | Branch: {branch_name}")
-
-                approved_results.sort(key=lambda item: item[0])
-                library_assets = [meta for _, meta, _, _ in approved_results]
-                generated_branches = [(branch_name, worktree_path) for _, _, branch_name, worktree_path in approved_results]
+                ]
+            else:
+                component_coros = [
+                    self._process_component_async(index, comp, run_id, deadline, speculative, events)
+                    for index, comp in enumerate(components_needed)
+                ]
+            component_tasks = [asyncio.ensure_future(coro) for coro in component_coros]
+            try:
+                component_results = await asyncio.gather(*component_tasks)
+            except BaseException:
+                # 대기열 초과/취소 시 남은 컴포넌트 작업도 함께 중단
+                for task in component_tasks:
+                    task.cancel()
+                raise
+            approved_results = sorted(
+                (result for result in component_results if result is not None),
+                key=lambda item: item[0],
+            )
+            library_assets = [meta for _, meta, _, _ in approved_results]
+            generated_branches = [(branch_name, worktree_path) for _, _, branch_name, worktree_path in approved_results]
 
             # 3. Composition Agent: 원자 조각 통합 조립 (Merge Master 역할 병행)
-            print("\n🔄 [Composition Agent] 병합 조율 시작 (Merge Master)")
-            if self.disable_merge_to_main:
-                print("   [Safety] main 병합을 건너뛰고 워크트리/브랜치만 정리합니다.")
-                for branch_name, worktree_path in generated_branches:
-                    if branch_name and worktree_path:
-                        self._safe_remove_resource(branch_name, worktree_path, "merge-disabled")
-            else:
-                for branch_name, worktree_path in generated_branches:
-                    if branch_name and worktree_path:
-                        print(f"   ⮑ Merging {branch_name}...")
-                        try:
-                            success, output = self.git_manager.merge_branch(branch_name, allow_unrelated=True)
-                            if not success:
-                                print(f"      [Warning] Merge conflict for {branch_name} - Composition Agent 개입 필요. ({output})")
-                        except Exception as e:
-                            print(f"      [Error] 병합 중 에러: {e}")
-                        finally:
-                            # 병합 완료/실패와 무관하게 워크트리 정리
-                            self._safe_remove_resource(branch_name, worktree_path, "post-merge")
+            with self.telemetry.time_stage("merge"):
+                await self._run_in_stage("composition", self._merge_generated_branches, generated_branches)
+            self._emit(
+                events, "merged",
+                branches=[branch_name for branch_name, _ in generated_branches if branch_name],
+                merge_disabled=self.disable_merge_to_main,
+            )
             
             print("\n✨ Final Layout Composition...")
-            with concurrent.futures.ThreadPoolExecutor(
-                max_workers=thread_pool["composition"],
-                thread_name_prefix="CompositionAgent",
-            ) as composition_executor:
-                final_code = composition_executor.submit(
-                    self.composer.compose, parsed_data, library_assets
-                ).result()
+            if stream is not None:
+                # 섹션은 이미 QA 통과 순서대로 나갔으므로 뼈대만 닫는다
+                with self.telemetry.time_stage("composition"):
+                    stream.emit("shell_close", self.composer.render_shell_close())
+                    final_code = stream.document()
+            else:
+                async with self._stage_gates["composition"]:
+                    with self.telemetry.time_stage("composition"):
+                        final_code = await self.composer.acompose(parsed_data, library_assets, deadline)
             
+            self._emit(events, "composed", cached=False)
+
             # 결과물 저장
-            output_file = os.path.join(self.runtime_output_dir, 'builder_output.html')
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(final_code)
-                
-            dashboard_file = self.telemetry.generate_dashboard_html(
-                self.phase,
-                output_path=os.path.join(self.runtime_output_dir, "dashboard.html"),
-            )
+            output_file = self._store_run_artifacts(run_id, final_code)
+            if self.page_cache is not None and self._is_cacheable_page(
+                session_id, parsed_data, len(library_assets), final_code, deadline
+            ):
+                self.page_cache.put(
+                    self._page_cache_key(parsed_data, streaming=stream is not None), components_needed, final_code
+                )
+
             efficiency = self.telemetry.get_efficiency_rate()
-                
+
             print(f"\n✅ [결과물 산출 성공] 파일 저장 완료: {output_file}")
-            print(f"📊 [지표 업데이트 완료] 대시보드 저장 완료: {dashboard_file}")
+            if self.write_dashboard_file:
+                print(f"📊 [지표 업데이트 완료] 대시보드 저장 완료: run {run_id}의 dashboard.html")
             print(f"   ► 토큰 절감률(Cache Hit): {efficiency:.1f}%")
+            self._print_stage_latencies()
             print("==========================================\n")
 
             run_status = "completed"
             # API 호환성을 위해 결과 코드와 메타데이터를 함께 딕셔너리로 리턴
-            return {
-                "html": final_code,
-                "metrics": {
-                    "total": self.telemetry.total_requested,
-                    "hits": self.telemetry.cache_hits,
-                    "misses": self.telemetry.llm_generations,
-                    "efficiency": round(efficiency, 2)
-                }
-            }
+            result = {"html": final_code, "metrics": self._metrics_payload(), "run_id": run_id}
+            if deadline.timed_out_stages:
+                result["timed_out_stages"] = deadline.timed_out_stages
+            return result
         except BaseException as exc:
-            if isinstance(exc, KeyboardInterrupt):
+            if isinstance(exc, (KeyboardInterrupt, asyncio.CancelledError)):
                 run_status = "interrupted"
             run_error = f"{type(exc).__name__}: {exc}"
             print(f"[Pipeline] 예외 발생: {exc}")
             raise
         finally:
+            if speculative:
+                await self._discard_speculative(speculative)
             self._cleanup_run_resources(run_id, "run-finally")
-            self._update_run_journal(
-                run_id,
-                status=run_status,
-                error_marker=run_error,
-                finished=True,
-            )
+            self._finish_run_journal(run_id, run_status, run_error)
+            self.telemetry.observe("pipeline", time.perf_counter() - run_started)
+            self.telemetry.run_finished(run_status)
 
 if __name__ == "__main__":
     orchestrator = Orchestrator()
     # GSD 검증을 위해 다양한 컴포넌트가 섞인 모의 요청
-    orchestrator.customer.process_request = lambda s, u: {
-        "session_id": s,
-        "required_components": ["header", "nav_bar", "hero_section", "custom_graph", "text_input", "unknown_dynamic_widget", "button", "footer_simple"],
-        "user_intent": "고급 엔터프라이즈 대시보드 화면"
-    }
+    async def mock_process_request(s, u, deadline=None):
+        return {
+            "session_id": s,
+            "required_components": ["header", "nav_bar", "hero_section", "custom_graph", "text_input", "unknown_dynamic_widget", "button", "footer_simple"],
+            "user_intent": "고급 엔터프라이즈 대시보드 화면"
+        }
+    orchestrator.customer.aprocess_request = mock_process_request
     
     sample_request = "고급 대시보드 만들어줘. 헤더, 네비, 히어로, 그래프, 텍스트입력, 알수없는위젯, 버튼, 푸터 다 넣어줘."
     orchestrator.run_pipeline("session_dashboard_gamma", sample_request)
@@ -0,0 +1,173 @@
+"""
+페이지 단위 결과 캐시.
+
+(순서 있는 required_components, 정규화된 user_intent, 모델 식별자, 컴포넌트 라이브러리 버전) → 최종 HTML.
+메모리 LRU + RUNTIME_OUTPUT_DIR/page_cache 디스크 계층의 2단 구성이다.
+
+라이브러리 버전은 컴포넌트별 ComponentStore.entry_token이므로 다른 프로세스가 컴포넌트를 바꿔도
+키가 달라져 자연히 미스가 난다. 같은 프로세스의 저장(put/delete)은 변경 리스너로 즉시 무효화한다.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from src.utils.component_store import add_change_listener
+
+_PUNCTUATION_RE = re.compile(r"[\s\.\,\!\?~·…\"'`]+")
+
+
+def normalize_text(text: str) -> str:
+    """대소문자/공백/문장부호 차이만 있는 의도를 같은 키로 묶는다."""
+    return _PUNCTUATION_RE.sub(" ", str(text or "")).strip().lower()
+
+
+def _digest(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+class PageResultCache:
+    def __init__(self, disk_dir: str = None, max_entries: int = None, disk_max_entries: int = None,
+                 ttl_seconds: int = None):
+        self.max_entries = _get_int_env("PAGE_CACHE_MAX_ENTRIES", 256) if max_entries is None else max_entries
+        self.disk_max_entries = (
+            _get_int_env("PAGE_CACHE_DISK_MAX_ENTRIES", 2048) if disk_max_entries is None else disk_max_entries
+        )
+        self.ttl_seconds = _get_int_env("PAGE_CACHE_TTL_SECONDS", 86400) if ttl_seconds is None else ttl_seconds
+        self.disk_dir = os.path.abspath(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pages = collections.OrderedDict()  # key -> entry
+        self._component_index = collections.defaultdict(set)  # component -> page keys
+        self._disk_writes = 0
+        add_change_listener(self.invalidate_component)
+
+    # --- 키 ---
+    @staticmethod
+    def page_key(components: list, user_intent: str, model_identities: dict, library_tokens: dict) -> str:
+        return _digest({
+            "components": list(components),
+            "intent": normalize_text(user_intent),
+            "models": model_identities,
+            "library": {name: repr(token) for name, token in library_tokens.items()},
+        })
+
+    def _expired(self, stored_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - stored_at > self.ttl_seconds
+
+    # --- 페이지 ---
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _remember_locked(self, key: str, entry: dict):
+        self._pages[key] = entry
+        self._pages.move_to_end(key)
+        for component in entry["components"]:
+            self._component_index[component].add(key)
+        while len(self._pages) > self.max_entries:
+            old_key, old_entry = self._pages.popitem(last=False)
+            for component in old_entry["components"]:
+                self._component_index[component].discard(old_key)
+
+    def get(self, key: str):
+        """(html, tier) 또는 None. tier: memory | disk"""
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is not None:
+                if not self._expired(entry["stored_at"]):
+                    self._pages.move_to_end(key)
+                    return entry["html"], "memory"
+                self._drop_locked(key)
+
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._expired(entry.get("stored_at", 0)):
+            self._remove_file(path)
+            return None
+        if self.max_entries > 0:
+            with self._lock:
+                self._remember_locked(key, entry)
+        return entry["html"], "disk"
+
+    def put(self, key: str, components: list, html: str):
+        entry = {"components": list(components), "html": html, "stored_at": time.time()}
+        if self.max_entries > 0:
+            with self._lock:
+                self._remember_locked(key, entry)
+        if not self.disk_dir or self.disk_max_entries <= 0:
+            return
+
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % 64 == 0
+        if prune:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """디스크 계층이 disk_max_entries를 넘으면 오래된 항목부터 삭제 (쓰기 64회마다 점검)"""
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        files.append((os.path.getmtime(path), path))
+                    except OSError:
+                        continue
+        if len(files) <= self.disk_max_entries:
+            return
+        files.sort()
+        for _, path in files[: len(files) - self.disk_max_entries]:
+            self._remove_file(path)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _drop_locked(self, key: str):
+        entry = self._pages.pop(key, None)
+        if entry is not None:
+            for component in entry["components"]:
+                self._component_index[component].discard(key)
+        if self.disk_dir:
+            self._remove_file(self._disk_path(key))
+
+    def invalidate_component(self, component_name: str):
+        """해당 컴포넌트를 포함한 페이지를 메모리/디스크에서 제거"""
+        with self._lock:
+            keys = list(self._component_index.pop(component_name, ()))
+            for key in keys:
+                self._drop_locked(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._pages):
+                self._drop_locked(key)
@@ -1,12 +1,13 @@
+import argparse
 import os
 import sys
-import time
 
 # Add root directory to python path
 base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if base_dir not in sys.path:
     sys.path.append(base_dir)
 
+from src.utils.component_store import export_json_directory, get_component_store, import_json_directory
 from worktrees.generation_agent.agent import GenerationAgent
 
 def build_catalog():
@@ -15,6 +16,7 @@ def build_catalog():
     print("==========================================")
     print("목적: GSD 원칙(격리된 원자적 실행)에 따라 신규 컴포넌트들을 라이브러리에 사전 적재합니다.")
     print("방식: GenerationAgent를 독립적으로 1회씩 호출하여 안전하게 생성/저장합니다.")
+    print("속도 제한: 고정 대기 없이 제공자별 제한(<PROVIDER>_RPM/_TPM/_MAX_INFLIGHT)을 따릅니다.")
     
     components_to_build = [
         "hero_section",
@@ -42,14 +44,42 @@ def build_catalog():
             result = agent.load_component_metadata(comp_name)
             if result and result.get("name") == comp_name:
                 success_count += 1
-            time.sleep(1)  # API Rate limit 방지 보수적 슬립
         except Exception as e:
             print(f"❌ '{comp_name}' 생성 중 오류 발생: {e}")
 
     print("\n==========================================")
     print(f"✅ 카탈로그 구출 완료: {success_count}/{len(components_to_build)} 성공")
-    print(f"저장 위치: {agent.library_path}")
+    print(f"저장 위치: {agent.library_path} (backend={agent.store.backend})")
     print("==========================================")
 
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-build the component library or convert between store layouts.")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default=None, help="Target store backend (default: COMPONENT_STORE_BACKEND)")
+    parser.add_argument("--store-path", default=None, help="Target store location (JSON directory or SQLite file)")
+    parser.add_argument("--import-json", metavar="DIR", default="", help="Import a JSON-per-file component directory into the store")
+    parser.add_argument("--export-json", metavar="DIR", default="", help="Export the store to a JSON-per-file component directory")
+    args = parser.parse_args()
+
+    if args.backend:
+        os.environ["COMPONENT_STORE_BACKEND"] = args.backend
+    if args.store_path:
+        env_key = "COMPONENT_STORE_DB_PATH" if args.backend == "sqlite" else "COMPONENT_LIBRARY_PATH"
+        os.environ[env_key] = os.path.abspath(args.store_path)
+
+    if not args.import_json and not args.export_json:
+        build_catalog()
+        return 0
+
+    store = get_component_store()
+    if args.import_json:
+        count = import_json_directory(store, args.import_json)
+        print(f"[ok] imported {count} component(s) from {os.path.abspath(args.import_json)} -> {store.location} ({store.backend})")
+    if args.export_json:
+        count = export_json_directory(store, args.export_json)
+        print(f"[ok] exported {count} component(s) from {store.location} ({store.backend}) -> {os.path.abspath(args.export_json)}")
+    return 0
+
+
 if __name__ == "__main__":
-    build_catalog()
+    raise SystemExit(main())
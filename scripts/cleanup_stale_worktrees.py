@@ -3,51 +3,25 @@
 Standalone cleanup tool for stale temp worktrees.
 
 Features:
-- Recover journals stuck in `running` state.
+- Recover journals stuck in `running` state (replays append-only `run_*.jsonl` event logs
+  and legacy `run_*.json` files).
+- Compact finished event logs into `run_*.json` summaries.
 - Remove stale `worktrees/temp_*` worktrees.
+- Delete branches left by worktree-free (plumbing) commits.
+- Reset (not remove) pooled `worktrees/pool_*` slots left with a branch checked out.
 - Support dry-run mode.
 """
 
 import argparse
-import json
 import os
 import sys
-from datetime import datetime, timezone
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 if SCRIPT_DIR not in sys.path:
     sys.path.append(SCRIPT_DIR)
 
-from git_manager import GitManager
-
-
-def utcnow_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
-
-
-def iter_running_journals(journal_dir: str):
-    if not os.path.isdir(journal_dir):
-        return
-
-    for file_name in sorted(os.listdir(journal_dir)):
-        if not file_name.endswith(".json"):
-            continue
-        path = os.path.join(journal_dir, file_name)
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                payload = json.load(f)
-        except Exception:
-            continue
-
-        if payload.get("status") == "running":
-            yield path, payload
-
-
-def write_json_atomic(path: str, payload: dict):
-    temp_path = f"{path}.tmp"
-    with open(temp_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-    os.replace(temp_path, path)
+from git_manager import GitManager, WorktreePool
+from run_journal import compact_finished, iter_running_journals, utcnow_iso, write_summary
 
 
 def cleanup_journal_resources(git_manager: GitManager, payload: dict, dry_run: bool) -> int:
@@ -58,19 +32,26 @@ def cleanup_journal_resources(git_manager: GitManager, payload: dict, dry_run: b
     for resource in resources:
         branch_name = resource.get("branch_name")
         worktree_path = resource.get("worktree_path")
-        if not worktree_path:
+        if not worktree_path and not branch_name:
             continue
 
         if dry_run:
-            print(f"[dry-run] would remove {worktree_path} (branch={branch_name})")
+            if worktree_path:
+                print(f"[dry-run] would remove {worktree_path} (branch={branch_name})")
+            else:
+                print(f"[dry-run] would delete branch {branch_name}")
             cleaned += 1
             continue
 
         try:
-            git_manager.remove_worktree(worktree_path, branch_name=branch_name, force=True)
+            if worktree_path:
+                git_manager.remove_worktree(worktree_path, branch_name=branch_name, force=True)
+            else:
+                # plumbing 모드 자원: 워크트리 없이 브랜치만 존재
+                git_manager.delete_branch(branch_name)
             cleaned += 1
         except Exception as exc:
-            print(f"[warn] failed to remove {worktree_path}: {exc}")
+            print(f"[warn] failed to remove {worktree_path or branch_name}: {exc}")
             resource_copy = dict(resource)
             resource_copy["last_error"] = str(exc)
             failed_resources.append(resource_copy)
@@ -129,7 +110,28 @@ def main() -> int:
     journals_seen = 0
     journal_resources_cleaned = 0
 
+    # 풀 슬롯을 먼저 분리해야 저널에 남은 브랜치를 삭제할 수 있음
+    pool = WorktreePool(git_manager, 1)
+    if args.dry_run:
+        pool_slots = [
+            entry.get("path")
+            for entry in git_manager.list_worktrees()
+            if entry.get("path") and entry.get("branch_name")
+            and os.path.relpath(os.path.abspath(entry["path"]), repo_root).replace("\\", "/").startswith(pool.slot_prefix)
+        ]
+        for path in pool_slots:
+            print(f"[dry-run] would reset pool slot: {path}")
+        pool_reset = len(pool_slots)
+    else:
+        reset_paths = pool.recover()
+        pool_reset = len(reset_paths)
+        for path in reset_paths:
+            print(f"[ok] reset pool slot: {path}")
+
+    journals_compacted = 0
     for journal_dir in journal_dirs:
+        if not args.dry_run:
+            journals_compacted += len(compact_finished(journal_dir))
         for journal_path, payload in iter_running_journals(journal_dir):
             journals_seen += 1
             cleaned = cleanup_journal_resources(git_manager, payload, dry_run=args.dry_run)
@@ -150,8 +152,8 @@ def main() -> int:
                 payload["error"] = "Recovered stale resources by cleanup_stale_worktrees.py"
             payload["updated_at"] = utcnow_iso()
             payload["finished_at"] = utcnow_iso()
-            write_json_atomic(journal_path, payload)
-            print(f"[ok] journal updated: {journal_path} (status={payload['status']})")
+            summary_path = write_summary(journal_path, payload)
+            print(f"[ok] journal updated: {summary_path} (status={payload['status']})")
 
     if args.dry_run:
         candidates = list_temp_candidates(git_manager, repo_root, args.temp_prefix)
@@ -168,7 +170,9 @@ def main() -> int:
         "summary: "
         f"journals_seen={journals_seen}, "
         f"journal_resources_cleaned={journal_resources_cleaned}, "
+        f"journals_compacted={journals_compacted}, "
         f"temp_worktrees_cleaned={temp_cleaned}, "
+        f"pool_slots_reset={pool_reset}, "
         f"dry_run={args.dry_run}"
     )
     return 0
@@ -1,20 +1,301 @@
+import atexit
 import subprocess
 import os
 import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 슬롯 잠금 없이 동작
+    fcntl = None
+
+ZERO_OID = "0" * 40
+
+# 프로세스 전역 git 실행 통계 (/metrics 노출용)
+_git_stats_lock = threading.Lock()
+_git_stats = {}  # (kind, name) -> count
+
+
+def _record_git_stat(kind: str, name: str):
+    with _git_stats_lock:
+        _git_stats[(kind, name)] = _git_stats.get((kind, name), 0) + 1
+
+
+def get_git_command_stats() -> dict:
+    """{(kind, name): count}. kind: subprocess(일회성 실행) | channel_spawn | channel_request"""
+    with _git_stats_lock:
+        return dict(_git_stats)
+
+
+class GitCommandChannel:
+    """
+    저장소당 하나씩 유지되는 장수(long-lived) git 프로세스 묶음.
+    cat-file --batch(-check) / mktree --batch / hash-object --stdin-paths / update-ref --stdin
+    스트림을 스레드 간에 공유하여 rev-parse, 객체 기록, ref 갱신마다 fork/exec 하지 않도록 합니다.
+    각 스트림은 자체 락으로 직렬화되며, 프로세스가 죽으면 다음 호출 시 다시 띄웁니다.
+    """
+    _registry_lock = threading.Lock()
+    _registry = {}
+
+    STREAMS = {
+        "check": (['git', 'cat-file', '--batch-check'], True),
+        "read": (['git', 'cat-file', '--batch'], True),
+        "mktree": (['git', 'mktree', '-z', '--batch'], False),
+        "blob": (['git', 'hash-object', '-w', '--stdin-paths', '--no-filters'], False),
+        "commit": (['git', 'hash-object', '-t', 'commit', '-w', '--stdin-paths'], False),
+        "refs": (['git', 'update-ref', '--stdin'], False),
+    }
+
+    def __init__(self, repo_path: str):
+        self.repo_path = os.path.abspath(repo_path)
+        self._procs = {}
+        self._locks = {name: threading.Lock() for name in self.STREAMS}
+        self._ident = None
+
+    @classmethod
+    def for_repo(cls, repo_path: str) -> "GitCommandChannel":
+        key = os.path.abspath(repo_path)
+        with cls._registry_lock:
+            channel = cls._registry.get(key)
+            if channel is None:
+                channel = cls(key)
+                cls._registry[key] = channel
+            return channel
+
+    @classmethod
+    def close_all(cls):
+        with cls._registry_lock:
+            channels = list(cls._registry.values())
+            cls._registry.clear()
+        for channel in channels:
+            channel.close()
+
+    def close(self):
+        for name, lock in self._locks.items():
+            with lock:
+                self._terminate(name)
+
+    def _terminate(self, name: str):
+        proc = self._procs.pop(name, None)
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            proc.wait(timeout=2)
+        except Exception:
+            proc.kill()
+
+    def _proc(self, name: str) -> subprocess.Popen:
+        # 호출자는 self._locks[name]을 잡고 있어야 함
+        proc = self._procs.get(name)
+        if proc is not None and proc.poll() is None:
+            return proc
+        cmd, binary = self.STREAMS[name]
+        _record_git_stat("channel_spawn", name)
+        popen_kwargs = {} if binary else {"text": True, "encoding": "utf-8"}
+        proc = subprocess.Popen(
+            cmd,
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **popen_kwargs,
+        )
+        self._procs[name] = proc
+        return proc
+
+    def _request_line(self, name: str, payload) -> str:
+        _record_git_stat("channel_request", name)
+        with self._locks[name]:
+            proc = self._proc(name)
+            try:
+                proc.stdin.write(payload)
+                proc.stdin.flush()
+                line = proc.stdout.readline()
+            except (BrokenPipeError, OSError) as exc:
+                self._terminate(name)
+                raise RuntimeError(f"Git channel '{name}' failed: {exc}")
+            if not line:
+                error = self._drain_error(name)
+                raise RuntimeError(f"Git command failed: {' '.join(self.STREAMS[name][0])}\nError: {error}")
+            return line
+
+    def _drain_error(self, name: str) -> str:
+        proc = self._procs.pop(name, None)
+        if proc is None:
+            return ""
+        try:
+            proc.wait(timeout=2)
+            return proc.stderr.read() if proc.stderr else ""
+        except Exception:
+            proc.kill()
+            return ""
+
+    def resolve(self, rev: str):
+        """rev(브랜치, ref, rev^{commit} 등)를 SHA로 해석합니다. 없으면 None."""
+        line = self._request_line("check", f"{rev}\n".encode('utf-8')).decode('utf-8').rstrip("\n")
+        if line.endswith(" missing") or line.endswith(" ambiguous"):
+            return None
+        return line.split(" ", 1)[0]
+
+    def read_object(self, oid: str):
+        """객체의 (type, raw bytes)를 반환합니다."""
+        _record_git_stat("channel_request", "read")
+        with self._locks["read"]:
+            proc = self._proc("read")
+            try:
+                proc.stdin.write(f"{oid}\n".encode('utf-8'))
+                proc.stdin.flush()
+                header = proc.stdout.readline().decode('utf-8').rstrip("\n")
+                if not header or header.endswith(" missing"):
+                    raise RuntimeError(f"Git object not found: {oid}")
+                _, obj_type, size = header.split(" ")
+                data = proc.stdout.read(int(size))
+                proc.stdout.read(1)  # 객체 뒤의 개행
+            except (BrokenPipeError, OSError, ValueError) as exc:
+                self._terminate("read")
+                raise RuntimeError(f"Git channel 'read' failed: {exc}")
+            return obj_type, data
+
+    def list_tree(self, tree_oid: str) -> list:
+        """raw tree 객체를 파싱해 mktree 입력 형식의 엔트리 목록으로 반환합니다."""
+        obj_type, data = self.read_object(tree_oid)
+        if obj_type != "tree":
+            raise RuntimeError(f"Git object is not a tree: {tree_oid}")
+        oid_len = len(tree_oid) // 2
+        entries = []
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            mode = data[pos:space].decode('ascii')
+            name = data[space + 1:nul].decode('utf-8', errors='surrogateescape')
+            oid = data[nul + 1:nul + 1 + oid_len].hex()
+            pos = nul + 1 + oid_len
+            if mode == "40000":
+                kind = "tree"
+            elif mode == "160000":
+                kind = "commit"
+            else:
+                kind = "blob"
+            entries.append(f"{mode} {kind} {oid}\t{name}")
+        return entries
+
+    def mktree(self, entries: list) -> str:
+        payload = "".join(f"{entry}\0" for entry in entries) + "\0"
+        return self._request_line("mktree", payload).strip()
+
+    def _write_via_path(self, name: str, data: bytes) -> str:
+        fd, temp_path = tempfile.mkstemp(prefix="builder_obj_")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            return self._request_line(name, f"{temp_path}\n").strip()
+        finally:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def write_blob(self, content: str) -> str:
+        return self._write_via_path("blob", content.encode('utf-8'))
+
+    def _identity(self) -> str:
+        if self._ident is None:
+            _record_git_stat("subprocess", "var")
+            result = subprocess.run(
+                ['git', 'var', 'GIT_COMMITTER_IDENT'],
+                cwd=self.repo_path,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding='utf-8',
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"Git command failed: git var GIT_COMMITTER_IDENT\nError: {result.stderr}")
+            # "Name <email> <timestamp> <tz>" 에서 시각 부분을 제외하고 보관
+            self._ident = result.stdout.strip().rsplit(" ", 2)[0]
+        return self._ident
+
+    def write_commit(self, tree_oid: str, parents: list, message: str) -> str:
+        now = time.time()
+        offset = int(time.localtime(now).tm_gmtoff // 60)
+        sign = "+" if offset >= 0 else "-"
+        tz = f"{sign}{abs(offset) // 60:02d}{abs(offset) % 60:02d}"
+        signature = f"{self._identity()} {int(now)} {tz}"
+        lines = [f"tree {tree_oid}"]
+        lines += [f"parent {parent}" for parent in parents]
+        lines += [f"author {signature}", f"committer {signature}", "", message.rstrip("\n"), ""]
+        return self._write_via_path("commit", "\n".join(lines).encode('utf-8'))
+
+    def update_refs(self, updates: list):
+        """
+        (ref, new_oid, old_oid) 목록을 하나의 트랜잭션으로 적용합니다.
+        new_oid가 ZERO_OID면 삭제, old_oid가 None이면 이전 값을 검증하지 않습니다.
+        """
+        commands = ["start"]
+        for ref, new_oid, old_oid in updates:
+            old_part = f" {old_oid}" if old_oid is not None else ""
+            if new_oid == ZERO_OID:
+                commands.append(f"delete {ref}{old_part}")
+            else:
+                commands.append(f"update {ref} {new_oid}{old_part}")
+        commands.append("commit")
+        payload = "\n".join(commands) + "\n"
+
+        _record_git_stat("channel_request", "refs")
+        with self._locks["refs"]:
+            proc = self._proc("refs")
+            try:
+                proc.stdin.write(payload)
+                proc.stdin.flush()
+                replies = [proc.stdout.readline() for _ in range(2)]
+            except (BrokenPipeError, OSError) as exc:
+                self._terminate("refs")
+                raise RuntimeError(f"Git channel 'refs' failed: {exc}")
+            if replies[-1].strip() != "commit: ok":
+                # 트랜잭션 실패 시 update-ref 프로세스는 종료되므로 stderr를 회수하고 다음 호출에 재기동
+                error = self._drain_error("refs")
+                raise RuntimeError(f"Git command failed: git update-ref --stdin\nError: {error}")
+
+
+atexit.register(GitCommandChannel.close_all)
+
 
 class GitManager:
     """
     Git Worktree 및 브랜치를 파이썬 subprocess를 통해 제어하는 매니저 클래스.
     GSD 병렬(Parallel) 에이전트 아키텍처 지원 목적.
+    rev-parse/객체 기록/ref 갱신은 가능하면 저장소 공유 GitCommandChannel을 통해 처리합니다.
     """
-    def __init__(self, repo_path: str = "."):
+    _merge_locks_guard = threading.Lock()
+    _merge_locks = {}
+
+    def __init__(self, repo_path: str = ".", use_channel: bool = None):
         self.repo_path = os.path.abspath(repo_path)
+        if use_channel is None:
+            use_channel = os.getenv("GIT_MANAGER_PERSISTENT_CHANNEL", "1").strip().lower() not in ("0", "false", "no", "off")
+        self._channel = GitCommandChannel.for_repo(self.repo_path) if use_channel else None
     
-    def _run_cmd(self, cmd: list, cwd: str = None) -> str:
+    def _run_cmd(self, cmd: list, cwd: str = None, input_text: str = None) -> str:
         if cwd is None:
             cwd = self.repo_path
-            
-        result = subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+        _record_git_stat("subprocess", cmd[1] if len(cmd) > 1 else cmd[0])
+        result = subprocess.run(
+            cmd,
+            cwd=cwd,
+            input=input_text,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+        )
         if result.returncode != 0:
             raise RuntimeError(f"Git command failed: {' '.join(cmd)}\nError: {result.stderr}")
         return result.stdout.strip()
@@ -31,12 +312,11 @@ class GitManager:
         abspath = os.path.abspath(target_path)
         
         # 먼저 부모 브랜치(현재 상태) 확인
-        try:
-            # 브랜치가 존재하는지 확인
-            self._run_cmd(['git', 'rev-parse', '--verify', branch_name])
+        # 브랜치가 존재하는지 확인
+        if self._resolve_commit(f"refs/heads/{branch_name}"):
             # 존재하면 해당 브랜치로 워크트리 생성
             self._run_cmd(['git', 'worktree', 'add', abspath, branch_name])
-        except RuntimeError:
+        else:
             # 존재하지 않으면 새 브랜치로 워크트리 생성
             self._run_cmd(['git', 'worktree', 'add', '-b', branch_name, abspath])
             
@@ -65,22 +345,19 @@ class GitManager:
             if os.path.exists(abspath):
                 shutil.rmtree(abspath, ignore_errors=True)
                 
-        # 연결된 브랜치 삭제
+        # 연결된 브랜치 삭제 (병합이 완료되었다고 가정)
         if branch_name:
+            self.delete_branch(branch_name)
+
+        # 로컬 메타데이터가 남아 있을 때만 prune (반복 호출에도 안전)
+        admin_path = self._worktree_admin_path(abspath)
+        if os.path.exists(admin_path):
             try:
-                # 안전하게 브랜치도 삭제 (병합이 완료되었다고 가정)
-                self._run_cmd(['git', 'branch', '-D', branch_name])
+                self._run_cmd(['git', 'worktree', 'prune', '--expire', 'now'])
             except RuntimeError:
                 pass
 
-        # 로컬 메타데이터 정리 (반복 호출에도 안전)
-        try:
-            self._run_cmd(['git', 'worktree', 'prune', '--expire', 'now'])
-        except RuntimeError:
-            pass
-
         # prune 실패 시 남는 메타 디렉토리까지 강제 정리
-        admin_path = self._worktree_admin_path(abspath)
         if os.path.exists(admin_path):
             shutil.rmtree(admin_path, ignore_errors=True)
 
@@ -102,6 +379,120 @@ class GitManager:
             if "nothing to commit" not in str(e):
                 raise e
 
+    def delete_branch(self, branch_name: str) -> bool:
+        """
+        워크트리 없이 생성된 브랜치를 삭제합니다. 이미 없으면 False를 반환합니다.
+        """
+        if self._channel is not None:
+            branch_ref = f"refs/heads/{branch_name}"
+            if not self._channel.resolve(branch_ref):
+                return False
+            if branch_ref in self._checked_out_refs():
+                # git branch -D와 같이 워크트리(풀 슬롯 포함)에 체크아웃된 브랜치는 지우지 않는다
+                return False
+            try:
+                self._channel.update_refs([(branch_ref, ZERO_OID, None)])
+                return True
+            except RuntimeError:
+                return False
+        try:
+            self._run_cmd(['git', 'branch', '-D', branch_name])
+            return True
+        except RuntimeError:
+            return False
+
+    def _checked_out_refs(self) -> set:
+        """메인/연결된 워크트리들의 HEAD가 가리키는 브랜치 ref 집합 (HEAD 파일을 직접 읽어 프로세스를 띄우지 않는다)"""
+        git_dir = os.path.join(self.repo_path, '.git')
+        if not os.path.isdir(git_dir):
+            listing = self._run_cmd(['git', 'worktree', 'list', '--porcelain'])
+            return {line[len('branch '):] for line in listing.splitlines() if line.startswith('branch ')}
+        head_files = [os.path.join(git_dir, 'HEAD')]
+        admin_dir = os.path.join(git_dir, 'worktrees')
+        if os.path.isdir(admin_dir):
+            head_files.extend(os.path.join(admin_dir, name, 'HEAD') for name in os.listdir(admin_dir))
+        refs = set()
+        for head_file in head_files:
+            try:
+                with open(head_file, 'r', encoding='utf-8') as f:
+                    head = f.read().strip()
+            except OSError:
+                continue
+            if head.startswith('ref: '):
+                refs.add(head[len('ref: '):])
+        return refs
+
+    def _resolve_commit(self, ref: str):
+        if self._channel is not None:
+            return self._channel.resolve(f"{ref}^{{commit}}")
+        try:
+            return self._run_cmd(['git', 'rev-parse', '--verify', '--quiet', f"{ref}^{{commit}}"])
+        except RuntimeError:
+            return None
+
+    def _list_tree_entries(self, commit: str) -> list:
+        if self._channel is not None:
+            return self._channel.list_tree(self._channel.resolve(f"{commit}^{{tree}}"))
+        listing = self._run_cmd(['git', 'ls-tree', '-z', commit])
+        return [entry for entry in listing.split('\0') if entry]
+
+    def _build_tree_with_file(self, parent_commit: str, file_name: str, blob_sha: str) -> str:
+        entries = []
+        if parent_commit:
+            for entry in self._list_tree_entries(parent_commit):
+                _, name = entry.split('\t', 1)
+                if name == file_name:
+                    continue
+                entries.append(entry)
+        entries.append(f"100644 blob {blob_sha}\t{file_name}")
+        if self._channel is not None:
+            return self._channel.mktree(entries)
+        return self._run_cmd(['git', 'mktree', '-z'], input_text=''.join(f"{entry}\0" for entry in entries))
+
+    def _tree_of(self, commit: str) -> str:
+        if self._channel is not None:
+            return self._channel.resolve(f"{commit}^{{tree}}")
+        return self._run_cmd(['git', 'rev-parse', f"{commit}^{{tree}}"])
+
+    def commit_file_to_branch(self, branch_name: str, file_name: str, content: str, message: str, base_ref: str = "HEAD") -> str:
+        """
+        워킹 디렉토리 없이 blob/tree/commit 객체를 object DB에 직접 기록하고 브랜치 ref를 갱신합니다.
+        (hash-object -> mktree -> commit-tree -> update-ref)
+        브랜치가 이미 존재하면 그 위에, 없으면 base_ref 위에 커밋을 쌓습니다.
+        반환값: 브랜치가 가리키는 커밋 SHA.
+        """
+        if not file_name or '/' in file_name or '\\' in file_name:
+            raise ValueError(f"commit_file_to_branch supports only top-level file names: {file_name}")
+
+        branch_ref = f"refs/heads/{branch_name}"
+        old_commit = self._resolve_commit(branch_ref)
+        parent_commit = old_commit or self._resolve_commit(base_ref)
+
+        if self._channel is not None:
+            blob_sha = self._channel.write_blob(content)
+        else:
+            blob_sha = self._run_cmd(['git', 'hash-object', '-w', '--stdin'], input_text=content)
+        tree_sha = self._build_tree_with_file(parent_commit, file_name, blob_sha)
+
+        if parent_commit and tree_sha == self._tree_of(parent_commit):
+            # 변경사항 없음: 브랜치만 보장 (worktree add -b 와 동일한 결과)
+            new_commit = parent_commit
+        elif self._channel is not None:
+            new_commit = self._channel.write_commit(tree_sha, [parent_commit] if parent_commit else [], message)
+        else:
+            commit_cmd = ['git', 'commit-tree', tree_sha]
+            if parent_commit:
+                commit_cmd += ['-p', parent_commit]
+            commit_cmd += ['-m', message]
+            new_commit = self._run_cmd(commit_cmd)
+
+        if new_commit != old_commit and self._channel is not None:
+            # old 값을 함께 넘겨 동시 갱신 시 덮어쓰지 않도록 보호
+            self._channel.update_refs([(branch_ref, new_commit, old_commit or ZERO_OID)])
+        elif new_commit != old_commit:
+            self._run_cmd(['git', 'update-ref', '-m', message, branch_ref, new_commit, old_commit or ''])
+        return new_commit
+
     def merge_branch(self, branch_name: str, allow_unrelated: bool = False):
         """
         현재 컨텍스트(메인 Worktree)로 지정된 브랜치를 병합(merge)합니다.
@@ -112,7 +503,8 @@ class GitManager:
             cmd.append('--allow-unrelated-histories')
             
         try:
-            result = self._run_cmd(cmd)
+            with GitManager._merge_lock_for(self.repo_path):
+                result = self._run_cmd(cmd)
             return True, result
         except RuntimeError as e:
             # 충돌 발생 시
@@ -122,6 +514,109 @@ class GitManager:
             else:
                  raise e
 
+    def _merge_in_progress(self) -> bool:
+        return os.path.exists(os.path.join(self.repo_path, '.git', 'MERGE_HEAD'))
+
+    def _orig_head_stamp(self):
+        """git merge가 시작될 때 기록하는 ORIG_HEAD의 (내용, mtime). 병합이 실제로 시작됐는지 판단하는 데 쓴다."""
+        path = os.path.join(self.repo_path, '.git', 'ORIG_HEAD')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read().strip(), os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _abort_merge(self, orig_head_before=None):
+        """
+        실패한 병합을 되돌린다. 병합이 실제로 시작된 경우(MERGE_HEAD가 있거나, 병합 전에 찍어 둔
+        ORIG_HEAD가 바뀐 경우)에만 reset --merge까지 쓰고, 그렇지 않으면 main 워크트리의 다른 변경을
+        지우지 않도록 예외를 던진다.
+        """
+        started = self._merge_in_progress()
+        if started:
+            try:
+                self._run_cmd(['git', 'merge', '--abort'])
+                return
+            except RuntimeError:
+                pass
+        elif orig_head_before is not None:
+            started = self._orig_head_stamp() != orig_head_before
+        if not started:
+            raise RuntimeError("merge did not start; refusing to reset the main worktree")
+        # 옥토퍼스 실패 등 merge --abort로 되돌리지 못한 병합 변경만 되돌림
+        self._run_cmd(['git', 'reset', '-q', '--merge'])
+
+    def _changed_paths(self, branch_name: str):
+        """main과의 merge-base 이후 브랜치가 바꾼 경로 집합. 공통 조상이 없으면 None."""
+        try:
+            output = self._run_cmd(['git', 'diff', '--name-only', '-z', f"HEAD...{branch_name}"])
+        except RuntimeError:
+            return None
+        return {path for path in output.split('\0') if path}
+
+    def _merge_single(self, branch_name: str, allow_unrelated: bool):
+        try:
+            success, output = self.merge_branch(branch_name, allow_unrelated=allow_unrelated)
+        except RuntimeError as exc:
+            success, output = False, str(exc)
+        if not success and self._merge_in_progress():
+            # 충돌난 병합은 되돌려 다음 브랜치 병합이 가능한 상태로 유지
+            self._abort_merge()
+        return success, output
+
+    def merge_branches(self, branch_names: list, allow_unrelated: bool = False) -> list:
+        """
+        여러 브랜치를 한 번의 병합 사이클로 main에 합칩니다.
+        - 서로 다른 파일만 건드리는 브랜치들은 하나의 옥토퍼스(octopus) 병합 커밋으로 합침
+        - 같은 파일을 건드리거나 공통 조상이 없는 브랜치, 옥토퍼스가 실패한 경우에만 브랜치별 병합으로 폴백
+        반환값: 입력 순서를 따르는 (branch_name, success, mode, output) 목록. mode는 octopus/single.
+        """
+        branch_names = [name for name in dict.fromkeys(branch_names) if name]
+        results = {}
+
+        with GitManager._merge_lock_for(self.repo_path):
+            changed = {name: self._changed_paths(name) for name in branch_names}
+            path_owners = {}
+            for name, paths in changed.items():
+                for path in paths or ():
+                    path_owners.setdefault(path, []).append(name)
+
+            batch, fallback = [], []
+            for name in branch_names:
+                paths = changed[name]
+                if paths is None or any(len(path_owners[path]) > 1 for path in paths):
+                    fallback.append(name)
+                else:
+                    batch.append(name)
+
+            if len(batch) > 1:
+                cmd = ['git', 'merge', '--no-ff', '-m', f"Merge {len(batch)} component branches into main", *batch]
+                if allow_unrelated:
+                    cmd.append('--allow-unrelated-histories')
+                orig_head_before = self._orig_head_stamp()
+                try:
+                    output = self._run_cmd(cmd)
+                    for name in batch:
+                        results[name] = (name, True, "octopus", output)
+                except RuntimeError:
+                    self._abort_merge(orig_head_before)
+                    fallback = batch + fallback
+            else:
+                fallback = batch + fallback
+
+            for name in branch_names:
+                if name in fallback:
+                    success, output = self._merge_single(name, allow_unrelated)
+                    results[name] = (name, success, "single", output)
+
+        return [results[name] for name in branch_names]
+
+    @classmethod
+    def _merge_lock_for(cls, repo_path: str) -> threading.RLock:
+        # 같은 프로세스에서 동시에 실행되는 run들의 main 병합을 직렬화 (index.lock 경합 방지)
+        with cls._merge_locks_guard:
+            return cls._merge_locks.setdefault(os.path.abspath(repo_path), threading.RLock())
+
     def _extract_branch_name(self, branch_ref: str):
         if not branch_ref:
             return None
@@ -192,6 +687,164 @@ class GitManager:
 
         return cleaned
 
+class WorktreePool:
+    """
+    미리 만들어 둔 worktree 슬롯(worktrees/pool_<n>)을 GenerationAgent 작업자에게 빌려주는 풀.
+    슬롯은 detached HEAD 상태로 유지되며, 대여 시 `checkout -B`로 브랜치를 붙이고
+    반납 시 `reset --hard` + `checkout --detach <main HEAD>` + `clean -fd`로 초기화되어 다음 작업자가 재사용합니다.
+    같은 저장소를 쓰는 다른 프로세스와는 슬롯별 파일 잠금(flock)으로 충돌을 피합니다.
+    """
+    def __init__(self, git_manager: GitManager, size: int, slot_prefix: str = "worktrees/pool_"):
+        self.git_manager = git_manager
+        self.size = max(1, int(size))
+        self.slot_prefix = slot_prefix
+        self.lock_dir = os.path.join(git_manager.repo_path, '.git', 'builder_pool_locks')
+        self._cond = threading.Condition()
+        self._leased = {}
+        self._ready = set()
+
+    def slot_path(self, index: int) -> str:
+        return os.path.join(self.git_manager.repo_path, f"{self.slot_prefix}{index}")
+
+    def _try_lock(self, index: int):
+        if fcntl is None:
+            return -1
+        os.makedirs(self.lock_dir, exist_ok=True)
+        fd = os.open(os.path.join(self.lock_dir, f"pool_{index}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+
+    @staticmethod
+    def _unlock(fd):
+        if fd is None or fd < 0:
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def _registered_paths(self) -> set:
+        return {os.path.abspath(entry["path"]) for entry in self.git_manager.list_worktrees() if entry.get("path")}
+
+    def _ensure_slot(self, index: int) -> str:
+        path = self.slot_path(index)
+        if index in self._ready and os.path.isdir(path):
+            return path
+        if os.path.isdir(path) and os.path.abspath(path) in self._registered_paths():
+            self._ready.add(index)
+            return path
+        # 등록이 끊긴 잔여 디렉토리/메타데이터 정리 후 새로 생성
+        if os.path.exists(path):
+            shutil.rmtree(path, ignore_errors=True)
+        self.git_manager._run_cmd(['git', 'worktree', 'prune', '--expire', 'now'])
+        self.git_manager._run_cmd(['git', 'worktree', 'add', '--detach', path, 'HEAD'])
+        self._ready.add(index)
+        return path
+
+    def lease(self, timeout: float = None) -> str:
+        """빈 슬롯을 하나 잠그고 경로를 반환합니다. 모든 슬롯이 사용 중이면 반납될 때까지 대기합니다."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                for index in range(self.size):
+                    if index in self._leased:
+                        continue
+                    fd = self._try_lock(index)
+                    if fd is None:
+                        continue
+                    self._leased[index] = fd
+                    break
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("No worktree pool slot available.")
+                    # 다른 프로세스가 잡은 슬롯은 알림이 오지 않으므로 짧게 폴링
+                    self._cond.wait(0.2 if remaining is None else min(0.2, remaining))
+                    continue
+                break
+
+        try:
+            return self._ensure_slot(index)
+        except Exception:
+            self._return_slot(index)
+            raise
+
+    def checkout(self, slot_path: str, branch_name: str, start_point: str = None):
+        """슬롯에서 브랜치를 (재)생성해 체크아웃합니다. 기본 시작점은 기존 브랜치 끝 또는 메인 HEAD."""
+        if start_point is None:
+            start_point = (
+                self.git_manager._resolve_commit(f"refs/heads/{branch_name}")
+                or self.git_manager._resolve_commit("HEAD")
+            )
+        self.git_manager._run_cmd(['git', 'checkout', '-q', '-B', branch_name, start_point], cwd=slot_path)
+
+    def _reset_slot(self, slot_path: str):
+        # 메인 HEAD 위치로 분리(detach)하여 브랜치를 놓아주고 작업 내용을 모두 폐기
+        main_head = self.git_manager._resolve_commit("HEAD")
+        self.git_manager._run_cmd(['git', 'reset', '-q', '--hard'], cwd=slot_path)
+        self.git_manager._run_cmd(['git', 'checkout', '-q', '--detach', main_head], cwd=slot_path)
+        self.git_manager._run_cmd(['git', 'clean', '-q', '-fd'], cwd=slot_path)
+
+    def _return_slot(self, index: int):
+        with self._cond:
+            fd = self._leased.pop(index, None)
+            self._unlock(fd)
+            self._cond.notify()
+
+    def release(self, slot_path: str):
+        """슬롯을 초기화하고 풀에 반납합니다. 초기화에 실패한 슬롯은 제거 후 다음 대여 때 재생성됩니다."""
+        abspath = os.path.abspath(slot_path)
+        index = next((i for i in range(self.size) if os.path.abspath(self.slot_path(i)) == abspath), None)
+        try:
+            self._reset_slot(abspath)
+        except Exception as exc:
+            print(f"[WorktreePool] Warning: slot reset failed, recreating later ({abspath}): {exc}")
+            self._ready.discard(index)
+            self.git_manager.remove_worktree(abspath, force=True)
+        finally:
+            if index is not None:
+                self._return_slot(index)
+
+    def recover(self) -> list:
+        """
+        이전 프로세스가 남긴 슬롯을 초기화합니다 (삭제하지 않고 재사용).
+        다른 프로세스가 사용 중인(잠긴) 슬롯은 건너뜁니다. 반환값: 초기화된 슬롯 경로 목록.
+        """
+        recovered = []
+        for entry in self.git_manager.list_worktrees():
+            path = entry.get("path")
+            if not path:
+                continue
+            abspath = os.path.abspath(path)
+            relpath = os.path.relpath(abspath, self.git_manager.repo_path).replace("\\", "/")
+            suffix = relpath[len(self.slot_prefix):] if relpath.startswith(self.slot_prefix) else ""
+            if not suffix.isdigit():
+                continue
+            index = int(suffix)
+            with self._cond:
+                if index in self._leased:
+                    continue
+                fd = self._try_lock(index)
+            if fd is None:
+                continue
+            try:
+                if not os.path.isdir(abspath):
+                    continue
+                if entry.get("branch_name") is None and not self.git_manager._run_cmd(['git', 'status', '--porcelain'], cwd=abspath):
+                    continue
+                self._reset_slot(abspath)
+                recovered.append(abspath)
+            except Exception as exc:
+                print(f"[WorktreePool] Warning: failed to recover slot {abspath}: {exc}")
+            finally:
+                self._unlock(fd)
+        return recovered
+
+
 # 직접 모듈 테스트 실행용 (필요시)
 if __name__ == '__main__':
     gm = GitManager()
@@ -0,0 +1,380 @@
+"""
+Append-only run journal.
+
+실행 중인 run은 `<journal_dir>/<run_id>.jsonl`에 변경분(delta) 이벤트만 한 줄씩 추가한다.
+- start:   run 메타데이터 (session_id, request)
+- track:   Git 자원(브랜치/워크트리) 생성 의도 기록
+- untrack: 자원 정리 완료
+- status:  상태/에러 변경 (finished=True면 종료)
+
+종료된 run은 compact()로 기존 `run_<id>.json` 요약 형식으로 접어서 저장하고 .jsonl은 삭제한다.
+복구 도구는 replay_events()로 .jsonl을 재생해 동일한 요약 payload를 얻는다.
+
+실행 중인 run 목록은 `<journal_dir>/active/<run_id>` 마커 파일(매니페스트)로 유지한다.
+시작 시 복구는 이 디렉토리만 읽으므로 누적된 저널 수와 무관하게 O(active)이다.
+매니페스트 도입 이전의 저널은 sweep 완료 마커가 없을 때 한 번만 전체 스캔한다.
+"""
+
+import json
+import os
+import socket
+import threading
+from datetime import datetime, timezone
+
+EVENT_SUFFIX = ".jsonl"
+SUMMARY_SUFFIX = ".json"
+ACTIVE_DIR_NAME = "active"
+LEGACY_SWEEP_MARKER = ".legacy_sweep_done"
+
+# 프로세스 전역 저널 쓰기 통계 (/metrics 노출용)
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def _record_stat(name: str, amount: int = 1):
+    with _stats_lock:
+        _stats[name] = _stats.get(name, 0) + amount
+
+
+def get_journal_stats() -> dict:
+    """{events, flushes, fsyncs, summaries, json_writes(요약 + 매니페스트 마커)}"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def utcnow_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def write_json_atomic(path: str, payload: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _record_stat("json_writes")
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def _resource_key(branch_name, worktree_path):
+    return (branch_name or "", worktree_path or "")
+
+
+def replay_events(path: str, base: dict = None) -> dict:
+    """
+    이벤트 로그를 재생해 run 요약 payload(기존 run_*.json 형식)를 만든다.
+    base가 주어지면 (이미 접힌 요약 뒤에 이어진 로그) 그 위에 이벤트를 적용한다.
+    """
+    run_id = os.path.basename(path)[: -len(EVENT_SUFFIX)]
+    payload = {
+        "run_id": run_id,
+        "session_id": None,
+        "status": "running",
+        "request": None,
+        "created_at": None,
+        "updated_at": None,
+        "finished_at": None,
+        "error": None,
+        "timed_out_stages": [],
+        "resources": [],
+    }
+    if base:
+        payload.update(base)
+    resources = {
+        _resource_key(resource.get("branch_name"), resource.get("worktree_path")): dict(resource)
+        for resource in payload.get("resources") or []
+    }
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                # 크래시로 잘린 마지막 줄은 무시
+                continue
+            kind = event.get("event")
+            ts = event.get("ts")
+            payload["updated_at"] = ts or payload["updated_at"]
+
+            if kind == "start":
+                payload["session_id"] = event.get("session_id")
+                payload["request"] = event.get("request")
+                payload["created_at"] = ts
+            elif kind == "track":
+                resource = dict(event.get("resource") or {})
+                resources[_resource_key(resource.get("branch_name"), resource.get("worktree_path"))] = resource
+            elif kind == "untrack":
+                resources.pop(_resource_key(event.get("branch_name"), event.get("worktree_path")), None)
+            elif kind == "status":
+                if event.get("status") is not None:
+                    payload["status"] = event["status"]
+                if event.get("error") is not None:
+                    payload["error"] = event["error"]
+                if event.get("finished"):
+                    payload["finished_at"] = ts
+            elif kind == "deadline":
+                stages = list(payload.get("timed_out_stages") or [])
+                if event.get("stage") not in stages:
+                    stages.append(event.get("stage"))
+                payload["timed_out_stages"] = stages
+
+    payload["resources"] = sorted(
+        resources.values(),
+        key=lambda item: (item.get("component") or "", item.get("branch_name") or ""),
+    )
+    return payload
+
+
+def summary_path_for(journal_path: str) -> str:
+    if journal_path.endswith(EVENT_SUFFIX):
+        return journal_path[: -len(EVENT_SUFFIX)] + SUMMARY_SUFFIX
+    return journal_path
+
+
+def load_journal(path: str):
+    """.jsonl(이벤트 로그) 또는 .json(요약/레거시) 저널을 읽어 payload 반환. 실패 시 None."""
+    try:
+        if path.endswith(EVENT_SUFFIX):
+            # 요약이 이미 있으면(종료 후 이어진 이벤트) 요약 위에 재생한다.
+            summary_path = summary_path_for(path)
+            base = load_journal(summary_path) if os.path.exists(summary_path) else None
+            return replay_events(path, base=base)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def iter_journals(journal_dir: str):
+    """(path, payload) 순회. 같은 run의 이벤트 로그와 요약이 모두 있으면 이벤트 로그를 우선한다."""
+    if not os.path.isdir(journal_dir):
+        return
+
+    file_names = sorted(os.listdir(journal_dir))
+    event_runs = {name[: -len(EVENT_SUFFIX)] for name in file_names if name.endswith(EVENT_SUFFIX)}
+    for file_name in file_names:
+        if file_name.endswith(SUMMARY_SUFFIX) and file_name[: -len(SUMMARY_SUFFIX)] in event_runs:
+            continue
+        if not (file_name.endswith(EVENT_SUFFIX) or file_name.endswith(SUMMARY_SUFFIX)):
+            continue
+        path = os.path.join(journal_dir, file_name)
+        payload = load_journal(path)
+        if payload is not None:
+            yield path, payload
+
+
+def iter_running_journals(journal_dir: str):
+    for path, payload in iter_journals(journal_dir):
+        if payload.get("status") == "running":
+            yield path, payload
+
+
+def write_summary(journal_path: str, payload: dict) -> str:
+    """
+    요약 payload를 run_*.json으로 저장하고, 원본이 이벤트 로그면 삭제한다.
+    종료 상태면 활성 매니페스트에서도 제거한다.
+    """
+    summary_path = summary_path_for(journal_path)
+    write_json_atomic(summary_path, payload)
+    _record_stat("summaries")
+    if summary_path != journal_path:
+        try:
+            os.remove(journal_path)
+        except FileNotFoundError:
+            pass
+    if payload.get("status") != "running":
+        run_id = payload.get("run_id") or os.path.basename(summary_path)[: -len(SUMMARY_SUFFIX)]
+        clear_active(os.path.dirname(summary_path), run_id)
+    return summary_path
+
+
+# --- 활성 run 매니페스트 ---
+
+def active_dir_for(journal_dir: str) -> str:
+    return os.path.join(journal_dir, ACTIVE_DIR_NAME)
+
+
+def mark_active(journal_dir: str, run_id: str):
+    write_json_atomic(
+        os.path.join(active_dir_for(journal_dir), run_id),
+        {"run_id": run_id, "pid": os.getpid(), "host": socket.gethostname(), "started_at": utcnow_iso()},
+    )
+
+
+def clear_active(journal_dir: str, run_id: str):
+    try:
+        os.remove(os.path.join(active_dir_for(journal_dir), run_id))
+    except FileNotFoundError:
+        pass
+
+
+def is_active(journal_dir: str, run_id: str) -> bool:
+    return bool(run_id) and os.path.exists(os.path.join(active_dir_for(journal_dir), run_id))
+
+
+def iter_active_journals(journal_dir: str):
+    """
+    매니페스트에 등록된 run만 읽어 (path, payload) 순회 (status == running).
+    종료되었지만 compact 전에 중단된 run은 여기서 요약으로 접고 매니페스트에서 뺀다.
+    """
+    active_dir = active_dir_for(journal_dir)
+    try:
+        run_ids = sorted(name for name in os.listdir(active_dir) if not name.endswith(".tmp"))
+    except FileNotFoundError:
+        return
+
+    for run_id in run_ids:
+        event_path = os.path.join(journal_dir, f"{run_id}{EVENT_SUFFIX}")
+        summary_path = os.path.join(journal_dir, f"{run_id}{SUMMARY_SUFFIX}")
+        path = event_path if os.path.exists(event_path) else summary_path
+        payload = load_journal(path) if os.path.exists(path) else None
+        if payload is None:
+            # 마커만 남고 저널이 없음 (start 이벤트 기록 전 중단)
+            clear_active(journal_dir, run_id)
+            continue
+        if payload.get("status") != "running":
+            write_summary(path, payload)
+            continue
+        yield path, payload
+
+
+def legacy_sweep_done(journal_dir: str) -> bool:
+    return os.path.exists(os.path.join(journal_dir, LEGACY_SWEEP_MARKER))
+
+
+def mark_legacy_sweep_done(journal_dir: str):
+    write_json_atomic(os.path.join(journal_dir, LEGACY_SWEEP_MARKER), {"swept_at": utcnow_iso()})
+
+
+def compact_finished(journal_dir: str) -> list:
+    """종료 상태까지 기록되었지만 요약으로 접히지 못한 이벤트 로그를 정리한다."""
+    compacted = []
+    if not os.path.isdir(journal_dir):
+        return compacted
+    for file_name in sorted(os.listdir(journal_dir)):
+        if not file_name.endswith(EVENT_SUFFIX):
+            continue
+        path = os.path.join(journal_dir, file_name)
+        payload = load_journal(path)
+        if payload is None or payload.get("status") == "running":
+            continue
+        compacted.append(write_summary(path, payload))
+    return compacted
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+def _get_flag_env(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return str(raw).strip().lower() in ("1", "true", "yes", "on")
+
+
+class RunJournal:
+    """
+    run별 append-only 이벤트 저널 작성기.
+    - flush_every: 이벤트 N개마다 OS로 flush (status 이벤트는 항상 즉시 flush)
+    - fsync: flush 시 os.fsync까지 수행할지 여부
+    """
+
+    def __init__(self, journal_dir: str, flush_every: int = None, fsync: bool = None):
+        self.journal_dir = os.path.abspath(journal_dir)
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self.flush_every = flush_every or _get_int_env("ORCHESTRATOR_JOURNAL_FLUSH_EVERY", 1)
+        self.fsync = _get_flag_env("ORCHESTRATOR_JOURNAL_FSYNC", False) if fsync is None else fsync
+        self._lock = threading.Lock()
+        self._handles = {}  # run_id -> [file, pending_count]
+
+    def path_for(self, run_id: str) -> str:
+        return os.path.join(self.journal_dir, f"{run_id}{EVENT_SUFFIX}")
+
+    def summary_path_for(self, run_id: str) -> str:
+        return os.path.join(self.journal_dir, f"{run_id}{SUMMARY_SUFFIX}")
+
+    def _flush_locked(self, handle):
+        handle[0].flush()
+        _record_stat("flushes")
+        if self.fsync:
+            os.fsync(handle[0].fileno())
+            _record_stat("fsyncs")
+        handle[1] = 0
+
+    def _append(self, run_id: str, event: dict, force_flush: bool = False):
+        event["ts"] = utcnow_iso()
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            handle = self._handles.get(run_id)
+            if handle is None:
+                handle = [open(self.path_for(run_id), "a", encoding="utf-8"), 0]
+                self._handles[run_id] = handle
+            handle[0].write(line)
+            _record_stat("events")
+            handle[1] += 1
+            if force_flush or handle[1] >= self.flush_every:
+                self._flush_locked(handle)
+
+    def start(self, run_id: str, session_id: str, request: str):
+        # 매니페스트를 먼저 기록해야 start 직후 크래시도 시작 시 복구 대상이 된다.
+        mark_active(self.journal_dir, run_id)
+        self._append(
+            run_id,
+            {"event": "start", "session_id": session_id, "request": request},
+            force_flush=True,
+        )
+
+    def track(self, run_id: str, resource: dict):
+        self._append(run_id, {"event": "track", "resource": resource})
+
+    def untrack(self, run_id: str, branch_name: str, worktree_path: str):
+        self._append(run_id, {"event": "untrack", "branch_name": branch_name, "worktree_path": worktree_path})
+
+    def set_status(self, run_id: str, status: str = None, error: str = None, finished: bool = False):
+        self._append(
+            run_id,
+            {"event": "status", "status": status, "error": error, "finished": finished},
+            force_flush=True,
+        )
+        if finished:
+            self.compact(run_id)
+
+    def deadline_exceeded(self, run_id: str, stage: str):
+        """run 예산이 소진된 단계를 기록 (즉시 flush)"""
+        self._append(run_id, {"event": "deadline", "stage": stage}, force_flush=True)
+
+    def flush(self, run_id: str = None):
+        with self._lock:
+            if run_id is None:
+                handles = list(self._handles.values())
+            else:
+                handles = [self._handles[run_id]] if run_id in self._handles else []
+            for handle in handles:
+                self._flush_locked(handle)
+
+    def _close(self, run_id: str):
+        with self._lock:
+            handle = self._handles.pop(run_id, None)
+            if handle is not None:
+                self._flush_locked(handle)
+                handle[0].close()
+
+    def compact(self, run_id: str):
+        """종료된 run의 이벤트 로그를 run_<id>.json 요약으로 접는다."""
+        self._close(run_id)
+        path = self.path_for(run_id)
+        if not os.path.exists(path):
+            return None
+        payload = load_journal(path)
+        if payload is not None:
+            write_summary(path, payload)
+        return payload
+
+    def close(self):
+        with self._lock:
+            run_ids = list(self._handles)
+        for run_id in run_ids:
+            self._close(run_id)
@@ -67,6 +67,8 @@ def main() -> int:
     args = parser.parse_args()
 
     os.environ["ORCHESTRATOR_DISABLE_MERGE"] = "1"
+    # 저장된 페이지 재사용 없이 생성/커밋/정리 경로 전체를 검증
+    os.environ.setdefault("PAGE_CACHE_ENABLED", "0")
     os.environ["AI_PROVIDER"] = args.provider
     os.environ["AI_MODEL"] = args.model
 
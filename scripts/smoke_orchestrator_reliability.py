@@ -88,6 +88,8 @@ def main() -> int:
 
     disable_merge = not args.allow_merge
     os.environ["ORCHESTRATOR_DISABLE_MERGE"] = "1" if disable_merge else "0"
+    # 저장된 페이지 재사용 없이 생성/커밋/정리 경로 전체를 검증
+    os.environ.setdefault("PAGE_CACHE_ENABLED", "0")
     print(
         "[mode] ORCHESTRATOR_DISABLE_MERGE="
         f"{os.environ['ORCHESTRATOR_DISABLE_MERGE']}"
@@ -21,6 +21,7 @@ if REPO_ROOT not in sys.path:
     sys.path.append(REPO_ROOT)
 
 from core.orchestrator import Orchestrator
+from src.utils.llm_router import get_llm_cache_stats
 
 
 PROMPTS = [
@@ -133,6 +134,8 @@ def main() -> int:
         "no_fallback_count": no_fallback_count,
         "no_fallback_rate": round((no_fallback_count / total) * 100, 2) if total else 0.0,
         "duration_total_sec": round(time.time() - started, 3),
+        # 반복 실행 시 프롬프트 → 응답 캐시 적중 현황 (LLM_CACHE_ENABLED=0이면 비어 있음)
+        "llm_cache": {f"{role}:{result}": count for (role, result), count in sorted(get_llm_cache_stats().items())},
     }
 
     report = {"summary": summary, "rows": report_rows}
@@ -0,0 +1,350 @@
+import abc
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+from typing import Callable, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_JSON_LIBRARY_PATH = os.path.join(BASE_DIR, "output", "components")
+DEFAULT_SQLITE_PATH = os.path.join(BASE_DIR, "output", "components.sqlite3")
+SUPPORTED_BACKENDS = ("json", "sqlite")
+
+_change_listeners = []
+_change_listeners_lock = threading.Lock()
+
+
+def add_change_listener(listener: Callable[[str], None]):
+    """
+    같은 프로세스에서 컴포넌트가 저장/삭제될 때 listener(name)를 호출한다.
+    바운드 메서드는 약한 참조로 보관하므로 소유 객체가 사라지면 자동으로 해제된다.
+    """
+    ref = weakref.WeakMethod(listener) if hasattr(listener, "__self__") else (lambda: listener)
+    with _change_listeners_lock:
+        _change_listeners.append(ref)
+
+
+def _notify_change(name: str):
+    with _change_listeners_lock:
+        alive = [(ref, ref()) for ref in _change_listeners]
+        _change_listeners[:] = [ref for ref, listener in alive if listener is not None]
+    for _, listener in alive:
+        if listener is None:
+            continue
+        try:
+            listener(name)
+        except Exception as e:
+            print(f"[ComponentStore] 변경 리스너 오류 ({name}): {e}")
+
+
+class ComponentFileLock:
+    """컴포넌트별 프로세스 간 배타 락 (fcntl.flock, 미지원 플랫폼에서는 no-op)."""
+
+    def __init__(self, lock_path: str):
+        self.lock_path = lock_path
+        self._fd = None
+
+    def acquire(self):
+        if fcntl is None:
+            return
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self):
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class ComponentStore(abc.ABC):
+    """
+    컴포넌트 메타데이터 저장소 인터페이스.
+    - entry_token(name): 항목 변경 감지용 토큰 (없으면 None). 캐시 검증에 사용한다.
+    - revision(): 저장소 전체 변경 감지용 토큰. names() 결과 캐싱에 사용한다.
+    """
+    backend = ""
+
+    def __init__(self, location: str):
+        self.location = os.path.abspath(location)
+        self._names_lock = threading.Lock()
+        self._names_cache = (None, [])
+
+    @abc.abstractmethod
+    def get(self, name: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def put(self, name: str, component: dict):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, name: str) -> bool:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def entry_token(self, name: str):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def revision(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _scan_names(self) -> list:
+        raise NotImplementedError
+
+    def names(self) -> list:
+        """저장된 컴포넌트 이름 목록 (revision이 바뀌었을 때만 다시 스캔)."""
+        revision = self.revision()
+        with self._names_lock:
+            cached_revision, cached_names = self._names_cache
+            if revision is not None and revision == cached_revision:
+                return list(cached_names)
+        names = sorted(self._scan_names())
+        with self._names_lock:
+            self._names_cache = (revision, names)
+        return list(names)
+
+    def items(self) -> Iterator[Tuple[str, dict]]:
+        for name in self.names():
+            component = self.get(name)
+            if component is not None:
+                yield name, component
+
+    def lock(self, name: str) -> ComponentFileLock:
+        return ComponentFileLock(os.path.join(self.lock_dir, f"{name}.lock"))
+
+    @property
+    @abc.abstractmethod
+    def lock_dir(self) -> str:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonDirectoryComponentStore(ComponentStore):
+    """기존 레이아웃: <location>/<name>.json 파일 하나당 컴포넌트 하나."""
+    backend = "json"
+
+    def __init__(self, location: str):
+        super().__init__(location)
+        os.makedirs(self.location, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.location, f"{name}.json")
+
+    @property
+    def lock_dir(self) -> str:
+        return os.path.join(self.location, ".locks")
+
+    def get(self, name: str) -> Optional[dict]:
+        try:
+            with open(self._path(name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, name: str, component: dict):
+        # 다른 프로세스가 읽는 도중 반쯤 쓰인 JSON을 보지 않도록 임시 파일에 쓴 뒤 교체한다.
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=self.location)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(component, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self._path(name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        _notify_change(name)
+
+    def delete(self, name: str) -> bool:
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            return False
+        _notify_change(name)
+        return True
+
+    def entry_token(self, name: str):
+        try:
+            stat = os.stat(self._path(name))
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def revision(self):
+        # 파일 추가/삭제/os.replace는 디렉토리 mtime을 갱신한다.
+        try:
+            return os.stat(self.location).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _scan_names(self) -> list:
+        try:
+            return [
+                file_name[:-5]
+                for file_name in os.listdir(self.location)
+                if file_name.endswith('.json') and not file_name.startswith('.')
+            ]
+        except OSError:
+            return []
+
+
+class SqliteComponentStore(ComponentStore):
+    """
+    단일 SQLite 파일에 모든 컴포넌트를 저장하는 팩 저장소.
+    이름 인덱스(PRIMARY KEY)로 조회하므로 디렉토리 스캔/파일별 open이 없다.
+    """
+    backend = "sqlite"
+
+    def __init__(self, location: str):
+        super().__init__(location)
+        os.makedirs(os.path.dirname(self.location), exist_ok=True)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS components ("
+                "name TEXT PRIMARY KEY, body TEXT NOT NULL, version INTEGER NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('revision', 0)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.location, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @property
+    def lock_dir(self) -> str:
+        return f"{self.location}.locks"
+
+    def get(self, name: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT body FROM components WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, name: str, component: dict):
+        body = json.dumps(component, ensure_ascii=False)
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'revision'")
+            (revision,) = conn.execute("SELECT value FROM store_meta WHERE key = 'revision'").fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO components (name, body, version, updated_at) VALUES (?, ?, ?, ?)",
+                (name, body, revision, time.time()),
+            )
+        _notify_change(name)
+
+    def delete(self, name: str) -> bool:
+        conn = self._conn()
+        with conn:
+            deleted = conn.execute("DELETE FROM components WHERE name = ?", (name,)).rowcount
+            if deleted:
+                conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'revision'")
+        if deleted:
+            _notify_change(name)
+        return bool(deleted)
+
+    def entry_token(self, name: str):
+        row = self._conn().execute("SELECT version FROM components WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def revision(self):
+        row = self._conn().execute("SELECT value FROM store_meta WHERE key = 'revision'").fetchone()
+        return row[0] if row else None
+
+    def _scan_names(self) -> list:
+        return [row[0] for row in self._conn().execute("SELECT name FROM components")]
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def resolve_store_config(backend: str = None, location: str = None) -> Tuple[str, str]:
+    backend = (backend or os.getenv("COMPONENT_STORE_BACKEND", "json")).strip().lower()
+    if backend not in SUPPORTED_BACKENDS:
+        print(f"[ComponentStore] 알 수 없는 COMPONENT_STORE_BACKEND='{backend}' → json 사용")
+        backend = "json"
+    if location is None:
+        if backend == "sqlite":
+            location = os.getenv("COMPONENT_STORE_DB_PATH", DEFAULT_SQLITE_PATH)
+        else:
+            location = os.getenv("COMPONENT_LIBRARY_PATH", DEFAULT_JSON_LIBRARY_PATH)
+    return backend, os.path.abspath(location)
+
+
+def get_component_store(backend: str = None, location: str = None) -> ComponentStore:
+    """환경 변수(COMPONENT_STORE_BACKEND 등)에 따른 프로세스 공유 저장소 인스턴스 반환"""
+    backend, location = resolve_store_config(backend, location)
+    key = (backend, location)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store_cls = SqliteComponentStore if backend == "sqlite" else JsonDirectoryComponentStore
+            store = store_cls(location)
+            _stores[key] = store
+        return store
+
+
+def copy_components(source: ComponentStore, target: ComponentStore) -> int:
+    copied = 0
+    for name, component in source.items():
+        target.put(name, component)
+        copied += 1
+    return copied
+
+
+def import_json_directory(store: ComponentStore, json_dir: str) -> int:
+    """JSON-파일-하나당-컴포넌트 레이아웃을 store로 가져온다."""
+    return copy_components(JsonDirectoryComponentStore(json_dir), store)
+
+
+def export_json_directory(store: ComponentStore, json_dir: str) -> int:
+    """store의 컴포넌트를 JSON-파일-하나당-컴포넌트 레이아웃으로 내보낸다."""
+    return copy_components(store, JsonDirectoryComponentStore(json_dir))
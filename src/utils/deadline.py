@@ -0,0 +1,143 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """run 전체 예산이 소진되어 단계(stage)의 대기를 중단했을 때 발생한다."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"deadline exceeded during {stage} stage")
+        self.stage = stage
+
+
+# 동기 호출(chain.invoke)을 기한 내에서만 기다리기 위한 공유 풀.
+# 기한이 지나면 호출자는 즉시 폴백으로 넘어가고, 이미 시작된 호출은 백그라운드에서 끝까지 실행된 뒤 버려진다.
+_sync_executor = None
+_sync_executor_lock = threading.Lock()
+
+
+def _get_sync_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _sync_executor
+    with _sync_executor_lock:
+        if _sync_executor is None:
+            try:
+                max_workers = max(1, int(os.getenv("DEADLINE_SYNC_WORKERS", "16")))
+            except (TypeError, ValueError):
+                max_workers = 16
+            _sync_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="DeadlineCall"
+            )
+        return _sync_executor
+
+
+class Deadline:
+    """
+    run 하나의 전체 시간 예산. run_pipeline에서 만들어 모든 에이전트 호출에 전달한다.
+    - seconds가 None/0 이하이면 무제한 (기존 동작)
+    - wait()/call()/result()는 남은 시간만큼만 기다리고, 초과 시 진행 중인 작업을 취소한 뒤 DeadlineExceeded를 던진다.
+    - 처음 초과된 단계는 timed_out_stages에 기록되고 on_timeout(stage) 콜백으로 알린다 (저널/텔레메트리 기록용).
+    """
+
+    def __init__(self, seconds: Optional[float] = None, on_timeout: Callable[[str], None] = None):
+        self.seconds = seconds if seconds and seconds > 0 else None
+        self.expires_at = time.monotonic() + self.seconds if self.seconds else None
+        self.on_timeout = on_timeout
+        self._lock = threading.Lock()
+        self._timed_out_stages = []
+
+    @classmethod
+    def from_env(cls, on_timeout: Callable[[str], None] = None) -> "Deadline":
+        raw = os.getenv("ORCHESTRATOR_RUN_TIMEOUT_SECONDS", "0")
+        try:
+            seconds = float(raw)
+        except (TypeError, ValueError):
+            seconds = 0.0
+        return cls(seconds, on_timeout=on_timeout)
+
+    @classmethod
+    def coerce(cls, value, on_timeout: Callable[[str], None] = None) -> "Deadline":
+        """None → 환경 변수 기본값, 숫자 → 초 단위 예산, Deadline → 그대로 (콜백이 없으면 연결)"""
+        if isinstance(value, Deadline):
+            if value.on_timeout is None:
+                value.on_timeout = on_timeout
+            return value
+        if value is None:
+            return cls.from_env(on_timeout=on_timeout)
+        return cls(float(value), on_timeout=on_timeout)
+
+    @property
+    def timed_out_stages(self) -> list:
+        with self._lock:
+            return list(self._timed_out_stages)
+
+    def remaining(self) -> Optional[float]:
+        """남은 초 (무제한이면 None)"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def mark_timeout(self, stage: str):
+        with self._lock:
+            first = stage not in self._timed_out_stages
+            if first:
+                self._timed_out_stages.append(stage)
+        if first:
+            print(f"[Deadline] ⏱️ {stage} 단계에서 run 예산({self.seconds:g}s) 초과 → 폴백 사용")
+            if self.on_timeout is not None:
+                try:
+                    self.on_timeout(stage)
+                except Exception as e:
+                    print(f"[Deadline] on_timeout 콜백 오류: {e}")
+
+    def _exceeded(self, stage: str) -> DeadlineExceeded:
+        self.mark_timeout(stage)
+        return DeadlineExceeded(stage)
+
+    async def wait(self, awaitable, stage: str):
+        """awaitable을 남은 시간 안에서 기다린다. 초과 시 awaitable(코루틴/태스크)은 취소된다."""
+        remaining = self.remaining()
+        if remaining is None:
+            return await awaitable
+        if remaining <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            elif isinstance(awaitable, asyncio.Future):
+                awaitable.cancel()
+            raise self._exceeded(stage)
+        try:
+            return await asyncio.wait_for(awaitable, timeout=remaining)
+        except asyncio.TimeoutError:
+            raise self._exceeded(stage) from None
+
+    def result(self, future: concurrent.futures.Future, stage: str, cancel: bool = True):
+        """
+        concurrent.futures.Future를 남은 시간만큼만 기다린다.
+        초과 시 cancel=True면 아직 시작 전인 작업을 취소한다 (다른 대기자와 공유하는 future는 cancel=False).
+        """
+        try:
+            return future.result(timeout=self.remaining())
+        except concurrent.futures.TimeoutError:
+            if cancel:
+                future.cancel()
+            raise self._exceeded(stage) from None
+
+    def call(self, func, *args, stage: str, **kwargs):
+        """동기 함수를 남은 시간 안에서 실행한다. 무제한이면 호출 스레드에서 그대로 실행한다."""
+        if self.expires_at is None:
+            return func(*args, **kwargs)
+        if self.expired():
+            raise self._exceeded(stage)
+        return self.result(_get_sync_executor().submit(func, *args, **kwargs), stage)
+
+
+def ensure_deadline(deadline: Optional[Deadline]) -> Deadline:
+    """에이전트를 단독 호출할 때(deadline=None)는 무제한 Deadline으로 취급"""
+    return deadline if deadline is not None else Deadline(None)
@@ -0,0 +1,188 @@
+"""
+프롬프트 → 응답 캐시 (llm_router의 캐시 래퍼가 사용).
+
+키: (provider, model, temperature, 호출 파라미터, 전체 프롬프트)의 sha256.
+메모리 LRU + SQLite 디스크 계층의 2단 구성이며, 디스크 계층은 TTL과 총 바이트 한도로 정리한다.
+라이브러리를 비운 뒤 같은 컴포넌트를 다시 생성하거나 같은 조각 묶음을 다시 조립하는 경우,
+그리고 validate 스크립트를 반복 실행할 때 제공자 호출 없이 이전 응답을 돌려준다.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+def default_cache_path() -> str:
+    runtime_dir = os.getenv("RUNTIME_OUTPUT_DIR", os.path.join(BASE_DIR, "output", "runtime"))
+    return os.path.abspath(os.getenv("LLM_CACHE_DB_PATH", os.path.join(runtime_dir, "llm_cache.sqlite3")))
+
+
+class PromptResponseCache:
+    def __init__(self, db_path: str = None, max_entries: int = None, disk_max_bytes: int = None,
+                 ttl_seconds: int = None):
+        self.max_entries = _get_int_env("LLM_CACHE_MAX_ENTRIES", 1024) if max_entries is None else max_entries
+        self.disk_max_bytes = (
+            _get_int_env("LLM_CACHE_DISK_MAX_BYTES", 64 * 1024 * 1024) if disk_max_bytes is None else disk_max_bytes
+        )
+        self.ttl_seconds = _get_int_env("LLM_CACHE_TTL_SECONDS", 7 * 86400) if ttl_seconds is None else ttl_seconds
+        self.db_path = os.path.abspath(db_path) if db_path else None
+
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()  # key -> (response, stored_at)
+        self._local = threading.local()
+        self._connections = []
+        self._disk_writes = 0
+        if self.db_path:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+                    "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used)")
+
+    # --- 키 ---
+    @staticmethod
+    def make_key(provider: str, model_name: str, temperature, prompt, params: dict = None) -> str:
+        payload = {
+            "provider": (provider or "").lower(),
+            "model": model_name,
+            "temperature": temperature,
+            "params": params or {},
+            "prompt": prompt,
+        }
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _expired(self, stored_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - stored_at > self.ttl_seconds
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    # --- 조회/저장 ---
+    def _remember_locked(self, key: str, response: str, stored_at: float):
+        self._entries[key] = (response, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def lookup(self, key: str):
+        """(response, tier) 또는 None. tier: memory | disk"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._entries.move_to_end(key)
+                    return entry[0], "memory"
+                del self._entries[key]
+
+        if not self.db_path:
+            return None
+        try:
+            conn = self._conn()
+            row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                with conn:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            with conn:
+                conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            print(f"[LLMCache] 디스크 캐시 조회 실패: {e}")
+            return None
+        if self.max_entries > 0:
+            with self._lock:
+                self._remember_locked(key, row[0], row[1])
+        return row[0], "disk"
+
+    def store(self, key: str, response: str):
+        stored_at = time.time()
+        if self.max_entries > 0:
+            with self._lock:
+                self._remember_locked(key, response, stored_at)
+        if not self.db_path:
+            return
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, size, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, response, len(response.encode("utf-8")), stored_at, stored_at),
+                )
+        except sqlite3.Error as e:
+            print(f"[LLMCache] 디스크 캐시 저장 실패: {e}")
+            return
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % 64 == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """만료된 항목을 지우고, 총 크기가 disk_max_bytes를 넘으면 오래 쓰이지 않은 항목부터 삭제 (쓰기 64회마다 점검)"""
+        if not self.db_path:
+            return 0
+        conn = self._conn()
+        removed = 0
+        with conn:
+            if self.ttl_seconds:
+                removed += conn.execute(
+                    "DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                ).rowcount
+            if self.disk_max_bytes:
+                (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+                if total > self.disk_max_bytes:
+                    victims = []
+                    for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used"):
+                        if total <= self.disk_max_bytes:
+                            break
+                        victims.append((key,))
+                        total -= size
+                    conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+                    removed += len(victims)
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM llm_cache")
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
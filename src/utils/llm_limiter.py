@@ -0,0 +1,234 @@
+"""
+제공자별 호출 속도/동시성 제한 (llm_router의 RoutedChatModel이 실제 제공자 호출 직전에 사용).
+
+한 프로세스의 모든 run/에이전트/역할이 제공자마다 하나의 제한기를 공유한다.
+- <PROVIDER>_RPM          : 분당 요청 수 (토큰 버킷)
+- <PROVIDER>_TPM          : 분당 토큰 수 (토큰 버킷, 요청 전 추정치로 예약하고 응답의 실제 사용량으로 정산)
+- <PROVIDER>_MAX_INFLIGHT : 동시에 진행 중인 호출 수 상한
+셋 다 0(기본값)이면 제한 없이 바로 호출한다. 버킷은 LLM_LIMITER_BURST_SECONDS 동안의 양까지만 모아 둔다.
+
+기다리는 호출은 역할(customer/generation/composition)별 FIFO 큐에 들어가고, 역할 사이에는 라운드 로빈으로
+순서를 넘긴다. 그래서 생성 에이전트 스레드 여러 개가 큐를 채워도 고객 파싱/조립 호출이 뒤로 밀려 굶지 않는다.
+동기 호출(스레드)과 비동기 호출(이벤트 루프)이 같은 큐를 쓰며, 대기 중에 취소된 호출은 큐에서 빠진다.
+"""
+
+import asyncio
+import collections
+import os
+import threading
+import time
+
+
+def _get_float_env(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+class _Bucket:
+    def __init__(self, per_minute: float, burst_seconds: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """amount(버킷 용량보다 크면 가득 찰 때까지)를 꺼낼 수 있을 때까지 남은 초 (0이면 지금 가능)"""
+        needed = min(amount, self.capacity) - self.level
+        return needed / self.rate if needed > 0 else 0.0
+
+
+class _Ticket:
+    def __init__(self, role: str, tokens: float, loop=None):
+        self.role = role
+        self.tokens = tokens
+        self.loop = loop
+        self.granted = False
+        self.event = asyncio.Event() if loop is not None else threading.Event()
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            pass  # 루프가 이미 닫힘
+
+
+class ProviderLimiter:
+    def __init__(self, provider: str, rpm: float = 0, tpm: float = 0, max_inflight: int = 0,
+                 burst_seconds: float = 10.0):
+        self.provider = provider
+        self.max_inflight = max_inflight
+        self.requests = _Bucket(rpm, burst_seconds) if rpm else None
+        self.tokens = _Bucket(tpm, burst_seconds) if tpm else None
+        self._lock = threading.Lock()
+        self._queues = collections.OrderedDict()  # role -> deque[_Ticket], 앞쪽 역할이 다음 차례
+        self._inflight = 0
+        self._waits = {}  # role -> {"waits": 대기한 호출 수, "seconds": 누적 대기 초}
+
+    @classmethod
+    def from_env(cls, provider: str):
+        """환경 변수에 제한이 하나도 없으면 None"""
+        prefix = provider.upper()
+        rpm = _get_float_env(f"{prefix}_RPM", 0)
+        tpm = _get_float_env(f"{prefix}_TPM", 0)
+        max_inflight = int(_get_float_env(f"{prefix}_MAX_INFLIGHT", 0))
+        if not (rpm or tpm or max_inflight):
+            return None
+        return cls(provider, rpm, tpm, max_inflight, _get_float_env("LLM_LIMITER_BURST_SECONDS", 10.0))
+
+    @property
+    def limits_tokens(self) -> bool:
+        return self.tokens is not None
+
+    # --- 스케줄링 (self._lock 안에서만 호출) ---
+    def _dispatch_locked(self, caller: _Ticket = None):
+        """
+        차례가 된 대기 호출에 가능한 만큼 허가를 내준다.
+        속도 제한으로 막히면 다음 시도까지 남은 초를 반환하고, 동시성 제한으로 막히거나 큐가 비면 None.
+        """
+        now = time.monotonic()
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket.refill(now)
+        while self._queues:
+            role, queue = next(iter(self._queues.items()))
+            ticket = queue[0]
+            if self.max_inflight and self._inflight >= self.max_inflight:
+                return None  # release()가 다시 깨운다
+            delay = max(
+                self.requests.wait_for(1) if self.requests is not None else 0.0,
+                self.tokens.wait_for(ticket.tokens) if self.tokens is not None else 0.0,
+            )
+            if delay > 0:
+                if ticket is not caller:
+                    ticket.wake()  # 맨 앞 호출이 스스로 타이머를 잡도록 깨운다
+                return delay
+            if self.requests is not None:
+                self.requests.level -= 1
+            if self.tokens is not None:
+                self.tokens.level -= ticket.tokens
+            self._inflight += 1
+            queue.popleft()
+            self._queues.pop(role)
+            if queue:
+                self._queues[role] = queue  # 같은 역할의 다음 호출은 다른 역할 뒤로
+            ticket.granted = True
+            ticket.wake()
+        return None
+
+    def _enqueue_locked(self, ticket: _Ticket):
+        self._queues.setdefault(ticket.role, collections.deque()).append(ticket)
+
+    def _abandon_locked(self, ticket: _Ticket):
+        if ticket.granted:
+            self._inflight -= 1
+        else:
+            queue = self._queues.get(ticket.role)
+            if queue is not None and ticket in queue:
+                queue.remove(ticket)
+                if not queue:
+                    del self._queues[ticket.role]
+        self._dispatch_locked()
+
+    def _record_wait_locked(self, role: str, seconds: float):
+        stats = self._waits.setdefault(role, {"waits": 0, "seconds": 0.0})
+        stats["waits"] += 1
+        stats["seconds"] += seconds
+
+    # --- 획득/반환 ---
+    def acquire(self, role: str, tokens: float = 0):
+        started = time.monotonic()
+        ticket = _Ticket(role, tokens)
+        with self._lock:
+            self._enqueue_locked(ticket)
+            delay = self._dispatch_locked(ticket)
+            if ticket.granted:
+                return
+        try:
+            while True:
+                ticket.event.wait(delay)
+                with self._lock:
+                    ticket.event.clear()
+                    if not ticket.granted:
+                        delay = self._dispatch_locked(ticket)
+                    if ticket.granted:
+                        self._record_wait_locked(role, time.monotonic() - started)
+                        return
+        except BaseException:
+            with self._lock:
+                self._abandon_locked(ticket)
+            raise
+
+    async def acquire_async(self, role: str, tokens: float = 0):
+        started = time.monotonic()
+        ticket = _Ticket(role, tokens, loop=asyncio.get_running_loop())
+        with self._lock:
+            self._enqueue_locked(ticket)
+            delay = self._dispatch_locked(ticket)
+            if ticket.granted:
+                return
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(ticket.event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                with self._lock:
+                    ticket.event.clear()
+                    if not ticket.granted:
+                        delay = self._dispatch_locked(ticket)
+                    if ticket.granted:
+                        self._record_wait_locked(role, time.monotonic() - started)
+                        return
+        except BaseException:
+            # 헤지에서 진 호출/기한 초과로 대기 중에 취소된 경우 (이미 허가를 받았다면 반납)
+            with self._lock:
+                self._abandon_locked(ticket)
+            raise
+
+    def release(self, reserved_tokens: float = 0, used_tokens: float = None):
+        """호출 종료. used_tokens를 알면 예약한 토큰과의 차이를 버킷에 정산한다 (초과분은 빚으로 남는다)."""
+        with self._lock:
+            self._inflight -= 1
+            if self.tokens is not None and used_tokens is not None:
+                self.tokens.level = min(self.tokens.capacity, self.tokens.level + reserved_tokens - used_tokens)
+            self._dispatch_locked()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "queued": {role: len(queue) for role, queue in self._queues.items()},
+                "inflight": self._inflight,
+                "waits": {role: dict(stats) for role, stats in self._waits.items()},
+            }
+
+
+_limiters_lock = threading.Lock()
+_limiters = {}  # provider -> ProviderLimiter | None(제한 없음)
+
+
+def get_provider_limiter(provider: str):
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = ProviderLimiter.from_env(provider)
+        return _limiters[provider]
+
+
+def get_limiter_stats() -> dict:
+    with _limiters_lock:
+        limiters = [limiter for limiter in _limiters.values() if limiter is not None]
+    return {limiter.provider: limiter.snapshot() for limiter in limiters}
+
+
+def reset_provider_limiters():
+    """환경 변수를 다시 읽도록 제한기를 비운다 (테스트/설정 변경용)"""
+    with _limiters_lock:
+        _limiters.clear()
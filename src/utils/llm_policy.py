@@ -0,0 +1,224 @@
+"""
+(provider, model)별 호출 통계와 역할별 모델 선택 정책.
+
+llm_router의 RoutedChatModel이 실제 제공자 호출마다 observe_call()로 지연/성공 여부/비용을 기록하고,
+호출 직전에 RoutingPolicy.order()로 이번 호출의 1순위 모델과 헤지/장애 조치 순서를 정한다.
+통계는 역할별로 따로 쌓는다 (같은 모델이라도 고객 파싱과 컴포넌트 생성의 프롬프트/응답 길이가 크게 다르다).
+
+정책 (<ROLE>_LLM_POLICY):
+- ordered              : <ROLE>_LLM_PROVIDERS에 적힌 순서 그대로 (기본값)
+- fastest              : EWMA 지연이 가장 짧은 모델
+- cheapest             : 단가(입력 1K + 출력 1K 토큰 기준)가 가장 낮은 모델
+- cheapest_under:<초>   : 관측 p95가 <초> 이하인 모델 중 가장 싼 모델 (없으면 p95가 가장 짧은 모델)
+어떤 정책이든 최근 오류율이 LLM_ROUTER_MAX_ERROR_RATE를 넘는 모델은 뒤로 밀리고,
+표본이 LLM_ROUTER_MIN_SAMPLES보다 적은 모델은 지연 조건을 만족하는 것으로 보고 먼저 시도해 본다.
+마지막 호출이 LLM_ROUTER_STATS_TTL_SECONDS보다 오래된 통계는 모르는 것으로 보고(다음 호출 때 새로 쌓는다),
+뒤로 밀려 호출되지 않던 모델도 장애가 풀린 뒤 다시 탐색된다.
+"""
+
+import collections
+import os
+import threading
+import time
+
+# 기본 단가 (USD / 1M tokens, 입력/출력). LLM_MODEL_PRICES="openai:gpt-4o=2.5/10,..."로 덮어쓰거나 추가한다.
+# 로컬 제공자(ollama)와 mock은 0으로 본다.
+DEFAULT_MODEL_PRICES = {
+    ("openai", "gpt-4o"): (2.5, 10.0),
+    ("openai", "gpt-4o-mini"): (0.15, 0.6),
+    ("google", "gemini-1.5-pro"): (1.25, 5.0),
+    ("google", "gemini-1.5-flash"): (0.075, 0.3),
+}
+FREE_PROVIDERS = ("ollama", "mock")
+POLICIES = ("ordered", "fastest", "cheapest", "cheapest_under")
+
+
+def _get_float_env(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+def _load_prices() -> dict:
+    prices = dict(DEFAULT_MODEL_PRICES)
+    for item in os.getenv("LLM_MODEL_PRICES", "").split(","):
+        name, _, price = item.strip().rpartition("=")
+        provider, _, model_name = name.partition(":")
+        input_price, _, output_price = price.partition("/")
+        try:
+            prices[(provider.lower(), model_name)] = (float(input_price), float(output_price or input_price))
+        except ValueError:
+            continue
+    return prices
+
+
+_prices = None
+
+
+def call_cost(provider: str, model_name: str, input_tokens: int, output_tokens: int):
+    """호출 1회의 비용(USD). 단가를 모르는 유료 모델이면 None."""
+    global _prices
+    if provider in FREE_PROVIDERS:
+        return 0.0
+    if _prices is None:
+        _prices = _load_prices()
+    price = _prices.get((provider, model_name))
+    if price is None:
+        return None
+    return (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
+
+
+class ProviderStats:
+    """지연/오류율/비용의 지수 가중 이동 평균(EWMA)과 최근 성공 지연 표본(p95/p90 계산용)"""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self._reset()
+
+    def _reset(self):
+        self.calls = 0
+        self.latency_ewma = None
+        self.error_ewma = None
+        self.cost_ewma = None
+        self.samples = collections.deque(maxlen=200)
+        self.last_observed = None  # time.monotonic()
+
+    def _ewma(self, current, value):
+        return value if current is None else current + self.alpha * (value - current)
+
+    def age(self, now: float = None) -> float:
+        """마지막 관측 후 지난 초 (관측이 없으면 inf)"""
+        if self.last_observed is None:
+            return float("inf")
+        return (time.monotonic() if now is None else now) - self.last_observed
+
+    def observe(self, seconds: float, ok: bool, cost=None, stale_after: float = 0):
+        now = time.monotonic()
+        if stale_after and self.age(now) > stale_after:
+            # 오래된 통계는 버리고 새로 쌓는다 (복구된 모델이 과거 오류율에 묶이지 않도록)
+            self._reset()
+        self.last_observed = now
+        self.calls += 1
+        self.error_ewma = self._ewma(self.error_ewma, 0.0 if ok else 1.0)
+        if ok:
+            self.latency_ewma = self._ewma(self.latency_ewma, seconds)
+            self.samples.append(seconds)
+        if cost is not None:
+            self.cost_ewma = self._ewma(self.cost_ewma, cost)
+
+    def quantile(self, q: float, min_samples: int = 1):
+        if len(self.samples) < max(1, min_samples):
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "latency_ewma": self.latency_ewma,
+            "error_ewma": self.error_ewma or 0.0,
+            "cost_ewma": self.cost_ewma,
+            "p95": self.quantile(0.95),
+            "age_seconds": self.age(),
+        }
+
+
+_stats_lock = threading.Lock()
+_stats = {}  # (role, provider, model) -> ProviderStats
+
+
+def observe_call(role: str, provider: str, model_name: str, seconds: float, ok: bool, cost=None):
+    with _stats_lock:
+        stats = _stats.get((role, provider, model_name))
+        if stats is None:
+            stats = _stats[(role, provider, model_name)] = ProviderStats(_get_float_env("LLM_EWMA_ALPHA", 0.2))
+        stats.observe(seconds, ok, cost, stale_after=_get_float_env("LLM_ROUTER_STATS_TTL_SECONDS", 300.0))
+
+
+def observed_latency_quantile(role: str, provider: str, model_name: str, quantile: float, min_samples: int = 1):
+    """역할의 최근 성공 호출 지연 분위수 (표본이 min_samples보다 적으면 None)"""
+    with _stats_lock:
+        stats = _stats.get((role, provider, model_name))
+        return stats.quantile(quantile, min_samples) if stats is not None else None
+
+
+def get_provider_stats() -> dict:
+    with _stats_lock:
+        return {key: stats.snapshot() for key, stats in _stats.items()}
+
+
+def reset_provider_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def unit_price(provider: str, model_name: str) -> float:
+    """입력 1K + 출력 1K 토큰 비용 (단가를 모르는 유료 모델은 가장 비싼 것으로 취급)"""
+    cost = call_cost(provider, model_name, 1000, 1000)
+    return cost if cost is not None else float("inf")
+
+
+class RoutingPolicy:
+    def __init__(self, name: str = "ordered", max_latency: float = None):
+        self.name = name
+        self.max_latency = max_latency
+
+    @classmethod
+    def from_env(cls, role: str) -> "RoutingPolicy":
+        raw = os.getenv(f"{role.upper()}_LLM_POLICY", "ordered").strip().lower()
+        name, _, argument = raw.partition(":")
+        if name not in POLICIES:
+            print(f"[LLMPolicy] 알 수 없는 정책 {raw!r} ({role}) → ordered 사용")
+            return cls("ordered")
+        if name == "cheapest_under":
+            try:
+                return cls(name, float(argument))
+            except ValueError:
+                print(f"[LLMPolicy] cheapest_under 지연 한도가 없음 ({role}) → cheapest 사용")
+                return cls("cheapest")
+        return cls(name)
+
+    def __str__(self) -> str:
+        return f"{self.name}:{self.max_latency:g}" if self.max_latency is not None else self.name
+
+    def order(self, role: str, targets: list) -> list:
+        """targets(provider/model_name 속성을 가진 객체)를 역할의 이번 호출 시도 순서로 정렬해 반환"""
+        if self.name == "ordered" or len(targets) < 2:
+            return list(targets)
+        min_samples = _get_int_env("LLM_ROUTER_MIN_SAMPLES", 5)
+        max_error_rate = _get_float_env("LLM_ROUTER_MAX_ERROR_RATE", 0.5)
+        stats_ttl = _get_float_env("LLM_ROUTER_STATS_TTL_SECONDS", 300.0)
+        with _stats_lock:
+            snapshots = [
+                _stats[(role, target.provider, target.model_name)].snapshot()
+                if (role, target.provider, target.model_name) in _stats else None
+                for target in targets
+            ]
+
+        def sort_key(item):
+            position, target = item
+            snapshot = snapshots[position]
+            known = (
+                snapshot is not None and snapshot["calls"] >= min_samples
+                and not (stats_ttl and snapshot["age_seconds"] > stats_ttl)
+            )
+            unhealthy = known and snapshot["error_ewma"] > max_error_rate
+            latency = snapshot["latency_ewma"] if known and snapshot["latency_ewma"] is not None else 0.0
+            p95 = snapshot["p95"] if known and snapshot["p95"] is not None else 0.0
+            cost = unit_price(target.provider, target.model_name)
+            if self.name == "fastest":
+                return (unhealthy, latency, position)
+            if self.name == "cheapest":
+                return (unhealthy, cost, position)
+            within = p95 <= self.max_latency
+            return (unhealthy, not within, cost if within else p95, position)
+
+        return [target for _, target in sorted(enumerate(targets), key=sort_key)]
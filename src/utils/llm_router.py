@@ -1,8 +1,20 @@
+import asyncio
+import concurrent.futures
+import contextlib
 import json
 import os
+import re
+import threading
+import time
+import weakref
 from typing import Optional, Any
 from dotenv import load_dotenv
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 try:
     from langchain_openai import ChatOpenAI
     from langchain_google_genai import ChatGoogleGenerativeAI
@@ -10,7 +22,9 @@ try:
     from langchain_core.language_models.chat_models import BaseChatModel
     from langchain_core.messages import AIMessage, BaseMessage
     from langchain_core.prompt_values import PromptValue
+    from langchain_core.runnables import Runnable
 except ImportError:
+    Runnable = None
     BaseChatModel = Any
     ChatOpenAI = None
     ChatGoogleGenerativeAI = None
@@ -19,6 +33,10 @@ except ImportError:
     BaseMessage = Any
     PromptValue = Any
 
+from src.utils.llm_cache import PromptResponseCache, default_cache_path
+from src.utils.llm_limiter import get_provider_limiter
+from src.utils.llm_policy import RoutingPolicy, call_cost, observe_call, observed_latency_quantile
+
 load_dotenv()
 
 try:
@@ -226,6 +244,9 @@ class MockLLM(FakeListChatModel):
             return response_text
         return AIMessage(content=response_text)
 
+    async def ainvoke(self, input: Any, config=None, *, stop=None, **kwargs) -> Any:
+        return self.invoke(input, config, stop=stop, **kwargs)
+
 
 def _get_float_env(name: str, default: float) -> float:
     raw = os.getenv(name)
@@ -240,13 +261,107 @@ def _get_float_env(name: str, default: float) -> float:
     return value
 
 
-def _build_ollama_model(model_name: str):
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+# --- 공유 HTTP 커넥션 풀 ---
+# 에이전트/오케스트레이터마다 클라이언트를 새로 만들면 각자 커넥션 풀을 가져 매 콜드 요청마다 TCP/TLS 핸드셰이크를 한다.
+# 프로세스 전체에서 keep-alive 풀 하나를 공유한다 (타임아웃은 요청 단위로 전달되므로 풀은 하나로 충분).
+_http_lock = threading.Lock()
+_http_clients = None  # (httpx.Client, httpx.AsyncClient)
+
+
+def _http_limits():
+    return httpx.Limits(
+        max_connections=_get_int_env("LLM_HTTP_MAX_CONNECTIONS", 64),
+        max_keepalive_connections=_get_int_env("LLM_HTTP_MAX_KEEPALIVE", 32),
+        keepalive_expiry=_get_float_env("LLM_HTTP_KEEPALIVE_SECONDS", 90.0),
+    )
+
+
+if httpx is not None:
+    class _LoopLocalAsyncTransport(httpx.AsyncBaseTransport):
+        """
+        이벤트 루프별 AsyncHTTPTransport. 비동기 커넥션은 만든 루프에 묶이는데 run_pipeline은 run마다
+        asyncio.run으로 새 루프를 돌리므로, 루프별 풀을 두고 루프가 사라지면 함께 버린다.
+        """
+
+        def __init__(self, **transport_kwargs):
+            self._transport_kwargs = transport_kwargs
+            self._transports = weakref.WeakKeyDictionary()
+            self._lock = threading.Lock()
+
+        def _transport(self):
+            loop = asyncio.get_running_loop()
+            with self._lock:
+                transport = self._transports.get(loop)
+                if transport is None:
+                    transport = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+                    self._transports[loop] = transport
+                return transport
+
+        async def handle_async_request(self, request):
+            return await self._transport().handle_async_request(request)
+
+        async def aclose(self):
+            with self._lock:
+                transport = self._transports.pop(asyncio.get_running_loop(), None)
+            if transport is not None:
+                await transport.aclose()
+
+
+def get_shared_http_clients():
+    """(동기 httpx.Client, 비동기 httpx.AsyncClient) 프로세스 공유 풀. httpx가 없으면 None."""
+    global _http_clients
+    if httpx is None:
+        return None
+    with _http_lock:
+        if _http_clients is None:
+            limits = _http_limits()
+            _http_clients = (
+                httpx.Client(limits=limits),
+                httpx.AsyncClient(transport=_LoopLocalAsyncTransport(limits=limits)),
+            )
+        return _http_clients
+
+
+def _build_openai_model(model_name: str, base_url: Optional[str], timeout_seconds: Optional[float]):
+    kwargs = {"model": model_name, "temperature": 0.7}
+    if base_url:
+        kwargs["base_url"] = base_url
+    if timeout_seconds:
+        kwargs["timeout"] = timeout_seconds
+    http_clients = get_shared_http_clients()
+    if http_clients is not None:
+        kwargs["http_client"], kwargs["http_async_client"] = http_clients
+    return ChatOpenAI(**kwargs)
+
+
+def _build_google_model(model_name: str, timeout_seconds: Optional[float]):
+    kwargs = {"model": model_name, "temperature": 0.7}
+    if timeout_seconds:
+        kwargs["timeout"] = timeout_seconds
+    if httpx is not None:
+        # google-genai 클라이언트의 httpx 풀에도 같은 keep-alive 설정 적용 (client_args 미지원 버전은 기본값)
+        try:
+            return ChatGoogleGenerativeAI(**kwargs, client_args={"limits": _http_limits()})
+        except (TypeError, ValueError):
+            pass
+    return ChatGoogleGenerativeAI(**kwargs)
+
+
+def _build_ollama_model(model_name: str, base_url: Optional[str] = None, timeout_seconds: Optional[float] = None):
     base_kwargs = {"model": model_name, "temperature": 0.7}
-    ollama_host = os.getenv("OLLAMA_HOST")
+    ollama_host = base_url or os.getenv("OLLAMA_HOST")
     if ollama_host:
         base_kwargs["base_url"] = ollama_host
 
-    timeout_seconds = _get_float_env("OLLAMA_TIMEOUT_SECONDS", 45.0)
+    if timeout_seconds is None:
+        timeout_seconds = _get_float_env("OLLAMA_TIMEOUT_SECONDS", 45.0)
 
     # ChatOllama 버전에 따라 timeout 인자명이 다를 수 있어 순차 시도
     for timeout_key in ("timeout", "request_timeout"):
@@ -259,34 +374,545 @@ def _build_ollama_model(model_name: str):
     return ChatOllama(**base_kwargs)
 
 
-def get_llm(provider: str = "ollama", model_name: str = "llama3") -> BaseChatModel:
-    """
-    제공자와 모델을 받아 Langchain BaseChatModel 인스턴스를 반환하는 팩토리 함수.
-    `.env`에서 필요한 API 키가 없거나 라이브러리가 없는 경우 모의(Mock) 객체를 반환.
-    """
-    provider = provider.lower()
-    
+_llm_call_stats_lock = threading.Lock()
+_llm_call_stats = {}  # (role, provider, model) -> {"calls", "errors", "seconds"}
+
+
+def record_llm_call(role: str, provider: str, model_name: str, seconds: float, ok: bool = True):
+    """역할/제공자/모델별 LLM 호출 수, 실패 수, 누적 지연(초)을 기록 (/metrics 노출용)"""
+    key = (role, (provider or "").lower(), model_name)
+    with _llm_call_stats_lock:
+        stats = _llm_call_stats.setdefault(key, {"calls": 0, "errors": 0, "seconds": 0.0})
+        stats["calls"] += 1
+        stats["seconds"] += max(0.0, seconds)
+        if not ok:
+            stats["errors"] += 1
+
+
+@contextlib.contextmanager
+def track_llm_call(role: str, provider: str, model_name: str):
+    """with 블록 하나를 LLM 호출 1회로 기록 (예외가 나면 실패로 기록 후 그대로 전파)"""
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        record_llm_call(role, provider, model_name, time.perf_counter() - started, ok=ok)
+
+
+def get_llm_call_stats() -> dict:
+    with _llm_call_stats_lock:
+        return {key: dict(value) for key, value in _llm_call_stats.items()}
+
+
+# --- 클라이언트 레지스트리 ---
+# (provider, model, base_url, timeout) → 채팅 모델 인스턴스. Orchestrator/에이전트를 여러 번 만들어도
+# 같은 설정이면 같은 클라이언트(와 그 커넥션 풀)를 스레드 간에 공유한다. Mock 폴백은 캐시하지 않는다
+# (나중에 API 키가 설정되면 실제 클라이언트를 만들 수 있도록).
+_llm_clients_lock = threading.Lock()
+_llm_clients = {}
+
+
+def _client_key(provider: str, model_name: str) -> tuple:
+    if provider == "openai":
+        base_url = os.getenv("OPENAI_BASE_URL") or os.getenv("OPENAI_API_BASE")
+        timeout = _get_float_env("OPENAI_TIMEOUT_SECONDS", 0.0) or None
+    elif provider == "google":
+        base_url = None
+        timeout = _get_float_env("GOOGLE_TIMEOUT_SECONDS", 0.0) or None
+    elif provider == "ollama":
+        base_url = os.getenv("OLLAMA_HOST")
+        timeout = _get_float_env("OLLAMA_TIMEOUT_SECONDS", 45.0)
+    else:
+        base_url, timeout = None, None
+    return (provider, model_name, base_url, timeout)
+
+
+def _build_llm(key: tuple) -> BaseChatModel:
+    provider, model_name, base_url, timeout = key
+
     if provider == "openai":
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key or ChatOpenAI is None:
             print(f"[Warning] OPENAI_API_KEY 없음 또는 라이브러리 미설치. Mock LLM을 반환합니다.")
-            return MockLLM(provider, model_name)
-        return ChatOpenAI(model=model_name, temperature=0.7)
+            return None
+        return _build_openai_model(model_name, base_url, timeout)
         
     elif provider == "google":
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key or ChatGoogleGenerativeAI is None:
             print(f"[Warning] GOOGLE_API_KEY 없음 또는 라이브러리 미설치. Mock LLM을 반환합니다.")
-            return MockLLM(provider, model_name)
-        return ChatGoogleGenerativeAI(model=model_name, temperature=0.7)
+            return None
+        return _build_google_model(model_name, timeout)
         
     elif provider == "ollama":
         if ChatOllama is None:
             print(f"[Warning] langchain_community 미설치. Mock LLM을 반환합니다.")
-            return MockLLM(provider, model_name)
+            return None
         # 로컬 Ollama 경로에서 응답 무한대기를 막기 위해 timeout을 적용
-        return _build_ollama_model(model_name)
+        return _build_ollama_model(model_name, base_url, timeout)
         
     else:
         print(f"[Warning] 알 수 없는 provider: {provider}. Mock LLM을 반환합니다.")
-        return MockLLM(provider, model_name)
+        return None
+
+
+# --- 프롬프트 → 응답 캐시 ---
+_llm_cache_lock = threading.Lock()
+_llm_cache = None
+_llm_cache_stats = {}  # (role, result) -> count, result: memory_hit | disk_hit | miss
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return str(raw).strip().lower() in ("1", "true", "yes", "on")
+
+
+def llm_cache_enabled(role: str) -> bool:
+    """전역 LLM_CACHE_ENABLED(기본 1) 위에 역할별 <ROLE>_LLM_CACHE로 끄거나 켤 수 있다."""
+    return _env_flag(f"{role.upper()}_LLM_CACHE", _env_flag("LLM_CACHE_ENABLED", True))
+
+
+def get_llm_cache() -> PromptResponseCache:
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = PromptResponseCache(default_cache_path())
+        return _llm_cache
+
+
+def record_llm_cache_lookup(role: str, result: str):
+    with _llm_cache_lock:
+        _llm_cache_stats[(role, result)] = _llm_cache_stats.get((role, result), 0) + 1
+
+
+def get_llm_cache_stats() -> dict:
+    with _llm_cache_lock:
+        return dict(_llm_cache_stats)
+
+
+def _serialize_prompt(input_value: Any):
+    """PromptValue/메시지 목록/문자열을 캐시 키용 [[type, content], ...]로 정규화"""
+    if PromptValue is not Any and isinstance(input_value, PromptValue):
+        input_value = input_value.to_messages()
+    if isinstance(input_value, str):
+        return [["human", input_value]]
+    if isinstance(input_value, list):
+        return [
+            [item.type, item.content] if BaseMessage is not Any and isinstance(item, BaseMessage) else ["raw", str(item)]
+            for item in input_value
+        ]
+    return [["raw", str(input_value)]]
+
+
+# --- 라우팅 (헤지/장애 조치) ---
+# 역할별 제공자 목록: <ROLE>_LLM_PROVIDERS="ollama:glm-5:cloud,openai:gpt-4o-mini" (모델 생략 시 역할 기본 모델)
+# 앞 제공자가 헤지 지연(기본 관측 p90) 안에 답하지 않으면 다음 제공자에 같은 요청을 보내고,
+# 오류/빈 응답이면 즉시 다음 제공자로 넘어간다. 먼저 도착한 유효 응답을 쓰고 나머지 호출은 취소한다.
+_llm_route_lock = threading.Lock()
+_llm_route_stats = {}  # (role, event) -> count, event: hedged | failover | cancelled | secondary_win
+_llm_route_decisions = {}  # (role, policy, provider, model) -> 1순위로 선택된 횟수
+_route_executor = None
+
+
+def record_llm_route_event(role: str, event: str):
+    with _llm_route_lock:
+        _llm_route_stats[(role, event)] = _llm_route_stats.get((role, event), 0) + 1
+
+
+def get_llm_route_stats() -> dict:
+    with _llm_route_lock:
+        return dict(_llm_route_stats)
+
+
+def record_llm_route_decision(role: str, policy: str, provider: str, model_name: str):
+    key = (role, policy, provider, model_name)
+    with _llm_route_lock:
+        _llm_route_decisions[key] = _llm_route_decisions.get(key, 0) + 1
+
+
+def get_llm_route_decisions() -> dict:
+    with _llm_route_lock:
+        return dict(_llm_route_decisions)
+
+
+def _get_route_executor() -> concurrent.futures.ThreadPoolExecutor:
+    # 동기 경로에서 헤지 요청을 동시에 보내기 위한 공유 풀 (제공자가 하나면 사용하지 않음)
+    global _route_executor
+    with _llm_route_lock:
+        if _route_executor is None:
+            _route_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_get_int_env("LLM_ROUTER_SYNC_WORKERS", 16), thread_name_prefix="LLMRoute"
+            )
+        return _route_executor
+
+
+def _route_specs(role: str, provider: str, model_name: str) -> list:
+    raw = os.getenv(f"{role.upper()}_LLM_PROVIDERS", "").strip()
+    if not raw:
+        return [(provider.lower(), model_name)]
+    specs = []
+    for item in raw.split(","):
+        item_provider, _, item_model = item.strip().partition(":")
+        if item_provider:
+            specs.append((item_provider.lower(), item_model.strip() or model_name))
+    return specs or [(provider.lower(), model_name)]
+
+
+def _hedge_policy(role: str):
+    """None(헤지 끔) | ("fixed", 초) | ("quantile", q)"""
+    raw = os.getenv(f"{role.upper()}_LLM_HEDGE_DELAY", os.getenv("LLM_HEDGE_DELAY", "p90")).strip().lower()
+    if raw in ("", "off", "none"):
+        return None
+    try:
+        if raw.startswith("p"):
+            return ("quantile", min(0.999, max(0.0, float(raw[1:]) / 100.0)))
+        return ("fixed", max(0.0, float(raw)))
+    except ValueError:
+        return ("quantile", 0.9)
+
+
+class _RouteTarget:
+    def __init__(self, provider: str, model_name: str, llm):
+        self.provider = provider
+        self.model_name = model_name
+        self.llm = llm
+        # Mock 모델은 비용이 없으므로 캐시하지 않는다
+        self.cacheable = not isinstance(llm, MockLLM)
+
+    @property
+    def label(self) -> str:
+        return f"{self.provider}/{self.model_name}"
+
+
+def _prompt_tokens(input_value: Any) -> int:
+    """프롬프트 토큰 수 추정 (문자 수/4)"""
+    return sum(len(str(content)) for _, content in _serialize_prompt(input_value)) // 4
+
+
+def _usage_tokens(input_value: Any, response: Any) -> tuple:
+    """(입력 토큰, 출력 토큰). 제공자가 usage_metadata를 주지 않으면 문자 수/4로 추정한다."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage.get("input_tokens") is not None and usage.get("output_tokens") is not None:
+        return usage["input_tokens"], usage["output_tokens"]
+    return _prompt_tokens(input_value), len(str(getattr(response, "content", response))) // 4
+
+
+def _reserved_tokens(limiter, input_value: Any) -> int:
+    """분당 토큰 제한이 있을 때 호출 전에 예약할 토큰 (프롬프트 추정치 + 예상 출력)"""
+    if limiter is None or not limiter.limits_tokens:
+        return 0
+    return _prompt_tokens(input_value) + _get_int_env("LLM_LIMITER_OUTPUT_TOKENS", 1024)
+
+
+def _release(limiter, reserved: int, input_value: Any, response: Any):
+    used = sum(_usage_tokens(input_value, response)) if response is not None and limiter.limits_tokens else None
+    limiter.release(reserved, used)
+
+
+_JSON_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+
+def is_json_response(content: str) -> bool:
+    """
+    캐시 검사용: 응답이 완결된 JSON 객체/배열인지 (마크다운 코드 펜스 허용).
+    JsonOutputParser는 잘린 JSON도 부분 파싱해 통과시키므로 캐시 저장 여부는 더 엄격하게 판단한다.
+    """
+    try:
+        return isinstance(json.loads(_JSON_FENCE_RE.sub("", content.strip())), (dict, list))
+    except (TypeError, ValueError):
+        return False
+
+
+def _is_valid_response(response: Any) -> bool:
+    content = getattr(response, "content", response)
+    if isinstance(content, str):
+        return bool(content.strip())
+    return bool(content)
+
+
+if Runnable is not None:
+    class RoutedChatModel(Runnable):
+        """
+        역할(customer/generation/composition)별 채팅 모델 래퍼. prompt | llm | parser 체인에 그대로 끼워 쓴다.
+        - 프롬프트 → 응답 캐시 조회/저장 (<ROLE>_LLM_CACHE=0이면 우회)
+        - 역할 정책(RoutingPolicy)으로 호출마다 1순위 모델을 고르고, 나머지 순서로 헤지 요청/장애 조치
+        - 실제 제공자 호출 단위의 호출 수/실패/지연/비용 기록 (/metrics, 정책 통계)
+        """
+
+        def __init__(self, role: str, targets: list, cache_enabled: bool = True, hedge_policy=None,
+                     cache: PromptResponseCache = None, policy: RoutingPolicy = None, cache_check=None):
+            self.role = role
+            self.targets = targets
+            self.cache_enabled = cache_enabled
+            self.hedge_policy = hedge_policy
+            self.cache = cache
+            self.policy = policy or RoutingPolicy()
+            # 응답 본문을 받아 캐시에 둘 만한지 판단하는 함수 (예: is_json_response). 체인의 파서가 거부할
+            # 응답(잘리거나 형식이 틀린 응답)이 TTL 동안 재생되지 않도록 저장/적중 모두에 적용한다.
+            self.cache_check = cache_check
+
+        @property
+        def route_identity(self) -> list:
+            return [target.label for target in self.targets]
+
+        # --- 캐시 ---
+        def _cache(self) -> PromptResponseCache:
+            return self.cache if self.cache is not None else get_llm_cache()
+
+        def _cache_keys(self, targets: list, input_value: Any, stop, kwargs) -> list:
+            if not self.cache_enabled:
+                return [None] * len(targets)
+            prompt = _serialize_prompt(input_value)
+            params = {"stop": stop, **{name: value for name, value in kwargs.items() if name != "config"}}
+            return [
+                PromptResponseCache.make_key(
+                    target.provider, target.model_name, getattr(target.llm, "temperature", None), prompt, params,
+                ) if target.cacheable else None
+                for target in targets
+            ]
+
+        def _lookup(self, keys: list):
+            if not any(keys):
+                return None
+            for key in keys:
+                if key is None:
+                    continue
+                hit = self._cache().lookup(key)
+                if hit is not None and self._cacheable_content(hit[0]):
+                    record_llm_cache_lookup(self.role, f"{hit[1]}_hit")
+                    return AIMessage(content=hit[0]) if AIMessage is not None else hit[0]
+            record_llm_cache_lookup(self.role, "miss")
+            return None
+
+        def _accept(self, keys: list, index: int, response: Any):
+            if index > 0:
+                record_llm_route_event(self.role, "secondary_win")
+            content = getattr(response, "content", response)
+            if keys[index] is not None and self._cacheable_content(content):
+                self._cache().store(keys[index], content)
+            return response
+
+        def _cacheable_content(self, content: Any) -> bool:
+            if not isinstance(content, str) or not content.strip():
+                return False
+            return self.cache_check is None or bool(self.cache_check(content))
+
+        # --- 정책 ---
+        # 시도 순서는 호출마다 policy.order()로 정한다 (첫 번째가 1순위, 나머지는 헤지/장애 조치 순서).
+        # 캐시 적중은 제공자를 고른 것이 아니므로 결정으로 세지 않는다.
+        def _record_decision(self, target: _RouteTarget):
+            record_llm_route_decision(self.role, str(self.policy), target.provider, target.model_name)
+
+        # --- 호출 ---
+        def _record(self, target: _RouteTarget, started: float, ok: bool, input: Any = None, response: Any = None):
+            seconds = time.perf_counter() - started
+            record_llm_call(self.role, target.provider, target.model_name, seconds, ok=ok)
+            cost = None
+            if response is not None:
+                input_tokens, output_tokens = _usage_tokens(input, response)
+                cost = call_cost(target.provider, target.model_name, input_tokens, output_tokens)
+            observe_call(self.role, target.provider, target.model_name, seconds, ok, cost)
+
+        # 제공자 제한기(<PROVIDER>_RPM/_TPM/_MAX_INFLIGHT)가 있으면 허가를 받은 뒤 호출한다.
+        # 지연 기록은 허가 이후부터 재므로 큐 대기 시간이 정책/헤지 통계를 왜곡하지 않는다.
+        def _call(self, target: _RouteTarget, input: Any, config, stop, kwargs):
+            limiter = get_provider_limiter(target.provider)
+            reserved = _reserved_tokens(limiter, input)
+            if limiter is not None:
+                limiter.acquire(self.role, reserved)
+            response = None
+            started = time.perf_counter()
+            try:
+                response = target.llm.invoke(input, config, stop=stop, **kwargs)
+            except Exception:
+                self._record(target, started, ok=False)
+                raise
+            finally:
+                if limiter is not None:
+                    _release(limiter, reserved, input, response)
+            self._record(target, started, _is_valid_response(response), input, response)
+            return response
+
+        async def _acall(self, target: _RouteTarget, input: Any, config, stop, kwargs):
+            limiter = get_provider_limiter(target.provider)
+            reserved = _reserved_tokens(limiter, input)
+            if limiter is not None:
+                await limiter.acquire_async(self.role, reserved)
+            response = None
+            started = time.perf_counter()
+            try:
+                response = await target.llm.ainvoke(input, config, stop=stop, **kwargs)
+            except asyncio.CancelledError:
+                # 헤지에서 진 호출이나 기한 초과로 취소된 호출은 실패로 세지 않는다
+                raise
+            except Exception:
+                self._record(target, started, ok=False)
+                raise
+            finally:
+                if limiter is not None:
+                    _release(limiter, reserved, input, response)
+            self._record(target, started, _is_valid_response(response), input, response)
+            return response
+
+        def _hedge_delay(self, target: _RouteTarget):
+            if self.hedge_policy is None:
+                return None
+            kind, value = self.hedge_policy
+            if kind == "fixed":
+                return value
+            observed = observed_latency_quantile(
+                self.role, target.provider, target.model_name, value,
+                min_samples=_get_int_env("LLM_HEDGE_MIN_SAMPLES", 20),
+            )
+            return observed if observed is not None else _get_float_env("LLM_HEDGE_DEFAULT_SECONDS", 5.0)
+
+        def _launch_reason(self, target: _RouteTarget, reason: str):
+            record_llm_route_event(self.role, reason)
+            print(f"[LLMRouter] {self.role}: {reason} → {target.label}")
+
+        def invoke(self, input: Any, config=None, *, stop=None, **kwargs) -> Any:
+            targets = self.policy.order(self.role, self.targets)
+            keys = self._cache_keys(targets, input, stop, kwargs)
+            cached = self._lookup(keys)
+            if cached is not None:
+                return cached
+            self._record_decision(targets[0])
+            if len(targets) == 1:
+                return self._accept(keys, 0, self._call(targets[0], input, config, stop, kwargs))
+
+            executor = _get_route_executor()
+            pending = {}
+            errors = []
+            next_hedge_at = None
+
+            def launch(reason=None):
+                nonlocal next_hedge_at
+                index = len(pending) + len(errors)
+                if reason:
+                    self._launch_reason(targets[index], reason)
+                future = executor.submit(self._call, targets[index], input, config, stop, kwargs)
+                pending[future] = index
+                delay = self._hedge_delay(targets[index])
+                next_hedge_at = time.monotonic() + delay if delay is not None else None
+
+            launch()
+            try:
+                while pending:
+                    can_hedge = len(pending) + len(errors) < len(targets)
+                    timeout = max(0.0, next_hedge_at - time.monotonic()) if can_hedge and next_hedge_at else None
+                    done, _ = concurrent.futures.wait(
+                        pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    if not done:
+                        launch("hedged")
+                        continue
+                    for future in done:
+                        index = pending.pop(future)
+                        error = future.exception()
+                        if error is None and _is_valid_response(future.result()):
+                            return self._accept(keys, index, future.result())
+                        errors.append(error or ValueError(f"{targets[index].label} returned an empty response"))
+                    if not pending and len(errors) < len(targets):
+                        launch("failover")
+                raise errors[-1]
+            finally:
+                # 이미 실행 중인 동기 호출은 중단할 수 없으므로 결과만 버린다
+                for future in pending:
+                    future.cancel()
+                    record_llm_route_event(self.role, "cancelled")
+
+        async def ainvoke(self, input: Any, config=None, *, stop=None, **kwargs) -> Any:
+            targets = self.policy.order(self.role, self.targets)
+            keys = self._cache_keys(targets, input, stop, kwargs)
+            cached = self._lookup(keys)
+            if cached is not None:
+                return cached
+            self._record_decision(targets[0])
+            if len(targets) == 1:
+                return self._accept(keys, 0, await self._acall(targets[0], input, config, stop, kwargs))
+
+            pending = {}
+            errors = []
+            next_hedge_at = None
+
+            def launch(reason=None):
+                nonlocal next_hedge_at
+                index = len(pending) + len(errors)
+                if reason:
+                    self._launch_reason(targets[index], reason)
+                task = asyncio.ensure_future(self._acall(targets[index], input, config, stop, kwargs))
+                pending[task] = index
+                delay = self._hedge_delay(targets[index])
+                next_hedge_at = time.monotonic() + delay if delay is not None else None
+
+            launch()
+            try:
+                while pending:
+                    can_hedge = len(pending) + len(errors) < len(targets)
+                    timeout = max(0.0, next_hedge_at - time.monotonic()) if can_hedge and next_hedge_at else None
+                    done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    if not done:
+                        launch("hedged")
+                        continue
+                    winner = None
+                    for task in done:
+                        index = pending.pop(task)
+                        error = task.exception()
+                        if error is None and winner is None and _is_valid_response(task.result()):
+                            winner = (index, task.result())
+                        elif error is not None or winner is None:
+                            errors.append(error or ValueError(f"{targets[index].label} returned an empty response"))
+                    if winner is not None:
+                        return self._accept(keys, *winner)
+                    if not pending and len(errors) < len(targets):
+                        launch("failover")
+                raise errors[-1]
+            finally:
+                # 진 호출(또는 바깥에서 취소된 경우 남은 호출)을 모두 취소
+                for task in pending:
+                    task.cancel()
+                    record_llm_route_event(self.role, "cancelled")
+else:
+    RoutedChatModel = None
+
+
+def _get_client(provider: str, model_name: str) -> BaseChatModel:
+    key = _client_key(provider.lower(), model_name)
+    with _llm_clients_lock:
+        llm = _llm_clients.get(key)
+        if llm is None:
+            # 생성은 드물고 가벼우므로 락 안에서 만들어 같은 키의 중복 생성을 막는다
+            llm = _build_llm(key)
+            if llm is None:
+                return MockLLM(key[0], model_name)
+            _llm_clients[key] = llm
+        return llm
+
+
+def get_llm(provider: str = "ollama", model_name: str = "llama3", role: str = None,
+            cache_check=None) -> BaseChatModel:
+    """
+    제공자와 모델을 받아 Langchain BaseChatModel 인스턴스를 반환하는 팩토리 함수.
+    같은 (provider, model, base_url, timeout)이면 레지스트리의 공유 클라이언트를 반환한다.
+    role(customer/generation/composition)을 주면 캐시/헤지/장애 조치/호출 기록을 맡는 RoutedChatModel을 반환한다.
+    cache_check(content) -> bool을 주면 그 검사를 통과한 응답만 프롬프트 캐시에 저장/재사용한다.
+    `.env`에서 필요한 API 키가 없거나 라이브러리가 없는 경우 모의(Mock) 객체를 반환.
+    """
+    if role is None or RoutedChatModel is None:
+        return _get_client(provider, model_name)
+    targets = [_RouteTarget(item_provider, item_model, _get_client(item_provider, item_model))
+               for item_provider, item_model in _route_specs(role, provider, model_name)]
+    return RoutedChatModel(
+        role, targets, cache_enabled=llm_cache_enabled(role), hedge_policy=_hedge_policy(role),
+        policy=RoutingPolicy.from_env(role), cache_check=cache_check,
+    )
+
+
+def clear_llm_clients():
+    """레지스트리 초기화 (API 키 교체, 테스트용). 공유 HTTP 풀은 유지된다."""
+    with _llm_clients_lock:
+        _llm_clients.clear()
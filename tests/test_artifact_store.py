@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from core.artifact_store import ArtifactStore
+
+
+class ArtifactStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = ArtifactStore(self.temp_dir.name, retention_seconds=3600, max_total_bytes=0, prune_every=0)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _object_count(self):
+        return sum(len(names) for _, _, names in os.walk(self.store.objects_dir))
+
+    def test_runs_share_content_addressed_objects(self):
+        html = "<html>same page</html>"
+        self.store.put_run("run_1_0000000a", {"builder_output.html": (html, "text/html")})
+        manifest = self.store.put_run("run_2_0000000b", {"builder_output.html": (html, "text/html")})
+
+        self.assertEqual(self._object_count(), 1)
+        path, entry = self.store.open_artifact("run_2_0000000b", "builder_output.html")
+        with open(path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), html)
+        self.assertEqual(entry, manifest["artifacts"]["builder_output.html"])
+        self.assertIsNone(self.store.open_artifact("run_2_0000000b", "dashboard.html"))
+        self.assertIsNone(self.store.get_manifest("../runs/run_1_0000000a"))
+        with self.assertRaises(ValueError):
+            self.store.put_run("../escape", {"x": ("y", "text/plain")})
+
+    def test_prune_applies_age_then_size_limits(self):
+        self.store.put_run("run_1_0000000a", {"builder_output.html": ("a" * 100, "text/html")})
+        self.store.put_run("run_2_0000000b", {"builder_output.html": ("b" * 100, "text/html")})
+        self.store.put_run("run_3_0000000c", {"builder_output.html": ("c" * 100, "text/html")})
+
+        # 보존 기간이 지난 run은 매니페스트가 지워지고, 유예 시간이 지난 고아 객체도 정리된다
+        manifest_path = self.store._manifest_path("run_1_0000000a")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest["created_at"] = time.time() - 7200
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        old = time.time() - 600
+        os.utime(self.store._object_path(manifest["artifacts"]["builder_output.html"]["sha256"]), (old, old))
+
+        stats = self.store.prune()
+        self.assertEqual((stats["runs_removed"], stats["objects_removed"]), (1, 1))
+        self.assertIsNone(self.store.get_manifest("run_1_0000000a"))
+
+        # 총량 제한: 오래된 run부터 지운다. 막 쓰인 객체는 동시 put_run이 다시 참조할 수 있으므로
+        # 유예 시간이 지난 뒤의 정리에서 지운다
+        run_2_object = self.store._object_path(
+            self.store.get_manifest("run_2_0000000b")["artifacts"]["builder_output.html"]["sha256"]
+        )
+        self.store.max_total_bytes = 150
+        stats = self.store.prune()
+        self.assertEqual(stats["total_bytes"], 100)
+        self.assertIsNone(self.store.get_manifest("run_2_0000000b"))
+        self.assertIsNotNone(self.store.open_artifact("run_3_0000000c", "builder_output.html"))
+        self.assertTrue(os.path.exists(run_2_object))
+
+        os.utime(run_2_object, (old, old))
+        self.assertEqual(self.store.prune()["objects_removed"], 1)
+        self.assertEqual(self._object_count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.utils.component_store import (
+    ComponentStore,
+    JsonDirectoryComponentStore,
+    SqliteComponentStore,
+    export_json_directory,
+    get_component_store,
+    import_json_directory,
+)
+from worktrees.generation_agent.agent import GenerationAgent
+
+
+class ComponentStoreTest(unittest.TestCase):
+    ENV_KEYS = [
+        "AI_MODEL",
+        "GENERATION_LLM_PROVIDER",
+        "COMPONENT_STORE_BACKEND",
+        "COMPONENT_STORE_DB_PATH",
+    ]
+
+    def setUp(self):
+        self.original_env = {key: os.environ.get(key) for key in self.ENV_KEYS}
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        for key, value in self.original_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self.temp_dir.cleanup()
+
+    def test_sqlite_store_round_trips_and_tracks_revisions(self):
+        store = SqliteComponentStore(os.path.join(self.temp_dir.name, "components.sqlite3"))
+        self.addCleanup(store.close)
+
+        self.assertIsNone(store.get("header"))
+        self.assertIsNone(store.entry_token("header"))
+        revision = store.revision()
+
+        store.put("header", {"name": "header", "html_template": "<header>헤더</header>"})
+        token = store.entry_token("header")
+        self.assertEqual(store.get("header")["html_template"], "<header>헤더</header>")
+        self.assertNotEqual(store.revision(), revision)
+        self.assertEqual(store.names(), ["header"])
+
+        store.put("header", {"name": "header", "html_template": "<header>v2</header>"})
+        self.assertNotEqual(store.entry_token("header"), token)
+        self.assertTrue(store.delete("header"))
+        self.assertEqual(store.names(), [])
+
+    def test_backend_must_implement_the_whole_interface(self):
+        class PartialStore(ComponentStore):
+            backend = "partial"
+
+            def get(self, name):
+                return None
+
+        with self.assertRaises(TypeError):
+            PartialStore(tempfile.gettempdir())
+
+    def test_json_layout_import_and_export(self):
+        source_dir = os.path.join(self.temp_dir.name, "json_in")
+        os.makedirs(source_dir)
+        for name in ("button", "nav_bar"):
+            with open(os.path.join(source_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+                json.dump({"name": name, "html_template": f"<div>{name}</div>"}, f)
+
+        store = SqliteComponentStore(os.path.join(self.temp_dir.name, "packed.sqlite3"))
+        self.addCleanup(store.close)
+        self.assertEqual(import_json_directory(store, source_dir), 2)
+        self.assertEqual(store.names(), ["button", "nav_bar"])
+
+        export_dir = os.path.join(self.temp_dir.name, "json_out")
+        self.assertEqual(export_json_directory(store, export_dir), 2)
+        self.assertEqual(JsonDirectoryComponentStore(export_dir).names(), ["button", "nav_bar"])
+        with open(os.path.join(export_dir, "nav_bar.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["html_template"], "<div>nav_bar</div>")
+
+    def test_generation_agent_uses_configured_sqlite_backend(self):
+        db_path = os.path.join(self.temp_dir.name, "agent.sqlite3")
+        os.environ["AI_MODEL"] = "mock-model"
+        os.environ["GENERATION_LLM_PROVIDER"] = "mock-provider"
+        os.environ["COMPONENT_STORE_BACKEND"] = "sqlite"
+        os.environ["COMPONENT_STORE_DB_PATH"] = db_path
+
+        agent = GenerationAgent()
+        self.addCleanup(agent.store.close)
+        meta, is_hit = agent.resolve_component("search_bar")
+        again, again_hit = agent.resolve_component("search_bar")
+
+        self.assertFalse(is_hit)
+        self.assertTrue(again_hit)
+        self.assertEqual(again, meta)
+        self.assertIs(agent.store, get_component_store())
+        self.assertEqual(agent.store.names(), ["search_bar"])
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "search_bar.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+from scripts.git_manager import GitCommandChannel, GitManager, WorktreePool, ZERO_OID
+
+
+def git(repo_path: str, *args: str) -> str:
+    return subprocess.check_output(["git", *args], cwd=repo_path, text=True).strip()
+
+
+class GitManagerPlumbingTest(unittest.TestCase):
+    USE_CHANNEL = True
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo_path = self.temp_dir.name
+        git(self.repo_path, "init", "-q")
+        git(self.repo_path, "config", "user.name", "Builder Test")
+        git(self.repo_path, "config", "user.email", "builder@example.com")
+        with open(os.path.join(self.repo_path, "README.md"), "w", encoding="utf-8") as f:
+            f.write("base\n")
+        git(self.repo_path, "add", "README.md")
+        git(self.repo_path, "commit", "-q", "-m", "base")
+        self.manager = GitManager(self.repo_path, use_channel=self.USE_CHANNEL)
+
+    def tearDown(self):
+        GitCommandChannel.close_all()
+        self.temp_dir.cleanup()
+
+    def test_commit_file_to_branch_writes_without_worktree(self):
+        head_before = git(self.repo_path, "rev-parse", "HEAD")
+
+        commit = self.manager.commit_file_to_branch(
+            "feat/header_gen", "header.json", '{"name": "헤더"}', "Generation Agent: Created header"
+        )
+
+        self.assertEqual(git(self.repo_path, "rev-parse", "feat/header_gen"), commit)
+        self.assertEqual(git(self.repo_path, "rev-parse", f"{commit}^"), head_before)
+        self.assertEqual(git(self.repo_path, "show", f"{commit}:header.json"), '{"name": "헤더"}')
+        self.assertEqual(git(self.repo_path, "show", f"{commit}:README.md"), "base")
+        self.assertEqual(git(self.repo_path, "rev-parse", "HEAD"), head_before)
+        self.assertFalse(os.path.exists(os.path.join(self.repo_path, "header.json")))
+        self.assertEqual(git(self.repo_path, "status", "--porcelain"), "")
+
+    def test_commit_file_to_branch_skips_unchanged_content(self):
+        first = self.manager.commit_file_to_branch("feat/button_gen", "button.json", "{}", "first")
+        second = self.manager.commit_file_to_branch("feat/button_gen", "button.json", "{}", "second")
+        third = self.manager.commit_file_to_branch("feat/button_gen", "button.json", "[]", "third")
+
+        self.assertEqual(first, second)
+        self.assertEqual(git(self.repo_path, "rev-parse", f"{third}^"), first)
+
+    def test_plumbing_branch_merges_and_deletes(self):
+        self.manager.commit_file_to_branch("feat/nav_bar_gen", "nav_bar.json", "{}", "nav")
+
+        success, _ = self.manager.merge_branch("feat/nav_bar_gen")
+
+        self.assertTrue(success)
+        self.assertTrue(os.path.exists(os.path.join(self.repo_path, "nav_bar.json")))
+        self.assertTrue(self.manager.delete_branch("feat/nav_bar_gen"))
+        self.assertFalse(self.manager.delete_branch("feat/nav_bar_gen"))
+
+    def test_delete_branch_refuses_checked_out_branches(self):
+        self.manager.commit_file_to_branch("feat/footer_gen", "footer.json", "{}", "footer")
+        worktree_path = os.path.join(self.repo_path, "wt_footer")
+        git(self.repo_path, "worktree", "add", "-q", worktree_path, "feat/footer_gen")
+
+        self.assertFalse(self.manager.delete_branch("feat/footer_gen"))
+        self.assertFalse(self.manager.delete_branch(git(self.repo_path, "rev-parse", "--abbrev-ref", "HEAD")))
+        self.assertTrue(git(self.repo_path, "rev-parse", "--verify", "feat/footer_gen"))
+
+        git(self.repo_path, "worktree", "remove", "--force", worktree_path)
+        self.assertTrue(self.manager.delete_branch("feat/footer_gen"))
+
+    def test_merge_branches_octopus_with_conflict_fallback(self):
+        head_before = git(self.repo_path, "rev-parse", "HEAD")
+        for branch, file_name, content in (
+            ("feat/a_gen", "a.json", "a"),
+            ("feat/b_gen", "b.json", "b"),
+            ("feat/c_gen", "c.json", "c1"),
+            ("feat/c2_gen", "c.json", "c2"),
+        ):
+            self.manager.commit_file_to_branch(branch, file_name, content, f"create {file_name}")
+
+        results = self.manager.merge_branches(["feat/a_gen", "feat/b_gen", "feat/c_gen", "feat/c2_gen"])
+
+        self.assertEqual(
+            [(name, success, mode) for name, success, mode, _ in results],
+            [
+                ("feat/a_gen", True, "octopus"),
+                ("feat/b_gen", True, "octopus"),
+                ("feat/c_gen", True, "single"),
+                ("feat/c2_gen", False, "single"),
+            ],
+        )
+        octopus_commit = git(self.repo_path, "rev-parse", "HEAD^1")
+        self.assertEqual(len(git(self.repo_path, "rev-list", "--parents", "-n", "1", octopus_commit).split()), 4)
+        self.assertEqual(git(self.repo_path, "rev-parse", f"{octopus_commit}^1"), head_before)
+        self.assertEqual(git(self.repo_path, "show", "HEAD:c.json"), "c1")
+        self.assertEqual(git(self.repo_path, "status", "--porcelain"), "")
+
+    def test_failed_merge_that_never_started_keeps_main_worktree_changes(self):
+        for branch, file_name in (("feat/a_gen", "a.json"), ("feat/b_gen", "b.json")):
+            self.manager.commit_file_to_branch(branch, file_name, "{}", f"create {file_name}")
+        with open(os.path.join(self.repo_path, "notes.txt"), "w", encoding="utf-8") as f:
+            f.write("work in progress\n")
+        git(self.repo_path, "add", "notes.txt")
+
+        with self.assertRaises(RuntimeError):
+            self.manager._abort_merge()
+        with self.assertRaises(RuntimeError):
+            self.manager.merge_branches(["feat/a_gen", "feat/b_gen"])
+
+        self.assertIn("A  notes.txt", git(self.repo_path, "status", "--porcelain").splitlines())
+        self.assertFalse(os.path.exists(os.path.join(self.repo_path, ".git", "MERGE_HEAD")))
+
+
+class GitManagerSubprocessTest(GitManagerPlumbingTest):
+    USE_CHANNEL = False
+
+
+class GitCommandChannelTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo_path = self.temp_dir.name
+        git(self.repo_path, "init", "-q")
+        git(self.repo_path, "config", "user.name", "Builder Test")
+        git(self.repo_path, "config", "user.email", "builder@example.com")
+        git(self.repo_path, "commit", "-q", "--allow-empty", "-m", "base")
+        self.channel = GitCommandChannel.for_repo(self.repo_path)
+
+    def tearDown(self):
+        GitCommandChannel.close_all()
+        self.temp_dir.cleanup()
+
+    def test_channel_is_shared_per_repository(self):
+        self.assertIs(GitCommandChannel.for_repo(os.path.join(self.repo_path, ".")), self.channel)
+
+    def test_ref_transaction_failure_restarts_stream(self):
+        head = git(self.repo_path, "rev-parse", "HEAD")
+        self.channel.update_refs([("refs/heads/demo", head, ZERO_OID)])
+
+        with self.assertRaises(RuntimeError):
+            self.channel.update_refs([("refs/heads/demo", head, ZERO_OID)])
+
+        self.channel.update_refs([("refs/heads/demo", ZERO_OID, head)])
+        self.assertIsNone(self.channel.resolve("refs/heads/demo"))
+        self.assertEqual(self.channel.resolve("HEAD"), head)
+
+
+class WorktreePoolTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo_path = self.temp_dir.name
+        git(self.repo_path, "init", "-q")
+        git(self.repo_path, "config", "user.name", "Builder Test")
+        git(self.repo_path, "config", "user.email", "builder@example.com")
+        git(self.repo_path, "commit", "-q", "--allow-empty", "-m", "base")
+        self.manager = GitManager(self.repo_path)
+        self.pool = WorktreePool(self.manager, size=1)
+
+    def tearDown(self):
+        GitCommandChannel.close_all()
+        self.temp_dir.cleanup()
+
+    def test_slot_is_reused_and_reset_after_release(self):
+        slot = self.pool.lease()
+        self.pool.checkout(slot, "feat/header_gen_1")
+        with open(os.path.join(slot, "header.json"), "w", encoding="utf-8") as f:
+            f.write("{}")
+        self.manager.commit_changes(slot, "header")
+        self.pool.release(slot)
+
+        self.assertEqual(git(self.repo_path, "show", "feat/header_gen_1:header.json"), "{}")
+        self.assertEqual(self.pool.lease(timeout=1), slot)
+        self.assertFalse(os.path.exists(os.path.join(slot, "header.json")))
+        self.assertEqual(git(slot, "rev-parse", "--abbrev-ref", "HEAD"), "HEAD")
+        with self.assertRaises(TimeoutError):
+            WorktreePool(self.manager, size=1).lease(timeout=0.3)
+        self.pool.release(slot)
+        self.assertTrue(self.manager.delete_branch("feat/header_gen_1"))
+
+    def test_recover_detaches_abandoned_slot(self):
+        slot = self.pool.lease()
+        self.pool.checkout(slot, "feat/button_gen_1")
+        with open(os.path.join(slot, "button.json"), "w", encoding="utf-8") as f:
+            f.write("{}")
+        # 비정상 종료를 흉내: 반납 없이 잠금만 해제
+        self.pool._return_slot(0)
+
+        recovered = WorktreePool(self.manager, size=1).recover()
+
+        self.assertEqual(recovered, [os.path.abspath(slot)])
+        self.assertEqual(git(slot, "status", "--porcelain"), "")
+        self.assertTrue(self.manager.delete_branch("feat/button_gen_1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
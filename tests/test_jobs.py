@@ -0,0 +1,91 @@
+import json
+import threading
+import unittest
+
+from web.jobs import JobManager, JobQueueFullError
+
+
+class FakeOrchestrator:
+    def __init__(self):
+        self.release = threading.Event()
+        self.journals = {}
+        self._counter = 0
+
+    def _create_run_id(self):
+        self._counter += 1
+        return f"run_{self._counter}_{self._counter:08x}"
+
+    def run_pipeline(self, session_id, user_request, event_sink=None, stream_sections=None, run_id=None):
+        event_sink({"type": "started", "run_id": run_id})
+        event_sink({"type": "parsed", "components": ["header"]})
+        self.release.wait(5)
+        if user_request == "blocked":
+            return None
+        if user_request == "interrupt":
+            raise KeyboardInterrupt()
+        event_sink({"type": "composed", "cached": False})
+        return {"html": "<html></html>", "metrics": {"total": 1, "hits": 1, "misses": 0, "efficiency": 100.0}}
+
+    def load_run_journal(self, run_id):
+        return self.journals.get(run_id)
+
+
+class JobManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.orchestrator = FakeOrchestrator()
+        self.manager = JobManager(self.orchestrator, max_workers=2, max_pending=2, retention=1)
+
+    def tearDown(self):
+        self.orchestrator.release.set()
+        self.manager.shutdown(wait=True)
+
+    def _frames(self, job, last_event_id=-1):
+        return [
+            json.loads(frame.split("data: ", 1)[1])
+            for frame in self.manager.stream_events(job, last_event_id)
+            if frame.startswith("id:")
+        ]
+
+    def test_job_streams_progress_until_terminal_event(self):
+        job = self.manager.submit("login page")
+        blocked = self.manager.submit("blocked")
+        with self.assertRaises(JobQueueFullError):
+            self.manager.submit("one too many")
+
+        self.orchestrator.release.set()
+        events = self._frames(job)
+        self.assertEqual([event["type"] for event in events], ["started", "parsed", "composed", "done"])
+        self.assertEqual([event["id"] for event in events], [0, 1, 2, 3])
+        self.assertEqual(events[0]["run_id"], job.job_id)
+        # Last-Event-ID 이후부터 이어 받기
+        self.assertEqual([event["type"] for event in self._frames(job, 1)], ["composed", "done"])
+
+        self.assertEqual(self._frames(blocked)[-1]["type"], "error")
+        self.assertEqual(self.manager.describe(job.job_id)["result"]["html"], "<html></html>")
+        self.assertEqual(self.manager.describe(blocked.job_id)["status"], "blocked")
+
+    def test_interrupted_run_finishes_the_job(self):
+        self.orchestrator.release.set()
+        job = self.manager.submit("interrupt")
+
+        events = self._frames(job)
+        self.assertEqual((events[-1]["type"], events[-1]["status"]), ("error", "interrupted"))
+        self.assertTrue(job.finished)
+        self.assertEqual(self.manager.describe(job.job_id)["status"], "interrupted")
+
+    def test_evicted_job_is_described_from_run_journal(self):
+        self.orchestrator.release.set()
+        job = self.manager.submit("login page")
+        self._frames(job)
+        self._frames(self.manager.submit("second page"))
+
+        self.assertIsNone(self.manager.get(job.job_id))
+        self.orchestrator.journals[job.job_id] = {"status": "completed", "request": "login page"}
+        payload = self.manager.describe(job.job_id)
+        self.assertEqual(payload["status"], "completed")
+        self.assertEqual(payload["source"], "journal")
+        self.assertIsNone(self.manager.describe("../../etc/passwd"))
+
+
+if __name__ == "__main__":
+    unittest.main()
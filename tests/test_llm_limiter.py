@@ -0,0 +1,100 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+
+from src.utils import llm_limiter, llm_router
+from src.utils.llm_limiter import ProviderLimiter
+
+
+class ProviderLimiterTest(unittest.TestCase):
+    def _queued(self, limiter):
+        return sum(limiter.snapshot()["queued"].values())
+
+    def test_waiting_calls_alternate_between_roles(self):
+        limiter = ProviderLimiter("fake", max_inflight=1)
+        limiter.acquire("generation")
+        granted = []
+
+        def call(role, name):
+            limiter.acquire(role)
+            granted.append(name)
+            limiter.release()
+
+        threads = []
+        for role, name in (("generation", "g1"), ("generation", "g2"), ("generation", "g3"), ("customer", "c1")):
+            thread = threading.Thread(target=call, args=(role, name))
+            thread.start()
+            threads.append(thread)
+            while self._queued(limiter) < len(threads):
+                time.sleep(0.001)
+
+        limiter.release()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(granted, ["g1", "c1", "g2", "g3"])
+        self.assertEqual(limiter.snapshot()["waits"]["customer"]["waits"], 1)
+
+    def test_request_bucket_spaces_calls_and_cancelled_waiters_leave_the_queue(self):
+        limiter = ProviderLimiter("fake", rpm=600, burst_seconds=0.1)  # 버킷 1개, 0.1초마다 1개 충전
+
+        async def scenario():
+            await limiter.acquire_async("customer")
+            started = time.monotonic()
+            await limiter.acquire_async("customer")
+            waited = time.monotonic() - started
+
+            task = asyncio.ensure_future(limiter.acquire_async("generation"))
+            await asyncio.sleep(0.01)
+            self.assertEqual(self._queued(limiter), 1)
+            task.cancel()
+            await asyncio.sleep(0)
+            return waited
+
+        self.assertGreaterEqual(asyncio.run(scenario()), 0.05)
+        self.assertEqual(self._queued(limiter), 0)
+        self.assertEqual(limiter.snapshot()["inflight"], 2)
+
+    def test_token_usage_is_settled_after_the_call(self):
+        limiter = ProviderLimiter("fake", tpm=6000, burst_seconds=10)  # 버킷 1000 토큰
+        limiter.acquire("generation", 800)
+        limiter.release(800, used_tokens=100)
+        self.assertGreater(limiter.tokens.level, 800)
+        self.assertIsNone(ProviderLimiter.from_env("unlimited-provider"))
+
+
+@unittest.skipIf(llm_router.RoutedChatModel is None, "langchain not installed")
+class RoutedLimiterTest(unittest.TestCase):
+    def setUp(self):
+        os.environ["FAKE_MAX_INFLIGHT"] = "1"
+        llm_limiter.reset_provider_limiters()
+
+    def tearDown(self):
+        os.environ.pop("FAKE_MAX_INFLIGHT", None)
+        llm_limiter.reset_provider_limiters()
+
+    def test_router_calls_queue_on_the_provider_limit(self):
+        class SlowProvider:
+            temperature = 0.0
+
+            async def ainvoke(self, input, config=None, *, stop=None, **kwargs):
+                await asyncio.sleep(0.05)
+                return "ok"
+
+        router = llm_router.RoutedChatModel(
+            "generation", [llm_router._RouteTarget("fake", "m", SlowProvider())], cache_enabled=False
+        )
+
+        async def burst():
+            return await asyncio.gather(*(router.ainvoke(f"prompt {index}") for index in range(3)))
+
+        started = time.monotonic()
+        self.assertEqual(asyncio.run(burst()), ["ok"] * 3)
+        self.assertGreaterEqual(time.monotonic() - started, 0.14)
+        stats = llm_limiter.get_limiter_stats()["fake"]
+        self.assertEqual((stats["inflight"], stats["waits"]["generation"]["waits"]), (0, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,291 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from src.utils import llm_policy, llm_router
+from src.utils.llm_cache import PromptResponseCache
+
+
+class LLMClientRegistryTest(unittest.TestCase):
+    ENV_KEYS = ["OPENAI_API_KEY", "OPENAI_BASE_URL", "OPENAI_TIMEOUT_SECONDS"]
+
+    def setUp(self):
+        self.original_env = {key: os.environ.get(key) for key in self.ENV_KEYS}
+        for key in self.ENV_KEYS:
+            os.environ.pop(key, None)
+        llm_router.clear_llm_clients()
+
+    def tearDown(self):
+        for key, value in self.original_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        llm_router.clear_llm_clients()
+
+    def test_mock_fallback_is_not_cached(self):
+        first = llm_router.get_llm("openai", "gpt-4o")
+        self.assertIsInstance(first, llm_router.MockLLM)
+        self.assertIsNot(first, llm_router.get_llm("openai", "gpt-4o"))
+
+    @unittest.skipIf(llm_router.ChatOpenAI is None or llm_router.httpx is None, "langchain_openai/httpx not installed")
+    def test_same_key_shares_client_and_http_pool(self):
+        os.environ["OPENAI_API_KEY"] = "sk-test"
+        first = llm_router.get_llm("openai", "gpt-4o")
+        self.assertIs(first, llm_router.get_llm("OpenAI", "gpt-4o"))
+        self.assertIsNot(first, llm_router.get_llm("openai", "gpt-4o-mini"))
+
+        os.environ["OPENAI_TIMEOUT_SECONDS"] = "30"
+        with_timeout = llm_router.get_llm("openai", "gpt-4o")
+        self.assertIsNot(first, with_timeout)
+        sync_client, async_client = llm_router.get_shared_http_clients()
+        self.assertIs(with_timeout.http_client, sync_client)
+        self.assertIs(with_timeout.http_async_client, async_client)
+
+    @unittest.skipIf(llm_router.httpx is None, "httpx not installed")
+    def test_async_transport_is_pooled_per_event_loop(self):
+        transport = llm_router._LoopLocalAsyncTransport()
+
+        async def pick():
+            return transport._transport(), transport._transport()
+
+        first, again = asyncio.run(pick())
+        second, _ = asyncio.run(pick())
+        self.assertIs(first, again)
+        self.assertIsNot(first, second)
+
+
+@unittest.skipIf(llm_router.RoutedChatModel is None, "langchain not installed")
+class PromptResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "llm_cache.sqlite3")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _chain(self, responses, cache, parser=None, cache_check=None):
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import PromptTemplate
+
+        self.model = FakeListChatModel(responses=responses)
+        wrapper = llm_router.RoutedChatModel(
+            "generation", [llm_router._RouteTarget("fake", "fake-model", self.model)], cache=cache,
+            cache_check=cache_check,
+        )
+        return PromptTemplate.from_template("component named '{name}'") | wrapper | (parser or StrOutputParser())
+
+    def test_identical_prompts_skip_the_provider(self):
+        cache = PromptResponseCache(self.db_path)
+        chain = self._chain(["first", "second"], cache)
+
+        self.assertEqual(chain.invoke({"name": "button"}), "first")
+        self.assertEqual(chain.invoke({"name": "button"}), "first")
+        self.assertEqual(asyncio.run(chain.ainvoke({"name": "button"})), "first")
+        self.assertEqual(chain.invoke({"name": "header"}), "second")
+        cache.close()
+
+        # 새 프로세스(새 캐시 인스턴스)에서도 디스크 계층에서 적중
+        disk_cache = PromptResponseCache(self.db_path)
+        self.assertEqual(self._chain(["unused"], disk_cache).invoke({"name": "button"}), "first")
+        self.assertEqual(self.model.i, 0)
+        disk_cache.close()
+
+    def test_malformed_responses_are_not_replayed(self):
+        from langchain_core.output_parsers import JsonOutputParser
+
+        cache = PromptResponseCache(self.db_path)
+        chain = self._chain(
+            ['{"name": "butt', '```json\n{"name": "button"}\n```', "unused"], cache,
+            parser=JsonOutputParser(), cache_check=llm_router.is_json_response,
+        )
+        chain.invoke({"name": "button"})  # 잘린 JSON (파서는 부분 파싱하지만 캐시에는 남기지 않는다)
+        self.assertEqual(chain.invoke({"name": "button"}), {"name": "button"})
+        self.assertEqual(chain.invoke({"name": "button"}), {"name": "button"})
+        self.assertEqual(self.model.i, 2)
+
+        # 검사 없이 저장된 잘못된 응답도 재사용하지 않는다
+        self._chain(["Sure! Here is your header"], cache).invoke({"name": "header"})
+        checked = self._chain(['{"name": "header"}', "unused"], cache, parser=JsonOutputParser(),
+                              cache_check=llm_router.is_json_response)
+        self.assertEqual(checked.invoke({"name": "header"}), {"name": "header"})
+        self.assertEqual(self.model.i, 1)
+        cache.close()
+
+    def test_prune_applies_ttl_and_size_limit(self):
+        cache = PromptResponseCache(self.db_path, max_entries=0, disk_max_bytes=5, ttl_seconds=60)
+        cache.store("old", "x" * 4)
+        cache.store("mid", "y" * 4)
+        cache.store("new", "z" * 4)
+        with cache._conn() as conn:
+            conn.execute("UPDATE llm_cache SET created_at = ? WHERE key = 'old'", (time.time() - 120,))
+            conn.execute("UPDATE llm_cache SET last_used = last_used - 10 WHERE key = 'mid'")
+
+        self.assertEqual(cache.prune(), 2)
+        self.assertIsNone(cache.lookup("old"))
+        self.assertIsNone(cache.lookup("mid"))
+        self.assertEqual(cache.lookup("new"), ("zzzz", "disk"))
+        cache.close()
+
+    def test_cache_can_be_bypassed_per_role(self):
+        original = {key: os.environ.get(key) for key in ("LLM_CACHE_ENABLED", "COMPOSITION_LLM_CACHE")}
+        try:
+            os.environ.pop("LLM_CACHE_ENABLED", None)
+            os.environ["COMPOSITION_LLM_CACHE"] = "0"
+            self.assertTrue(llm_router.llm_cache_enabled("generation"))
+            self.assertFalse(llm_router.llm_cache_enabled("composition"))
+            os.environ["LLM_CACHE_ENABLED"] = "0"
+            self.assertFalse(llm_router.llm_cache_enabled("generation"))
+        finally:
+            for key, value in original.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+class FakeProvider:
+    temperature = 0.7
+
+    def __init__(self, text, delay=0.0, error=None):
+        self.text = text
+        self.delay = delay
+        self.error = error
+        self.cancelled = False
+
+    def invoke(self, input, config=None, *, stop=None, **kwargs):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.text
+
+    async def ainvoke(self, input, config=None, *, stop=None, **kwargs):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.text
+
+
+@unittest.skipIf(llm_router.RoutedChatModel is None, "langchain not installed")
+class RoutedChatModelTest(unittest.TestCase):
+    def _router(self, *providers, hedge_policy=("fixed", 0.05)):
+        targets = [llm_router._RouteTarget(f"p{index}", "m", llm) for index, llm in enumerate(providers)]
+        return llm_router.RoutedChatModel("customer", targets, cache_enabled=False, hedge_policy=hedge_policy)
+
+    def test_hedged_request_wins_and_cancels_slow_primary(self):
+        slow, fast = FakeProvider("slow", delay=2), FakeProvider("fast", delay=0.01)
+
+        started = time.perf_counter()
+        self.assertEqual(asyncio.run(self._router(slow, fast).ainvoke("prompt")), "fast")
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertTrue(slow.cancelled)
+
+        self.assertEqual(self._router(FakeProvider("slow", delay=0.5), fast).invoke("prompt"), "fast")
+
+    def test_failover_skips_errors_and_empty_responses_without_waiting(self):
+        router = self._router(
+            FakeProvider("", delay=0), FakeProvider(None, error=RuntimeError("429")), FakeProvider("ok"),
+            hedge_policy=None,
+        )
+        self.assertEqual(asyncio.run(router.ainvoke("prompt")), "ok")
+        self.assertEqual(router.invoke("prompt"), "ok")
+
+        failing = self._router(FakeProvider(None, error=RuntimeError("down")), hedge_policy=None)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(failing.ainvoke("prompt"))
+
+    def test_route_specs_keep_model_colons(self):
+        os.environ["CUSTOMER_LLM_PROVIDERS"] = "ollama:glm-5:cloud, openai:gpt-4o-mini, google"
+        try:
+            self.assertEqual(
+                llm_router._route_specs("customer", "ollama", "llama3"),
+                [("ollama", "glm-5:cloud"), ("openai", "gpt-4o-mini"), ("google", "llama3")],
+            )
+        finally:
+            os.environ.pop("CUSTOMER_LLM_PROVIDERS", None)
+        self.assertEqual(llm_router._route_specs("customer", "Ollama", "llama3"), [("ollama", "llama3")])
+
+
+class RoutingPolicyTest(unittest.TestCase):
+    def setUp(self):
+        llm_policy.reset_provider_stats()
+        self.targets = [
+            llm_router._RouteTarget("openai", "gpt-4o", None),
+            llm_router._RouteTarget("openai", "gpt-4o-mini", None),
+            llm_router._RouteTarget("ollama", "llama3", None),
+        ]
+
+    def tearDown(self):
+        llm_policy.reset_provider_stats()
+
+    def _observe(self, provider, model_name, seconds, ok=True, times=10):
+        for _ in range(times):
+            llm_policy.observe_call("customer", provider, model_name, seconds, ok)
+
+    def _order(self, spec):
+        os.environ["CUSTOMER_LLM_POLICY"] = spec
+        try:
+            policy = llm_policy.RoutingPolicy.from_env("customer")
+        finally:
+            os.environ.pop("CUSTOMER_LLM_POLICY", None)
+        return [target.model_name for target in policy.order("customer", self.targets)]
+
+    def test_cheapest_under_prefers_cheap_models_within_latency_limit(self):
+        self._observe("openai", "gpt-4o", 1.0)
+        self._observe("openai", "gpt-4o-mini", 1.5)
+        self._observe("ollama", "llama3", 6.0)
+
+        self.assertEqual(self._order("ordered"), ["gpt-4o", "gpt-4o-mini", "llama3"])
+        self.assertEqual(self._order("cheapest"), ["llama3", "gpt-4o-mini", "gpt-4o"])
+        self.assertEqual(self._order("fastest"), ["gpt-4o", "gpt-4o-mini", "llama3"])
+        self.assertEqual(self._order("cheapest_under:2"), ["gpt-4o-mini", "gpt-4o", "llama3"])
+
+    def test_unhealthy_models_go_last_and_unknown_models_are_explored(self):
+        self._observe("openai", "gpt-4o-mini", 0.5, ok=False)
+        self._observe("ollama", "llama3", 6.0)
+
+        # gpt-4o는 표본이 없어 지연 한도를 만족하는 것으로 보고, gpt-4o-mini는 오류율 때문에 맨 뒤로
+        self.assertEqual(self._order("cheapest_under:2"), ["gpt-4o", "llama3", "gpt-4o-mini"])
+        self.assertEqual(str(llm_policy.RoutingPolicy.from_env("customer")), "ordered")
+
+    def test_unhealthy_model_is_explored_again_after_its_stats_go_stale(self):
+        self._observe("openai", "gpt-4o", 1.0)
+        self._observe("ollama", "llama3", 6.0)
+        self._observe("openai", "gpt-4o-mini", 0.5, ok=False)
+        self.assertEqual(self._order("fastest"), ["gpt-4o", "llama3", "gpt-4o-mini"])
+
+        # 뒤로 밀린 뒤 호출되지 않아 통계가 오래되면 다시 탐색 대상이 된다
+        llm_policy._stats[("customer", "openai", "gpt-4o-mini")].last_observed -= 600
+        self.assertEqual(self._order("fastest"), ["gpt-4o-mini", "gpt-4o", "llama3"])
+
+        # 복구된 뒤의 성공 호출은 과거 오류율 없이 새로 쌓인다
+        self._observe("openai", "gpt-4o-mini", 0.5, times=1)
+        self.assertEqual(self._order("fastest")[0], "gpt-4o-mini")
+        self._observe("openai", "gpt-4o-mini", 0.5, times=4)
+        stats = llm_policy.get_provider_stats()[("customer", "openai", "gpt-4o-mini")]
+        self.assertEqual((stats["calls"], stats["error_ewma"]), (5, 0.0))
+        self.assertEqual(self._order("fastest"), ["gpt-4o-mini", "gpt-4o", "llama3"])
+
+    @unittest.skipIf(llm_router.RoutedChatModel is None, "langchain not installed")
+    def test_router_follows_policy_and_records_cost(self):
+        cheap, pricey = FakeProvider("cheap"), FakeProvider("pricey")
+        router = llm_router.RoutedChatModel(
+            "customer",
+            [llm_router._RouteTarget("openai", "gpt-4o", pricey), llm_router._RouteTarget("openai", "gpt-4o-mini", cheap)],
+            cache_enabled=False, policy=llm_policy.RoutingPolicy("cheapest"),
+        )
+        self.assertEqual(router.invoke("x" * 4000), "cheap")
+        stats = llm_policy.get_provider_stats()[("customer", "openai", "gpt-4o-mini")]
+        self.assertEqual(stats["calls"], 1)
+        self.assertAlmostEqual(stats["cost_ewma"], 1000 * 0.15 / 1_000_000 + 1 * 0.6 / 1_000_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,17 @@
+import asyncio
+import json
 import os
 import tempfile
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
+from src.utils.component_store import JsonDirectoryComponentStore
+from src.utils.deadline import Deadline
 from worktrees.composition_agent.agent import CompositionAgent
 from worktrees.customer_agent.agent import CustomerAgent
-from worktrees.generation_agent.agent import GenerationAgent
+from worktrees.generation_agent.agent import ComponentMetadataCache, GenerationAgent
 
 
 class MockLLMAgentTest(unittest.TestCase):
@@ -45,6 +52,16 @@ class MockLLMAgentTest(unittest.TestCase):
         self.assertIn("text_input", result["required_components"])
         self.assertIn("로그인 UI", result["user_intent"])
 
+    def test_customer_prompt_is_session_independent(self):
+        agent = CustomerAgent()
+
+        # 같은 의도는 같은 프롬프트(같은 LLM 캐시 키)가 되고, session_id는 호출자의 값으로 채워진다
+        self.assertNotIn("session_id", agent.prompt.input_variables)
+        first = agent.process_request("session-a", "헤더와 버튼이 있는 화면")
+        second = agent.process_request("session-b", "헤더와 버튼이 있는 화면")
+        self.assertEqual((first["session_id"], second["session_id"]), ("session-a", "session-b"))
+        self.assertEqual(first["required_components"], second["required_components"])
+
     def test_customer_agent_normalizes_abstract_components(self):
         agent = CustomerAgent()
 
@@ -64,6 +81,17 @@ class MockLLMAgentTest(unittest.TestCase):
         self.assertNotIn("dashboard_layout", result["required_components"])
         self.assertEqual(len(result["required_components"]), len(set(result["required_components"])))
 
+    def test_customer_agent_predicts_components_without_llm(self):
+        agent = CustomerAgent()
+
+        predicted = agent.predict_components("헤더와 매출 대시보드, 로그인 버튼")
+
+        self.assertEqual(predicted[:2], ["header", "button"])
+        self.assertIn("custom_graph", predicted)
+        self.assertIn("text_input", predicted)
+        self.assertLessEqual(len(predicted), 6)
+        self.assertEqual(agent.predict_components("   "), [])
+
     def test_generation_agent_creates_mock_component_metadata(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             os.environ["COMPONENT_LIBRARY_PATH"] = temp_dir
@@ -94,6 +122,167 @@ class MockLLMAgentTest(unittest.TestCase):
         self.assertIn("data-component=\"button\"", html)
         self.assertNotIn("Generated Output (Fallback)", html)
 
+    def test_async_agents_match_sync_behaviour(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.environ["COMPONENT_LIBRARY_PATH"] = temp_dir
+            customer = CustomerAgent()
+            generator = GenerationAgent()
+            composer = CompositionAgent()
+
+            async def run_agents():
+                parsed = await customer.aprocess_request("session-789", "헤더와 버튼이 있는 화면")
+                assets = await asyncio.gather(
+                    *(generator.aload_component_metadata(name) for name in parsed["required_components"])
+                )
+                return parsed, assets, await composer.acompose(parsed, list(assets))
+
+            parsed, assets, html = asyncio.run(run_agents())
+
+            self.assertEqual(parsed, customer.process_request("session-789", "헤더와 버튼이 있는 화면"))
+            self.assertEqual([asset["name"] for asset in assets], parsed["required_components"])
+            self.assertTrue(os.path.exists(os.path.join(temp_dir, "header.json")))
+            self.assertIn("data-component=\"button\"", html)
+
+    def test_concurrent_misses_share_one_generation(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.environ["COMPONENT_LIBRARY_PATH"] = temp_dir
+            agents = [GenerationAgent() for _ in range(4)]
+            calls = []
+
+            def slow_sync_call(name, deadline=None):
+                calls.append(("sync", name))
+                time.sleep(0.2)
+                return agents[0]._fallback_component(name)
+
+            async def slow_async_call(name, deadline=None):
+                calls.append(("async", name))
+                await asyncio.sleep(0.2)
+                return agents[0]._fallback_component(name)
+
+            for agent in agents:
+                agent._call_llm_for_atomic_component = slow_sync_call
+                agent._acall_llm_for_atomic_component = slow_async_call
+
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(lambda agent: agent.load_component_metadata("pricing_table"), agents))
+
+            async def run_async():
+                return await asyncio.gather(*(agent.aload_component_metadata("faq_list") for agent in agents))
+
+            async_results = asyncio.run(run_async())
+
+            self.assertEqual(calls, [("sync", "pricing_table"), ("async", "faq_list")])
+            self.assertTrue(all(result["name"] == "pricing_table" for result in results))
+            self.assertTrue(all(result["name"] == "faq_list" for result in async_results))
+            self.assertEqual(GenerationAgent._inflight, {})
+            self.assertEqual(
+                sorted(name for name in os.listdir(temp_dir) if name.endswith(".json")),
+                ["faq_list.json", "pricing_table.json"],
+            )
+
+    def test_deadline_cancels_stuck_calls_and_falls_back(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.environ["COMPONENT_LIBRARY_PATH"] = temp_dir
+            agent = GenerationAgent()
+            cancelled = []
+
+            async def stuck_ainvoke(payload):
+                try:
+                    await asyncio.sleep(30)
+                except asyncio.CancelledError:
+                    cancelled.append(payload["component_name"])
+                    raise
+
+            agent.chain = type("StuckChain", (), {"ainvoke": staticmethod(stuck_ainvoke)})()
+            timed_out = []
+            deadline = Deadline(0.2, on_timeout=timed_out.append)
+
+            started = time.perf_counter()
+            meta, is_hit = asyncio.run(agent.aresolve_component("pricing_table", deadline))
+
+            self.assertLess(time.perf_counter() - started, 5)
+            self.assertEqual(meta["name"], "pricing_table")
+            self.assertFalse(is_hit)
+            self.assertEqual(cancelled, ["pricing_table"])
+            self.assertEqual(timed_out, ["generation"])
+            self.assertEqual(deadline.timed_out_stages, ["generation"])
+            # 기한 초과 폴백은 라이브러리에 저장되지 않는다.
+            self.assertFalse(os.path.exists(os.path.join(temp_dir, "pricing_table.json")))
+            self.assertEqual(GenerationAgent._inflight, {})
+
+            customer = CustomerAgent()
+            customer.chain = type("StuckChain", (), {"invoke": staticmethod(lambda payload: time.sleep(1))})()
+            parsed = customer.process_request("session-deadline", "헤더와 버튼", Deadline(0.1))
+            self.assertEqual(parsed, customer._fallback_data("session-deadline"))
+
+    def test_waiter_retries_when_single_flight_leader_times_out(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.environ["COMPONENT_LIBRARY_PATH"] = temp_dir
+            leader, waiter = GenerationAgent(), GenerationAgent()
+            calls = []
+
+            def generated(name):
+                return {**leader._fallback_component(name), "generated": True}
+
+            def sync_call(name, deadline=None):
+                calls.append(name)
+                return deadline.call(time.sleep, 0.5, stage="generation") if len(calls) == 1 else generated(name)
+
+            async def async_call(name, deadline=None):
+                calls.append(name)
+                if len(calls) == 1:
+                    await deadline.wait(asyncio.sleep(30), "generation")
+                return generated(name)
+
+            for agent in (leader, waiter):
+                agent._call_llm_for_atomic_component = sync_call
+                agent._acall_llm_for_atomic_component = async_call
+
+            async def run_async():
+                leading = asyncio.ensure_future(leader.aresolve_component("pricing_table", Deadline(0.1)))
+                await asyncio.sleep(0.02)
+                return await asyncio.gather(leading, waiter.aresolve_component("pricing_table", Deadline(None)))
+
+            waiter_deadline = Deadline(None)
+            (leader_meta, _), (waiter_meta, waiter_hit) = asyncio.run(run_async())
+            self.assertNotIn("generated", leader_meta)
+            self.assertTrue(waiter_meta.get("generated"))
+            self.assertFalse(waiter_hit)
+
+            calls.clear()
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                leading = pool.submit(leader.resolve_component, "faq_list", Deadline(0.1))
+                time.sleep(0.02)
+                waiting = pool.submit(waiter.resolve_component, "faq_list", waiter_deadline)
+                self.assertNotIn("generated", leading.result()[0])
+                self.assertTrue(waiting.result()[0].get("generated"))
+            self.assertEqual(waiter_deadline.timed_out_stages, [])
+            self.assertEqual(GenerationAgent._inflight, {})
+
+    def test_metadata_cache_serves_hot_entries_and_tracks_file_changes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = JsonDirectoryComponentStore(temp_dir)
+            file_path = os.path.join(temp_dir, "header.json")
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump({"name": "header", "html_template": "<header>v1</header>"}, f)
+
+            hot_cache = ComponentMetadataCache(max_entries=2, revalidate_seconds=60)
+            self.assertEqual(hot_cache.get(store, "header")["html_template"], "<header>v1</header>")
+            with patch("builtins.open", side_effect=AssertionError("hot entry touched disk")), \
+                    patch("os.stat", side_effect=AssertionError("hot entry touched disk")):
+                entry = hot_cache.get(store, "header")
+            entry["html_template"] = "mutated by caller"
+            self.assertEqual(hot_cache.get(store, "header")["html_template"], "<header>v1</header>")
+
+            cache = ComponentMetadataCache(max_entries=2, revalidate_seconds=0)
+            self.assertEqual(cache.get(store, "header")["html_template"], "<header>v1</header>")
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump({"name": "header", "html_template": "<header>version 2</header>"}, f)
+            self.assertEqual(cache.get(store, "header")["html_template"], "<header>version 2</header>")
+
+            os.remove(file_path)
+            self.assertIsNone(cache.get(store, "header"))
+            self.assertEqual(len(cache), 0)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from core.result_cache import PageResultCache, normalize_text
+from src.utils.component_store import JsonDirectoryComponentStore
+
+
+class PageResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "page_cache")
+        self.store = JsonDirectoryComponentStore(os.path.join(self.temp_dir.name, "components"))
+        self.models = {"generation": ["mock", "mock"]}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _key(self, components, intent="로그인 화면"):
+        tokens = {comp: self.store.entry_token(comp) for comp in components}
+        return PageResultCache.page_key(components, intent, self.models, tokens)
+
+    def test_key_ignores_intent_formatting_but_not_component_order(self):
+        self.assertEqual(normalize_text("  Login   Form! "), normalize_text("login form"))
+        self.assertEqual(self._key(["header", "button"], "Login Form."), self._key(["header", "button"], "login  form"))
+        self.assertNotEqual(self._key(["header", "button"]), self._key(["button", "header"]))
+
+    def test_memory_lru_and_disk_tier(self):
+        cache = PageResultCache(self.cache_dir, max_entries=1, disk_max_entries=10, ttl_seconds=0)
+        first, second = self._key(["header"]), self._key(["button"])
+        cache.put(first, ["header"], "<p>header</p>")
+        cache.put(second, ["button"], "<p>button</p>")
+
+        self.assertEqual(cache.get(second), ("<p>button</p>", "memory"))
+        # 메모리에서 밀려난 항목은 디스크 계층에서 복원된다.
+        self.assertEqual(cache.get(first), ("<p>header</p>", "disk"))
+        self.assertEqual(PageResultCache(self.cache_dir, ttl_seconds=0).get(second), ("<p>button</p>", "disk"))
+
+    def test_component_save_invalidates_pages_containing_it(self):
+        self.store.put("header", {"name": "header", "code": "<header></header>"})
+        cache = PageResultCache(self.cache_dir, ttl_seconds=0)
+        with_header, without_header = self._key(["header", "button"]), self._key(["button"])
+        cache.put(with_header, ["header", "button"], "<p>a</p>")
+        cache.put(without_header, ["button"], "<p>b</p>")
+
+        self.store.put("header", {"name": "header", "code": "<header>v2</header>"})
+
+        self.assertIsNone(cache.get(with_header))
+        self.assertIsNotNone(cache.get(without_header))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, with_header[:2], f"{with_header}.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
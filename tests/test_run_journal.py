@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+
+from scripts.run_journal import (
+    RunJournal,
+    compact_finished,
+    is_active,
+    iter_active_journals,
+    iter_running_journals,
+    load_journal,
+)
+
+
+class RunJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.journal = RunJournal(self.temp_dir.name, flush_every=1, fsync=False)
+
+    def tearDown(self):
+        self.journal.close()
+        self.temp_dir.cleanup()
+
+    def _resource(self, component):
+        return {"run_id": "run_1", "component": component, "branch_name": f"feat/{component}_gen_1", "worktree_path": None}
+
+    def test_crashed_run_replays_only_outstanding_resources(self):
+        self.journal.start("run_1", "session-1", "헤더와 버튼")
+        self.journal.track("run_1", self._resource("header"))
+        self.journal.track("run_1", self._resource("button"))
+        self.journal.untrack("run_1", "feat/header_gen_1", None)
+        self.journal.flush()
+        # 크래시 중 잘린 마지막 줄
+        with open(self.journal.path_for("run_1"), "a", encoding="utf-8") as f:
+            f.write('{"event": "untrack", "branch_na')
+
+        running = list(iter_running_journals(self.temp_dir.name))
+
+        self.assertEqual(len(running), 1)
+        path, payload = running[0]
+        self.assertTrue(path.endswith("run_1.jsonl"))
+        self.assertEqual(payload["session_id"], "session-1")
+        self.assertEqual([item["component"] for item in payload["resources"]], ["button"])
+        self.assertEqual(compact_finished(self.temp_dir.name), [])
+
+    def test_finished_run_is_compacted_into_summary(self):
+        self.journal.start("run_1", "session-1", "로그인 화면")
+        self.journal.track("run_1", self._resource("header"))
+        self.journal.untrack("run_1", "feat/header_gen_1", None)
+        self.journal.deadline_exceeded("run_1", "composition")
+        self.journal.set_status("run_1", status="completed", finished=True)
+
+        self.assertFalse(os.path.exists(self.journal.path_for("run_1")))
+        with open(self.journal.summary_path_for("run_1"), encoding="utf-8") as f:
+            summary = json.load(f)
+        self.assertEqual(summary["status"], "completed")
+        self.assertEqual(summary["request"], "로그인 화면")
+        self.assertEqual(summary["resources"], [])
+        self.assertEqual(summary["timed_out_stages"], ["composition"])
+        self.assertIsNotNone(summary["finished_at"])
+
+        # 요약 이후에 이어진 이벤트(예: atexit 후 finally)는 요약 위에 다시 접힌다.
+        self.journal.set_status("run_1", status="interrupted", error="late", finished=True)
+        summary = load_journal(self.journal.summary_path_for("run_1"))
+        self.assertEqual((summary["status"], summary["error"], summary["session_id"]), ("interrupted", "late", "session-1"))
+
+    def test_active_manifest_lists_only_in_flight_runs(self):
+        self.journal.start("run_done", "s", "r")
+        self.journal.set_status("run_done", status="completed", finished=True)
+        self.journal.start("run_live", "s", "r")
+        self.journal.track("run_live", self._resource("header"))
+        # 종료 이벤트는 기록됐지만 compact 전에 중단된 run
+        self.journal.start("run_unfolded", "s", "r")
+        self.journal._append("run_unfolded", {"event": "status", "status": "failed", "finished": True}, force_flush=True)
+        self.journal.close()
+
+        self.assertFalse(is_active(self.temp_dir.name, "run_done"))
+        active = [payload["run_id"] for _, payload in iter_active_journals(self.temp_dir.name)]
+
+        self.assertEqual(active, ["run_live"])
+        self.assertFalse(is_active(self.temp_dir.name, "run_unfolded"))
+        self.assertEqual(load_journal(self.journal.summary_path_for("run_unfolded"))["status"], "failed")
+        self.assertEqual(sorted(os.listdir(os.path.join(self.temp_dir.name, "active"))), ["run_live"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import unittest
+
+from core.orchestrator import RunEventStream, StageGate, StageQueueFullError
+
+
+class StageGateTest(unittest.TestCase):
+    def test_limit_is_shared_across_event_loops(self):
+        gate = StageGate("generation", limit=1, max_queue=4)
+        holder_entered = threading.Event()
+        release_holder = threading.Event()
+        order = []
+
+        async def hold():
+            async with gate:
+                order.append("holder")
+                holder_entered.set()
+                await asyncio.get_running_loop().run_in_executor(None, release_holder.wait)
+
+        async def wait_turn():
+            async with gate:
+                order.append("waiter")
+
+        holder = threading.Thread(target=lambda: asyncio.run(hold()))
+        holder.start()
+        holder_entered.wait(2)
+
+        waiter = threading.Thread(target=lambda: asyncio.run(wait_turn()))
+        waiter.start()
+        while gate.queued == 0:
+            pass
+        self.assertEqual(gate.active, 1)
+
+        release_holder.set()
+        holder.join(2)
+        waiter.join(2)
+
+        self.assertEqual(order, ["holder", "waiter"])
+        self.assertEqual((gate.active, gate.queued), (0, 0))
+
+    def test_full_queue_is_rejected_and_cancelled_waiter_frees_its_place(self):
+        gate = StageGate("customer", limit=1, max_queue=1)
+
+        async def scenario():
+            await gate.acquire()
+            waiter = asyncio.ensure_future(gate.acquire())
+            await asyncio.sleep(0)
+            with self.assertRaises(StageQueueFullError):
+                await gate.acquire()
+
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            gate.release()
+
+            async with gate:
+                self.assertEqual(gate.active, 1)
+
+        asyncio.run(scenario())
+        self.assertEqual((gate.active, gate.queued), (0, 0))
+
+
+class RunEventStreamTest(unittest.TestCase):
+    def test_sections_are_emitted_in_component_order(self):
+        events = []
+        stream = RunEventStream(events.append)
+        stream.emit("shell", "<main>")
+
+        stream.complete(2, "footer_simple", "<footer></footer>")
+        stream.complete(1, "button", None)  # QA 실패: 자리만 비운다
+        self.assertEqual([event["type"] for event in events], ["shell"])
+
+        stream.complete(0, "header", "<header></header>")
+        stream.emit("shell_close", "</main>")
+
+        self.assertEqual(
+            [(event["type"], event.get("component")) for event in events],
+            [("shell", None), ("section", "header"), ("section", "footer_simple"), ("shell_close", None)],
+        )
+        self.assertEqual(stream.document(), "<main><header></header><footer></footer></main>")
+
+
+if __name__ == "__main__":
+    unittest.main()
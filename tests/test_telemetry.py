@@ -0,0 +1,119 @@
+import threading
+import unittest
+
+from core.metrics import render_prometheus_metrics
+from core.orchestrator import LatencyHistogram, RollingWindow, Telemetry
+from src.utils.llm_router import record_llm_call
+
+
+class TelemetryTest(unittest.TestCase):
+    def test_concurrent_counters_and_histograms_are_consistent(self):
+        telemetry = Telemetry()
+
+        def worker():
+            for i in range(1000):
+                if i % 4 == 0:
+                    telemetry.record_miss()
+                else:
+                    telemetry.record_hit()
+                telemetry.observe("generation", 0.01)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(telemetry.total_requested, 8000)
+        self.assertEqual(telemetry.cache_hits, 6000)
+        self.assertEqual(telemetry.llm_generations, 2000)
+        self.assertAlmostEqual(telemetry.get_efficiency_rate(), 75.0)
+        self.assertEqual(telemetry.stage_latencies()["generation"]["count"], 8000)
+
+    def test_percentiles_follow_bucketed_distribution(self):
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.observe(0.02)
+        for _ in range(10):
+            histogram.observe(3.0)
+
+        stats = histogram.percentiles()
+
+        self.assertEqual(stats["count"], 100)
+        self.assertTrue(0.01 < stats["p50"] <= 0.025)
+        self.assertTrue(2.5 < stats["p95"] <= 3.0)
+        self.assertTrue(2.5 < stats["p99"] <= 3.0)
+
+    def test_time_stage_and_gauges(self):
+        telemetry = Telemetry()
+        queue_depth = [3]
+        telemetry.register_gauge("stage_queue_depth", (("stage", "generation"),), lambda: queue_depth[0])
+
+        telemetry.run_started()
+        with telemetry.time_stage("customer"):
+            pass
+        gauges = telemetry.gauges()
+        telemetry.run_finished("completed")
+
+        self.assertEqual(gauges[("inflight_runs", ())], 1)
+        self.assertEqual(gauges[("stage_queue_depth", (("stage", "generation"),))], 3)
+        self.assertEqual(telemetry.inflight_runs, 0)
+        self.assertEqual(telemetry.counter("runs_completed"), 1)
+        self.assertEqual(telemetry.stage_latencies()["customer"]["count"], 1)
+
+    def test_rolling_window_only_counts_recent_slots(self):
+        window = RollingWindow(slot_seconds=10, horizon_seconds=3600)
+        now = 100000.0
+        window.add("cache_hits", 5, now=now - 1800)
+        window.add("cache_hits", 2, now=now - 200)
+        window.add("cache_hits", 1, now=now - 5)
+        window.observe("generation", 0.5, now=now - 5)
+        window.add("cache_hits", 9, now=now - 7200)
+
+        self.assertEqual(window.summary(60, now=now)["counters"]["cache_hits"], 1)
+        self.assertEqual(window.summary(300, now=now)["counters"]["cache_hits"], 3)
+        self.assertEqual(window.summary(3600, now=now)["counters"]["cache_hits"], 8)
+        self.assertEqual(window.summary(60, now=now)["latency"]["generation"]["count"], 1)
+        self.assertNotIn((now - 7200) // 10, window._slots)
+
+    def test_dashboard_renders_rolling_windows_from_memory(self):
+        telemetry = Telemetry()
+        telemetry.record_hit()
+        telemetry.observe("composition", 0.3)
+        telemetry.run_started()
+        telemetry.run_finished("completed")
+
+        summary = telemetry.window_summary(60)
+        page = telemetry.render_dashboard_html("Alpha")
+
+        self.assertEqual((summary["total"], summary["hits"], summary["runs"]), (1, 1, {"completed": 1}))
+        for label in ("Last 1m", "Last 5m", "Last 1h", "composition"):
+            self.assertIn(label, page)
+
+    def test_prometheus_exposition_includes_counters_and_histograms(self):
+        telemetry = Telemetry()
+        telemetry.record_hit()
+        telemetry.record_miss()
+        telemetry.observe("merge", 0.2)
+        telemetry.observe("merge", 7.0)
+        telemetry.register_gauge("stage_queue_depth", (("stage", "generation"),), lambda: 2)
+        record_llm_call("generation", "Mock-Provider", "metrics-test-model", 0.5, ok=False)
+
+        text = render_prometheus_metrics(telemetry)
+        lines = text.splitlines()
+
+        self.assertIn("builder_component_cache_efficiency_ratio 0.5", lines)
+        self.assertIn('builder_stage_queue_depth{stage="generation"} 2', lines)
+        self.assertIn('builder_stage_latency_seconds_bucket{stage="merge",le="0.25"} 1', lines)
+        self.assertIn('builder_stage_latency_seconds_bucket{stage="merge",le="+Inf"} 2', lines)
+        self.assertIn('builder_stage_latency_seconds_count{stage="merge"} 2', lines)
+        self.assertIn(
+            'builder_llm_call_errors_total{role="generation",provider="mock-provider",model="metrics-test-model"} 1',
+            lines,
+        )
+        self.assertIn("# TYPE builder_git_commands_total counter", lines)
+        self.assertIn("# TYPE builder_journal_writes_total counter", lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
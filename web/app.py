@@ -1,9 +1,15 @@
+import json
 import os
+import queue
 import sys
+import threading
+import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from flask import Flask, render_template, request, jsonify
-from core.orchestrator import Orchestrator
+from flask import Flask, Response, render_template, request, jsonify, send_file
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_prometheus_metrics
+from core.orchestrator import Orchestrator, StageQueueFullError
+from web.jobs import JobManager, JobQueueFullError
 
 app = Flask(__name__)
 
@@ -15,6 +21,8 @@ except Exception as e:
     print(f"[Flask] Error initializing Orchestrator: {e}")
     orchestrator = None
 
+job_manager = JobManager(orchestrator) if orchestrator else None
+
 @app.route('/')
 def index():
     """웹 브라우저 접근 시 UI 표시 (Phase Live)"""
@@ -33,6 +41,13 @@ def generate_ui():
         return jsonify({"error": "intent is required."}), 400
         
     session_id = f"web_session_{os.urandom(4).hex()}"
+
+    if data.get('stream'):
+        return Response(
+            _stream_pipeline_events(session_id, user_intent),
+            content_type="text/event-stream; charset=utf-8",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
     
     try:
         # Orchestrator 호출 (API 호환 버전)
@@ -44,10 +59,157 @@ def generate_ui():
         # result 딕셔너리에 담긴 html 코드와 metrics 반환
         return jsonify(result), 200
         
+    except StageQueueFullError as e:
+        # 단계별 대기열 한도 초과: 재시도 가능한 과부하 응답
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
     except Exception as e:
         print(f"[Flask] Error during generation: {e}")
         return jsonify({"error": str(e)}), 500
 
+def _format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+def _stream_pipeline_events(session_id: str, user_intent: str):
+    """
+    스트리밍 모드 파이프라인을 별도 스레드에서 실행하고 이벤트를 SSE로 흘려보낸다.
+    started → shell → section(컴포넌트 순서) → shell_close 뒤 done(metrics) 또는 error로 끝난다.
+    html 필드를 순서대로 이어 붙이면 완성된 페이지가 된다.
+    """
+    events = queue.Queue()
+
+    def run():
+        try:
+            result = orchestrator.run_pipeline(session_id, user_intent, event_sink=events.put)
+            if result is None:
+                events.put({"type": "error", "status": 400,
+                            "error": "Generation blocked or failed (e.g. exceeded component limits)."})
+            else:
+                events.put({
+                    "type": "done",
+                    "metrics": result["metrics"],
+                    "cached": result.get("cached", False),
+                    "timed_out_stages": result.get("timed_out_stages", []),
+                })
+        except StageQueueFullError as e:
+            events.put({"type": "error", "status": 503, "error": str(e)})
+        except Exception as e:
+            print(f"[Flask] Error during streaming generation: {e}")
+            events.put({"type": "error", "status": 500, "error": str(e)})
+
+    threading.Thread(target=run, name=f"stream-{session_id}", daemon=True).start()
+    while True:
+        event = events.get()
+        yield _format_sse(event)
+        if event["type"] in ("done", "error"):
+            return
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """생성 작업을 등록하고 즉시 job id(= run_id)를 반환 (진행 상황은 /api/jobs/<id>/events)"""
+    if not job_manager:
+        return jsonify({"error": "Orchestrator not initialized. Check server logs."}), 500
+
+    data = request.json or {}
+    user_intent = data.get('intent', '').strip()
+    if not user_intent:
+        return jsonify({"error": "intent is required."}), 400
+
+    try:
+        job = job_manager.submit(user_intent)
+    except JobQueueFullError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+
+    return jsonify({
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.job_id}",
+        "events_url": f"/api/jobs/{job.job_id}/events",
+    }), 202
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """작업 상태/결과 (메모리에 없으면 run 저널 기준 상태)"""
+    if not job_manager:
+        return jsonify({"error": "Orchestrator not initialized. Check server logs."}), 500
+    payload = job_manager.describe(job_id)
+    if payload is None:
+        return jsonify({"error": "job not found."}), 404
+    return jsonify(payload), 200
+
+@app.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    """단계별 진행 이벤트 SSE (Last-Event-ID로 이어 받기 가능)"""
+    if not job_manager:
+        return jsonify({"error": "Orchestrator not initialized. Check server logs."}), 500
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "job not found."}), 404
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", "-1"))
+    except ValueError:
+        last_event_id = -1
+    return Response(
+        job_manager.stream_events(job, last_event_id),
+        content_type="text/event-stream; charset=utf-8",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route('/api/runs/<run_id>/artifacts')
+def run_artifacts(run_id):
+    """run 산출물 매니페스트 (이름 → sha256/크기/content_type)"""
+    if not orchestrator:
+        return jsonify({"error": "Orchestrator not initialized. Check server logs."}), 500
+    manifest = orchestrator.artifact_store.get_manifest(run_id)
+    if manifest is None:
+        return jsonify({"error": "run not found."}), 404
+    return jsonify(manifest), 200
+
+@app.route('/api/runs/<run_id>/artifacts/<name>')
+def run_artifact(run_id, name):
+    """저장된 산출물 파일 응답 (sendfile 경로 + sha256 ETag, If-None-Match면 304)"""
+    if not orchestrator:
+        return jsonify({"error": "Orchestrator not initialized. Check server logs."}), 500
+    stored = orchestrator.artifact_store.open_artifact(run_id, name)
+    if stored is None:
+        return jsonify({"error": "artifact not found."}), 404
+    path, entry = stored
+    # 객체는 내용 주소 방식이라 불변 → sha256이 곧 강한 ETag
+    return send_file(
+        path, mimetype=entry["content_type"], etag=entry["sha256"], conditional=True, max_age=86400,
+    )
+
+_dashboard_cache = {"html": None, "expires_at": 0.0}
+_dashboard_cache_lock = threading.Lock()
+
+def _get_dashboard_cache_seconds() -> float:
+    try:
+        return max(0.0, float(os.getenv("DASHBOARD_CACHE_SECONDS", "5")))
+    except ValueError:
+        return 5.0
+
+@app.route('/dashboard')
+def dashboard():
+    """메모리 텔레메트리 기반 실시간 대시보드 (최근 1m/5m/1h, 짧은 TTL 캐시)"""
+    if not orchestrator:
+        return jsonify({"error": "Orchestrator not initialized. Check server logs."}), 500
+
+    now = time.monotonic()
+    with _dashboard_cache_lock:
+        if _dashboard_cache["html"] is not None and now < _dashboard_cache["expires_at"]:
+            return _dashboard_cache["html"]
+
+    html = orchestrator.telemetry.render_dashboard_html(orchestrator.phase)
+    with _dashboard_cache_lock:
+        _dashboard_cache["html"] = html
+        _dashboard_cache["expires_at"] = now + _get_dashboard_cache_seconds()
+    return html
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus 텍스트 형식 지표 (카운터/단계별 지연 히스토그램/LLM·git·저널 통계)"""
+    telemetry = orchestrator.telemetry if orchestrator else None
+    return Response(render_prometheus_metrics(telemetry), content_type=METRICS_CONTENT_TYPE)
+
 if __name__ == '__main__':
     # 워크트리가 생성/제거될 때 파일 시스템 변경이 감지되어 서버가 재시작되는 현상(watchdog)을 막기 위해 
     # use_reloader=False 옵션을 추가합니다. (debug=False로 완전 차단)
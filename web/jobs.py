@@ -0,0 +1,200 @@
+"""
+비동기 생성 작업 관리자.
+
+POST /api/jobs는 작업을 작업자 스레드 풀에 넣고 즉시 job id(= 오케스트레이터 run_id)를 돌려준다.
+진행 이벤트는 메모리에 순번(id)과 함께 쌓이고 SSE 구독자는 Last-Event-ID 이후부터 이어 받는다.
+메모리에서 밀려난(또는 서버 재시작 전의) 작업은 run 저널에서 상태를 복원한다.
+"""
+
+import concurrent.futures
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from core.orchestrator import StageQueueFullError
+
+TERMINAL_STATUSES = ("completed", "failed", "blocked", "interrupted")
+HEARTBEAT_SECONDS = 15.0
+# Orchestrator._create_run_id 형식 (저널 파일 경로에 쓰이므로 그 외 값은 거절)
+JOB_ID_RE = re.compile(r"^run_\d+_[0-9a-f]{8}$")
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+class JobQueueFullError(RuntimeError):
+    """대기 중인 작업이 WEB_JOB_MAX_PENDING을 넘었을 때 발생 (503으로 응답)"""
+
+
+class Job:
+    def __init__(self, job_id: str, session_id: str, intent: str):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.intent = intent
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.http_status = None
+        self.events = []
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def _append_locked(self, event: dict):
+        event = dict(event)
+        event["id"] = len(self.events)
+        self.events.append(event)
+        self._condition.notify_all()
+
+    def append_event(self, event: dict):
+        with self._condition:
+            self._append_locked(event)
+
+    def finish(self, status: str, result: dict = None, error: str = None, http_status: int = None):
+        if status == "completed":
+            event = {
+                "type": "done",
+                "status": status,
+                "metrics": (result or {}).get("metrics"),
+                "cached": (result or {}).get("cached", False),
+            }
+        else:
+            event = {"type": "error", "status": status, "error": error, "http_status": http_status}
+        # 상태 변경과 종료 이벤트를 한 번에 기록해 구독자가 종료 이벤트를 놓치지 않도록 한다.
+        with self._condition:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.http_status = http_status
+            self.finished_at = time.time()
+            self._append_locked(event)
+
+    def wait_events(self, after: int, timeout: float):
+        """after 이후의 이벤트 목록 (없으면 timeout까지 대기)"""
+        with self._condition:
+            if len(self.events) <= after + 1 and not self.finished:
+                self._condition.wait(timeout)
+            return self.events[after + 1:], self.finished
+
+    def to_dict(self) -> dict:
+        payload = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "intent": self.intent,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "progress": [event for event in self.events if "html" not in event],
+        }
+        if self.result is not None:
+            payload["result"] = self.result
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+
+class JobManager:
+    def __init__(self, orchestrator, max_workers: int = None, max_pending: int = None, retention: int = None):
+        self.orchestrator = orchestrator
+        self.max_workers = max_workers or _get_int_env("WEB_JOB_WORKERS", 4)
+        self.max_pending = max_pending or _get_int_env("WEB_JOB_MAX_PENDING", 64)
+        self.retention = retention or _get_int_env("WEB_JOB_RETENTION", 200)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="WebJob"
+        )
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+
+    def _pending_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def submit(self, intent: str) -> Job:
+        with self._lock:
+            if self._pending_count() >= self.max_pending:
+                raise JobQueueFullError(f"too many pending jobs (limit={self.max_pending})")
+            job = Job(self.orchestrator._create_run_id(), f"web_session_{os.urandom(4).hex()}", intent)
+            self._jobs[job.job_id] = job
+            self._evict_locked()
+        self._executor.submit(self._run, job)
+        return job
+
+    def _evict_locked(self):
+        # 끝난 작업부터 오래된 순으로 정리 (진행 중인 작업은 유지)
+        overflow = len(self._jobs) - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:max(0, overflow)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job):
+        job.status = "running"
+        try:
+            result = self.orchestrator.run_pipeline(
+                job.session_id, job.intent,
+                event_sink=job.append_event, stream_sections=False, run_id=job.job_id,
+            )
+        except StageQueueFullError as e:
+            job.finish("failed", error=str(e), http_status=503)
+        except Exception as e:
+            print(f"[Jobs] {job.job_id} 실패: {e}")
+            job.finish("failed", error=str(e), http_status=500)
+        except BaseException as e:
+            # KeyboardInterrupt/CancelledError: 저널은 interrupted로 닫히므로 작업도 끝내 SSE 구독자를 풀어 준다
+            job.finish("interrupted", error=f"{type(e).__name__}: {e}", http_status=503)
+            raise
+        else:
+            if result is None:
+                job.finish("blocked", error="Generation blocked or failed (e.g. exceeded component limits).",
+                           http_status=400)
+            else:
+                job.finish("completed", result=result)
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def describe(self, job_id: str):
+        """작업 상태 dict. 메모리에 없으면 run 저널에서 복원 (결과 HTML은 없음). 모르는 id면 None."""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if not JOB_ID_RE.match(job_id or ""):
+            return None
+        payload = self.orchestrator.load_run_journal(job_id)
+        if payload is None:
+            return None
+        return {
+            "job_id": job_id,
+            "status": payload.get("status"),
+            "intent": payload.get("request"),
+            "created_at": payload.get("created_at"),
+            "finished_at": payload.get("finished_at"),
+            "error": payload.get("error"),
+            "timed_out_stages": payload.get("timed_out_stages", []),
+            "source": "journal",
+        }
+
+    def stream_events(self, job: Job, last_event_id: int = -1):
+        """SSE 프레임 generator: 지난 이벤트를 재전송한 뒤 종료 이벤트까지 실시간으로 흘려보낸다."""
+        after = last_event_id
+        while True:
+            events, finished = job.wait_events(after, HEARTBEAT_SECONDS)
+            for event in events:
+                after = event["id"]
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            if finished and after >= len(job.events) - 1:
+                return
+            if not events:
+                # 프록시가 유휴 연결을 끊지 않도록 주석 프레임으로 유지
+                yield ": keep-alive\n\n"
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait)
@@ -1,3 +1,4 @@
+import html as html_lib
 import json
 import os
 import sys
@@ -6,6 +7,7 @@ base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if base_dir not in sys.path:
     sys.path.append(base_dir)
 
+from src.utils.deadline import Deadline, ensure_deadline
 from src.utils.llm_router import get_llm
 
 try:
@@ -25,7 +27,9 @@ class CompositionAgent:
         self.name = "CompositionAgent"
         provider = os.getenv("COMPOSITION_LLM_PROVIDER", os.getenv("AI_PROVIDER", "openai"))
         model_name = os.getenv("COMPOSITION_LLM_MODEL", os.getenv("AI_MODEL", "gpt-4o"))
-        self.llm = get_llm(provider=provider, model_name=model_name)
+        self.llm_provider = provider
+        self.llm_model = model_name
+        self.llm = get_llm(provider=provider, model_name=model_name, role="composition")
 
         if LANGCHAIN_AVAILABLE:
             self.parser = StrOutputParser()
@@ -54,24 +58,21 @@ class CompositionAgent:
         else:
             self.chain = None
 
-    def compose(self, parsed_request: dict, component_assets: list) -> str:
+    def compose(self, parsed_request: dict, component_assets: list, deadline: Deadline = None) -> str:
         print(f"[{self.name}] 조립 시작. 대상 컴포넌트 {len(component_assets)}종을 통합합니다.")
         
         user_intent = parsed_request.get('user_intent', 'Untitled Project')
+        deadline = ensure_deadline(deadline)
         
         if LANGCHAIN_AVAILABLE and self.chain:
             try:
-                # 컴포넌트 명세와 HTML 템플릿 직렬화
-                components_str = ""
-                for asset in component_assets:
-                    components_str += f"--- Component Name: {asset.get('name')} ---\n"
-                    components_str += f"HTML Template: {asset.get('html_template')}\n\n"
+                components_str = self._serialize_components(component_assets)
                 
                 print(f"[{self.name}] LLM에게 풀 페이지 구성 요청...")
-                response = self.chain.invoke({
+                response = deadline.call(self.chain.invoke, {
                     "user_intent": user_intent,
                     "components": components_str
-                })
+                }, stage="composition")
                 print(f"[{self.name}] 🟢 조립 완료. 최종 디지털 코드 생성 성공.")
                 return response
             except Exception as e:
@@ -80,6 +81,65 @@ class CompositionAgent:
         # Fallback (Langchain 없거나 실패 시)
         return self._fallback_compose(parsed_request, component_assets)
 
+    async def acompose(self, parsed_request: dict, component_assets: list, deadline: Deadline = None) -> str:
+        """compose의 비동기 버전 (chain.ainvoke 사용, 기한 초과 시 호출을 취소하고 폴백 조합)"""
+        print(f"[{self.name}] 조립 시작. 대상 컴포넌트 {len(component_assets)}종을 통합합니다.")
+
+        user_intent = parsed_request.get('user_intent', 'Untitled Project')
+        deadline = ensure_deadline(deadline)
+
+        if LANGCHAIN_AVAILABLE and self.chain:
+            try:
+                components_str = self._serialize_components(component_assets)
+
+                print(f"[{self.name}] LLM에게 풀 페이지 구성 요청...")
+                response = await deadline.wait(self.chain.ainvoke({
+                    "user_intent": user_intent,
+                    "components": components_str
+                }), "composition")
+                print(f"[{self.name}] 🟢 조립 완료. 최종 디지털 코드 생성 성공.")
+                return response
+            except Exception as e:
+                print(f"[{self.name}] LLM 체인 실패, Fallback 하드코딩 조합 반환: {e}")
+
+        return self._fallback_compose(parsed_request, component_assets)
+
+    # --- 스트리밍 조립: 페이지 뼈대를 먼저 내보내고 QA를 통과한 섹션을 순서대로 이어 붙인다 ---
+
+    def render_shell_open(self, user_intent: str) -> str:
+        title = html_lib.escape(str(user_intent or 'Untitled Project'))
+        return (
+            "<!DOCTYPE html>\n"
+            "<html lang=\"en\">\n"
+            "<head>\n"
+            "    <meta charset=\"UTF-8\">\n"
+            "    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">\n"
+            f"    <title>{title}</title>\n"
+            "    <script src=\"https://cdn.tailwindcss.com\"></script>\n"
+            "</head>\n"
+            "<body class=\"bg-slate-50 p-6 text-slate-900\">\n"
+            "<main class=\"mx-auto flex max-w-7xl flex-col gap-4\">\n"
+            f"    <header class=\"mb-2\"><h1 class=\"text-2xl font-bold\">{title}</h1></header>\n"
+        )
+
+    def render_section(self, asset: dict) -> str:
+        name = html_lib.escape(str(asset.get('name') or 'component'), quote=True)
+        return (
+            f"    <section data-component=\"{name}\" class=\"rounded-xl border border-slate-200 bg-white p-4 shadow-sm\">"
+            f"{self._render_atomic_component(asset)}</section>\n"
+        )
+
+    def render_shell_close(self) -> str:
+        return "</main>\n</body>\n</html>\n"
+
+    def _serialize_components(self, component_assets: list) -> str:
+        # 컴포넌트 명세와 HTML 템플릿 직렬화
+        components_str = ""
+        for asset in component_assets:
+            components_str += f"--- Component Name: {asset.get('name')} ---\n"
+            components_str += f"HTML Template: {asset.get('html_template')}\n\n"
+        return components_str
+
     def _fallback_compose(self, parsed_request: dict, component_assets: list) -> str:
         # 기존 뼈대 로직
         final_document = """<!DOCTYPE html>
@@ -7,7 +7,9 @@ base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if base_dir not in sys.path:
     sys.path.append(base_dir)
 
-from src.utils.llm_router import get_llm
+from src.utils.component_store import get_component_store
+from src.utils.deadline import Deadline, ensure_deadline
+from src.utils.llm_router import get_llm, is_json_response
 
 try:
     from langchain_core.prompts import PromptTemplate
@@ -25,7 +27,9 @@ class CustomerAgent:
         self.name = "CustomerAgent"
         provider = os.getenv("CUSTOMER_LLM_PROVIDER", os.getenv("AI_PROVIDER", "ollama"))
         model_name = os.getenv("CUSTOMER_LLM_MODEL", os.getenv("AI_MODEL", "llama3"))
-        self.llm = get_llm(provider=provider, model_name=model_name)
+        self.llm_provider = provider
+        self.llm_model = model_name
+        self.llm = get_llm(provider=provider, model_name=model_name, role="customer", cache_check=is_json_response)
         self.allowed_component_names = self._get_allowed_component_names()
         
         if LANGCHAIN_AVAILABLE:
@@ -43,10 +47,11 @@ class CustomerAgent:
                     "- Keep user_intent short and concrete.\n"
                     "\n"
                     "Format Instructions:\n{format_instructions}\n\n"
-                    "User Request:\n{user_request}\n\n"
-                    "Session ID: {session_id}"
+                    "User Request:\n{user_request}"
                 ),
-                input_variables=["user_request", "session_id"],
+                # session_id는 프롬프트에 넣지 않는다 (요청마다 달라 프롬프트 캐시가 적중하지 않으므로,
+                # _normalize_response에서 호출자의 값으로 채운다)
+                input_variables=["user_request"],
                 partial_variables={
                     "format_instructions": self._get_format_instructions(),
                     "allowed_components": self._get_allowed_components(),
@@ -60,18 +65,16 @@ class CustomerAgent:
         return ", ".join(self._get_allowed_component_names())
 
     def _get_allowed_component_names(self) -> list:
-        component_dirs = [
-            os.path.join(os.path.dirname(__file__), '..', 'generation_agent', 'library', 'components'),
-            os.path.join(os.path.dirname(__file__), '..', '..', 'output', 'components'),
+        # 사전 정의 라이브러리 + 생성 라이브러리(ComponentStore). 이름 목록은 저장소 revision이
+        # 바뀔 때만 다시 스캔되므로 에이전트 생성마다 디렉토리를 나열하지 않는다.
+        stores = [
+            get_component_store("json", os.path.join(os.path.dirname(__file__), '..', 'generation_agent', 'library', 'components')),
+            get_component_store(),
         ]
         component_names = set()
-        for component_dir in component_dirs:
+        for store in stores:
             try:
-                component_names.update(
-                    file_name[:-5]
-                    for file_name in os.listdir(component_dir)
-                    if file_name.endswith('.json')
-                )
+                component_names.update(store.names())
             except Exception:
                 continue
         if component_names:
@@ -129,27 +132,51 @@ class CustomerAgent:
             return normalized
         return None
 
-    def _augment_components_from_request(self, user_request: str, components: list) -> list:
+    KEYWORD_RULES = [
+        (("dashboard", "대시보드", "kpi", "매출"), ["custom_graph", "kpi_card"]),
+        (("shopping", "shop", "상품", "쇼핑"), ["nav_bar", "product_card"]),
+        (("search", "검색"), ["search_bar", "product_card"]),
+        (("profile", "프로필"), ["profile_card"]),
+        (("notice", "announcement", "공지"), ["notice_list"]),
+        (("chat", "chatbot", "채팅"), ["chat_interface"]),
+        (("faq", "자주 묻는 질문"), ["faq_accordion"]),
+        (("landing", "랜딩"), ["hero_section", "button", "footer_simple"]),
+        (("login", "로그인"), ["text_input", "button"]),
+        (("signup", "회원가입"), ["login_form", "button"]),
+    ]
+
+    # 예측 전용: LLM이 보통 그대로 뽑아내는 직접 언급 (_augment에는 쓰지 않음)
+    MENTION_RULES = [
+        (("header", "헤더"), ["header"]),
+        (("nav", "네비", "메뉴"), ["nav_bar"]),
+        (("hero", "히어로"), ["hero_section"]),
+        (("button", "버튼"), ["button"]),
+        (("input", "입력"), ["text_input"]),
+        (("chart", "graph", "차트", "그래프"), ["custom_graph"]),
+        (("footer", "푸터"), ["footer_simple"]),
+    ]
+
+    def _apply_keyword_rules(self, user_request: str, components: list, rules) -> list:
         lowered = user_request.lower()
-        keyword_rules = [
-            (("dashboard", "대시보드", "kpi", "매출"), ["custom_graph", "kpi_card"]),
-            (("shopping", "shop", "상품", "쇼핑"), ["nav_bar", "product_card"]),
-            (("search", "검색"), ["search_bar", "product_card"]),
-            (("profile", "프로필"), ["profile_card"]),
-            (("notice", "announcement", "공지"), ["notice_list"]),
-            (("chat", "chatbot", "채팅"), ["chat_interface"]),
-            (("faq", "자주 묻는 질문"), ["faq_accordion"]),
-            (("landing", "랜딩"), ["hero_section", "button", "footer_simple"]),
-            (("login", "로그인"), ["text_input", "button"]),
-            (("signup", "회원가입"), ["login_form", "button"]),
-        ]
-        for keywords, suggested_components in keyword_rules:
+        for keywords, suggested_components in rules:
             if any(keyword in lowered for keyword in keywords):
                 for component_name in suggested_components:
                     if component_name in self.allowed_component_names and component_name not in components:
                         components.append(component_name)
         return components
 
+    def _augment_components_from_request(self, user_request: str, components: list) -> list:
+        return self._apply_keyword_rules(user_request, components, self.KEYWORD_RULES)
+
+    def predict_components(self, user_request: str) -> list:
+        """
+        LLM 파싱 없이 요청 문장만으로 필요할 가능성이 높은 컴포넌트를 예측한다 (키워드 규칙, 마이크로초 단위).
+        오케스트레이터가 Customer LLM 호출과 병렬로 생성을 미리 시작하는 데 사용한다.
+        """
+        predicted = self._apply_keyword_rules(user_request, [], self.MENTION_RULES)
+        predicted = self._apply_keyword_rules(user_request, predicted, self.KEYWORD_RULES)
+        return predicted[:6]
+
     def _normalize_response(self, session_id: str, user_request: str, response: dict) -> dict:
         raw_components = response.get("required_components", [])
         normalized_components = []
@@ -163,7 +190,7 @@ class CustomerAgent:
             normalized_components = ["header", "button", "text_input"]
 
         return {
-            "session_id": response.get("session_id") or session_id,
+            "session_id": session_id,
             "required_components": normalized_components[:6],
             "user_intent": str(response.get("user_intent") or user_request).strip()[:160],
         }
@@ -177,25 +204,52 @@ class CustomerAgent:
         except Exception:
             return '{"session_id": "string", "required_components": ["string"], "user_intent": "string"}'
 
-    def process_request(self, session_id: str, user_request: str) -> dict:
-        print(f"[{self.name}] 분석 중: {user_request}")
-        
+    def _fallback_data(self, session_id: str) -> dict:
         # 기본 폴백 데이터 (MVP Mocking)
-        fallback_data = {
+        return {
             "session_id": session_id,
             "required_components": ["header", "button", "text_input"],
             "user_intent": "Create a simple login form"
         }
 
+    def process_request(self, session_id: str, user_request: str, deadline: Deadline = None) -> dict:
+        print(f"[{self.name}] 분석 중: {user_request}")
+        
+        fallback_data = self._fallback_data(session_id)
+
         if not LANGCHAIN_AVAILABLE or not self.chain:
             print(f"[{self.name}] Langchain 미설정. Mock 데이터 반환.")
             return fallback_data
             
+        deadline = ensure_deadline(deadline)
         try:
             # 실제 LLM 호출 (모의 객체일 경우 mock 객체가 처리됨)
-            response = self.chain.invoke({"user_request": user_request, "session_id": session_id})
+            response = deadline.call(
+                self.chain.invoke, {"user_request": user_request}, stage="customer"
+            )
             return self._normalize_response(session_id, user_request, response)
             
         except Exception as e:
             print(f"[{self.name}] LLM 체인 처리 실패, Fallback 동작: {e}")
             return fallback_data
+
+    async def aprocess_request(self, session_id: str, user_request: str, deadline: Deadline = None) -> dict:
+        """process_request의 비동기 버전 (chain.ainvoke 사용, 기한 초과 시 호출을 취소하고 폴백)"""
+        print(f"[{self.name}] 분석 중: {user_request}")
+
+        fallback_data = self._fallback_data(session_id)
+
+        if not LANGCHAIN_AVAILABLE or not self.chain:
+            print(f"[{self.name}] Langchain 미설정. Mock 데이터 반환.")
+            return fallback_data
+
+        deadline = ensure_deadline(deadline)
+        try:
+            response = await deadline.wait(
+                self.chain.ainvoke({"user_request": user_request}), "customer"
+            )
+            return self._normalize_response(session_id, user_request, response)
+
+        except Exception as e:
+            print(f"[{self.name}] LLM 체인 처리 실패, Fallback 동작: {e}")
+            return fallback_data
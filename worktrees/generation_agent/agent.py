@@ -1,12 +1,19 @@
-import json
+import asyncio
+import concurrent.futures
+import copy
 import os
 import sys
+import threading
+import time
+from collections import OrderedDict
 
 base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if base_dir not in sys.path:
     sys.path.append(base_dir)
 
-from src.utils.llm_router import get_llm
+from src.utils.component_store import ComponentStore, get_component_store
+from src.utils.deadline import Deadline, DeadlineExceeded, ensure_deadline
+from src.utils.llm_router import get_llm, is_json_response
 
 try:
     from langchain_core.prompts import PromptTemplate
@@ -16,23 +23,120 @@ except ImportError:
     LANGCHAIN_AVAILABLE = False
 
 
+class SingleFlightAborted(RuntimeError):
+    """공유 중인 컴포넌트 생성의 리더가 취소/중단되었을 때 대기자에게 전달된다."""
+
+
+def _get_cache_config():
+    try:
+        max_entries = int(os.getenv("COMPONENT_CACHE_MAX_ENTRIES", "512"))
+    except ValueError:
+        max_entries = 512
+    try:
+        revalidate_seconds = float(os.getenv("COMPONENT_CACHE_REVALIDATE_SECONDS", "2"))
+    except ValueError:
+        revalidate_seconds = 2.0
+    return max(0, max_entries), max(0.0, revalidate_seconds)
+
+
+class ComponentMetadataCache:
+    """
+    파싱된 컴포넌트 메타데이터의 프로세스 전역 LRU 캐시.
+    항목은 ComponentStore.entry_token(name)으로 검증하며, 마지막 검증 후 revalidate_seconds 이내의
+    조회는 저장소를 건드리지 않고 메모리에서 바로 반환한다. (핫 컴포넌트는 워밍업 이후 디스크 미접근)
+    """
+
+    def __init__(self, max_entries: int, revalidate_seconds: float):
+        self.max_entries = max_entries
+        self.revalidate_seconds = revalidate_seconds
+        self._entries = OrderedDict()  # (store location, name) -> [token, metadata, validated_at]
+        self._lock = threading.Lock()
+
+    def get(self, store: ComponentStore, name: str):
+        """캐시/저장소에서 메타데이터 반환. 컴포넌트가 없으면 None."""
+        key = (store.location, name)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[2] < self.revalidate_seconds:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry[1])
+
+        token = store.entry_token(name)
+        if token is None:
+            self.invalidate(store, name)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == token:
+                entry[2] = now
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry[1])
+
+        metadata = store.get(name)
+        if metadata is None:
+            self.invalidate(store, name)
+            return None
+        self.put(store, name, metadata, token=token)
+        return copy.deepcopy(metadata)
+
+    def put(self, store: ComponentStore, name: str, metadata: dict, token=None):
+        if self.max_entries <= 0:
+            return
+        if token is None:
+            token = store.entry_token(name)
+            if token is None:
+                return
+        key = (store.location, name)
+        with self._lock:
+            self._entries[key] = [token, copy.deepcopy(metadata), time.monotonic()]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, store: ComponentStore = None, name: str = None):
+        with self._lock:
+            if store is None:
+                self._entries.clear()
+            else:
+                self._entries.pop((store.location, name), None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_metadata_cache = ComponentMetadataCache(*_get_cache_config())
+
+
+def get_component_metadata_cache() -> ComponentMetadataCache:
+    return _metadata_cache
+
+
 class GenerationAgent:
     """
     생성/관리 에이전트: 
     1) 라이브러리에 있는 컴포넌트는 즉시 반환 (캐싱/사전 정의)
     2) 없는 컴포넌트는 LLM을 통해 최소 단위(Atomic)로 동적 생성 후 라이브러리에 저장.
+       동시에 같은 컴포넌트가 미스되면 프로세스 안에서는 single-flight로, 프로세스 간에는
+       컴포넌트별 파일 락으로 LLM 생성을 한 번만 수행한다.
     """
+    # (library_path, component, provider, model) -> concurrent.futures.Future
+    _inflight = {}
+    _inflight_lock = threading.Lock()
+
     def __init__(self):
         self.name = "GenerationAgent"
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-        self.library_path = os.path.abspath(
-            os.getenv("COMPONENT_LIBRARY_PATH", os.path.join(base_dir, "output", "components"))
-        )
-        os.makedirs(self.library_path, exist_ok=True)
+        # 저장소 백엔드는 COMPONENT_STORE_BACKEND(json|sqlite)로 선택
+        self.store = get_component_store()
+        self.library_path = self.store.location
 
         provider = os.getenv("GENERATION_LLM_PROVIDER", os.getenv("AI_PROVIDER", "openai"))
         model_name = os.getenv("GENERATION_LLM_MODEL", os.getenv("AI_MODEL", "gpt-4o"))
-        self.llm = get_llm(provider=provider, model_name=model_name)
+        self.llm_provider = provider
+        self.llm_model = model_name
+        self.llm = get_llm(provider=provider, model_name=model_name, role="generation", cache_check=is_json_response)
 
         if LANGCHAIN_AVAILABLE:
             self.parser = JsonOutputParser()
@@ -83,36 +187,199 @@ class GenerationAgent:
             }
         }
 
-    def load_component_metadata(self, component_name: str) -> dict:
-        file_path = os.path.join(self.library_path, f"{component_name}.json")
-        
-        # 1. 라이브러리(캐시) 확인 로직
-        if os.path.exists(file_path):
-            print(f"[{self.name}] 🟢 라이브러리 히트: '{component_name}' (사전 컴포넌트 로드)")
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-                
-        # 2. 동적 생성 (Atomic Component) 로직
-        print(f"[{self.name}] 🟡 라이브러리 미스: '{component_name}' (LLM 최소 단위 동적 생성 시작)")
-        
-        dynamic_component = self._call_llm_for_atomic_component(component_name)
-        
-        # 3. 라이브러리에 저장 (캐싱)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(dynamic_component, f, indent=4, ensure_ascii=False)
+    def _read_library_component(self, component_name: str):
+        cached = _metadata_cache.get(self.store, component_name)
+        if cached is None:
+            return None
+        print(f"[{self.name}] 🟢 라이브러리 히트: '{component_name}' (사전 컴포넌트 로드)")
+        return cached
+
+    def _save_library_component(self, component_name: str, component: dict):
+        self.store.put(component_name, component)
+        _metadata_cache.put(self.store, component_name, component)
         print(f"[{self.name}] 💾 동적 컴포넌트 저장 완료: '{component_name}'")
-        
-        return dynamic_component
 
-    def _call_llm_for_atomic_component(self, name: str) -> dict:
+    # --- single-flight: 동일 컴포넌트 동시 미스 시 LLM 호출을 한 번으로 합친다 ---
+
+    def _inflight_key(self, component_name: str):
+        return (self.library_path, component_name, self.llm_provider, self.llm_model)
+
+    @classmethod
+    def _join_inflight(cls, key):
+        """(future, is_leader) 반환. 이미 진행 중인 생성이 있으면 그 future를 공유한다."""
+        with cls._inflight_lock:
+            future = cls._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = concurrent.futures.Future()
+            cls._inflight[key] = future
+            return future, True
+
+    @classmethod
+    def _finish_inflight(cls, key, future, result=None, error=None):
+        with cls._inflight_lock:
+            if cls._inflight.get(key) is future:
+                del cls._inflight[key]
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception) and not isinstance(error, DeadlineExceeded):
+            future.set_exception(error)
+        else:
+            # 리더가 취소/중단되었거나 리더 자신의 기한이 소진된 경우 대기자는 자신의 기한 안에서 재시도해야 한다.
+            # (DeadlineExceeded는 TimeoutError이므로 그대로 넘기면 대기자 쪽에서 자신의 기한 초과로 오인된다)
+            future.set_exception(SingleFlightAborted(repr(error)))
+
+    def _library_file_lock(self, component_name: str):
+        return self.store.lock(component_name)
+
+    def _generate_component_locked(self, component_name: str, deadline: Deadline) -> dict:
+        with self._library_file_lock(component_name):
+            # 락 대기 중 다른 서버 프로세스가 먼저 생성했을 수 있으므로 다시 확인한다.
+            cached = self._read_library_component(component_name)
+            if cached is not None:
+                return cached, True
+
+            print(f"[{self.name}] 🟡 라이브러리 미스: '{component_name}' (LLM 최소 단위 동적 생성 시작)")
+            dynamic_component = self._call_llm_for_atomic_component(component_name, deadline)
+            self._save_library_component(component_name, dynamic_component)
+            return dynamic_component, False
+
+    async def _agenerate_component_locked(self, component_name: str, deadline: Deadline) -> dict:
+        file_lock = self._library_file_lock(component_name)
+        # flock 대기가 이벤트 루프를 막지 않도록 획득은 스레드에서 수행한다.
+        acquire = asyncio.ensure_future(asyncio.to_thread(file_lock.acquire))
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            # 대기 중 취소(예: 쓰이지 않은 선행 생성)되면 스레드가 나중에 얻은 락을 곧바로 놓아준다.
+            acquire.add_done_callback(
+                lambda done: file_lock.release() if not done.cancelled() and done.exception() is None else None
+            )
+            raise
+        try:
+            cached = self._read_library_component(component_name)
+            if cached is not None:
+                return cached, True
+
+            print(f"[{self.name}] 🟡 라이브러리 미스: '{component_name}' (LLM 최소 단위 동적 생성 시작)")
+            dynamic_component = await self._acall_llm_for_atomic_component(component_name, deadline)
+            self._save_library_component(component_name, dynamic_component)
+            return dynamic_component, False
+        finally:
+            file_lock.release()
+
+    def load_component_metadata(self, component_name: str, deadline: Deadline = None) -> dict:
+        return self.resolve_component(component_name, deadline)[0]
+
+    async def aload_component_metadata(self, component_name: str, deadline: Deadline = None) -> dict:
+        """load_component_metadata의 비동기 버전 (LLM 호출만 chain.ainvoke로 대기)"""
+        return (await self.aresolve_component(component_name, deadline))[0]
+
+    def _deadline_fallback(self, component_name: str):
+        # 기한 초과 시의 폴백은 라이브러리에 저장하지 않는다 (다음 요청에서 정상 생성되도록).
+        print(f"[{self.name}] ⏱️ 기한 초과: '{component_name}' 폴백 컴포넌트 사용 (저장 안 함)")
+        return copy.deepcopy(self._fallback_component(component_name)), False
+
+    def resolve_component(self, component_name: str, deadline: Deadline = None):
+        """
+        (metadata, is_hit) 반환. is_hit는 이번 호출이 LLM 생성 비용 없이
+        라이브러리(메모리 캐시/디스크) 또는 진행 중이던 동일 생성 결과로 처리되었는지 여부.
+        deadline이 소진되면 LLM 호출/동일 생성 대기를 중단하고 폴백 컴포넌트를 반환한다.
+        """
+        deadline = ensure_deadline(deadline)
+        key = self._inflight_key(component_name)
+        while True:
+            # 1. 라이브러리(캐시) 확인 로직
+            cached = self._read_library_component(component_name)
+            if cached is not None:
+                return cached, True
+
+            # 2. 같은 컴포넌트를 이미 생성 중이면 그 결과를 기다린다.
+            future, is_leader = self._join_inflight(key)
+            if not is_leader:
+                print(f"[{self.name}] ⏳ 동일 컴포넌트 생성 대기: '{component_name}' (single-flight)")
+                try:
+                    # 공유 future는 다른 대기자도 쓰므로 기한 초과 시에도 취소하지 않는다.
+                    return copy.deepcopy(deadline.result(future, "generation", cancel=False)), True
+                except DeadlineExceeded:
+                    return self._deadline_fallback(component_name)
+                except Exception:
+                    continue
+
+            # 3. 동적 생성 (Atomic Component) 후 라이브러리에 저장 (캐싱)
+            try:
+                dynamic_component, is_hit = self._generate_component_locked(component_name, deadline)
+            except DeadlineExceeded as exc:
+                # 대기자는 SingleFlightAborted를 받고 각자의 기한 안에서 다시 시도한다.
+                self._finish_inflight(key, future, error=exc)
+                return self._deadline_fallback(component_name)
+            except BaseException as exc:
+                self._finish_inflight(key, future, error=exc)
+                raise
+            self._finish_inflight(key, future, result=dynamic_component)
+            return dynamic_component, is_hit
+
+    async def aresolve_component(self, component_name: str, deadline: Deadline = None):
+        """resolve_component의 비동기 버전 (기한 초과 시 진행 중인 LLM 호출을 취소)"""
+        deadline = ensure_deadline(deadline)
+        key = self._inflight_key(component_name)
+        while True:
+            cached = self._read_library_component(component_name)
+            if cached is not None:
+                return cached, True
+
+            future, is_leader = self._join_inflight(key)
+            if not is_leader:
+                print(f"[{self.name}] ⏳ 동일 컴포넌트 생성 대기: '{component_name}' (single-flight)")
+                try:
+                    # 대기자 취소가 공유 future(리더의 생성)까지 취소하지 않도록 shield한다.
+                    shared = asyncio.shield(asyncio.wrap_future(future))
+                    return copy.deepcopy(await deadline.wait(shared, "generation")), True
+                except DeadlineExceeded:
+                    return self._deadline_fallback(component_name)
+                except Exception:
+                    continue
+
+            try:
+                dynamic_component, is_hit = await self._agenerate_component_locked(component_name, deadline)
+            except DeadlineExceeded as exc:
+                self._finish_inflight(key, future, error=exc)
+                return self._deadline_fallback(component_name)
+            except BaseException as exc:
+                self._finish_inflight(key, future, error=exc)
+                raise
+            self._finish_inflight(key, future, result=dynamic_component)
+            return dynamic_component, is_hit
+
+    def _call_llm_for_atomic_component(self, name: str, deadline: Deadline = None) -> dict:
         # 실제 LLM 호출
+        deadline = ensure_deadline(deadline)
         if LANGCHAIN_AVAILABLE and self.chain:
             try:
-                response = self.chain.invoke({"component_name": name})
+                response = deadline.call(self.chain.invoke, {"component_name": name}, stage="generation")
                 return response
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 print(f"[{self.name}] LLM 체인 실패, Fallback 모의 데이터 반환: {e}")
                 
+        return self._fallback_component(name)
+
+    async def _acall_llm_for_atomic_component(self, name: str, deadline: Deadline = None) -> dict:
+        deadline = ensure_deadline(deadline)
+        if LANGCHAIN_AVAILABLE and self.chain:
+            try:
+                return await deadline.wait(self.chain.ainvoke({"component_name": name}), "generation")
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                print(f"[{self.name}] LLM 체인 실패, Fallback 모의 데이터 반환: {e}")
+
+        return self._fallback_component(name)
+
+    def _fallback_component(self, name: str) -> dict:
         # Fallback (전혀 모르는 컴포넌트일 경우 또는 LLM/모의 객체 실패 시)
         if name in self._mock_llm_responses:
             return self._mock_llm_responses[name]
@@ -12,12 +12,15 @@ class MethodologyAgent:
         with open(config_path, 'r', encoding='utf-8') as f:
             self.config = json.load(f)
 
-    def process(self, input_data):
+    def process(self, input_data, deadline=None):
         """
         입력된 컴포넌트 정보(주로 Generation Agent의 산출물)를 검사합니다.
         input_data: JSON 파일 경로 또는 메모리 딕셔너리
+        deadline: run 예산(Deadline). 규칙 검사는 로컬/결정적이라 기한이 지나도 수행하며
+                  (폴백 컴포넌트도 병합 전에 검증받도록) 초과 여부만 결과에 표시한다.
         """
         comp_data = input_data
+        deadline_exceeded = deadline is not None and deadline.expired()
         
         # 만약 input_data가 파일 경로라면 데이터 로드 (GenerationAgent 산출물)
         if isinstance(input_data, str) and os.path.exists(input_data):
@@ -45,7 +48,8 @@ class MethodologyAgent:
         return {
             "status": "success",
             "component_id": comp_data.get("component_id"),
-            "data": comp_data
+            "data": comp_data,
+            "deadline_exceeded": deadline_exceeded
         }
 
 if __name__ == "__main__":